@@ -17,6 +17,10 @@ mkdir -p "$BACKUP_DIR"
 # Timestamp
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 
+# Con el perfil 'rendimiento' (WAL) las últimas escrituras pueden estar en
+# laboratorios.db-wal; se consolidan en el archivo principal antes de copiar
+sqlite3 data/laboratorios.db "PRAGMA wal_checkpoint(TRUNCATE);" > /dev/null
+
 # Crear backup sin comprimir
 echo "📋 Creando copia de seguridad de la base de datos..."
 cp data/laboratorios.db "$BACKUP_DIR/laboratorios_backup_${TIMESTAMP}.db"
@@ -0,0 +1,4 @@
+"""
+Benchmarks de rendimiento del sistema.
+Cada módulo se ejecuta con: python -m benchmarks.<modulo>
+"""
@@ -0,0 +1,210 @@
+"""
+Benchmark de arranque de las interfaces.
+
+Para cada interfaz (consola, desktop, tui, web) mide en procesos nuevos:
+- importación: resumen de `python -X importtime` agrupado por paquete, con
+  aviso si se cargan dependencias pesadas (PESADOS) solo por importar
+- primera pantalla: tiempo desde que arranca el proceso hasta que la
+  interfaz muestra su pantalla inicial y termina (mediana de varias corridas)
+
+Las interfaces cuyas dependencias no están instaladas (o que necesitan una
+pantalla que no hay) se informan como no disponibles. La primera pantalla
+usa la base de datos de la aplicación, igual que al abrir la interfaz.
+
+Los resultados se guardan en JSON; con --comparar se comparan con una corrida
+anterior y el proceso termina con código 1 si alguna interfaz es más lenta
+que la tolerancia (--tolerancia, 1.25 = 25 % más lenta).
+
+Uso:
+    python -m benchmarks.bench_arranque
+    python -m benchmarks.bench_arranque --interfaces consola desktop --repeticiones 10
+    python -m benchmarks.bench_arranque --comparar benchmarks/resultados/arranque_anterior.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+
+# Paquetes que no deberían cargarse antes de que el usuario los necesite
+PESADOS = ('reportlab', 'pandas', 'numpy', 'openpyxl', 'matplotlib')
+
+# Por interfaz: módulo y programa que abre la primera pantalla y termina
+INTERFACES = {
+    'consola': (
+        'interfaces.consola',
+        "import builtins\n"
+        "builtins.input = lambda *args: '8'   # Salir en el menú principal\n"
+        "from interfaces.consola import main\n"
+        "main()\n",
+    ),
+    'desktop': (
+        'interfaces.desktop_app',
+        "from interfaces.desktop_app import MainDesktopApp\n"
+        "app = MainDesktopApp()\n"
+        "app.root.update()\n"
+        "app.root.destroy()\n",
+    ),
+    'tui': (
+        'interfaces.tui_app',
+        "import asyncio\n"
+        "from interfaces.tui_app import LaboratoriosAppTUI\n"
+        "async def abrir():\n"
+        "    async with LaboratoriosAppTUI().run_test() as piloto:\n"
+        "        await piloto.pause()\n"
+        "asyncio.run(abrir())\n",
+    ),
+    'web': (
+        'interfaces.web_app',
+        "from streamlit.testing.v1 import AppTest\n"
+        "app = AppTest.from_file('interfaces/web_app.py', default_timeout=60)\n"
+        "app.run()\n"
+        "assert not app.exception, app.exception\n",
+    ),
+}
+
+
+def ejecutar(argumentos):
+    """Ejecuta python con los argumentos en la raíz del proyecto; retorna (segundos, proceso)"""
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable] + argumentos, cwd=RAIZ, capture_output=True, text=True)
+    return time.perf_counter() - inicio, proceso
+
+
+def ultima_linea(texto):
+    lineas = [linea for linea in texto.strip().splitlines() if linea.strip()]
+    return lineas[-1] if lineas else ''
+
+
+def reporte_importacion(modulo, cantidad=10):
+    """
+    Importa el módulo con -X importtime y agrupa el tiempo propio por paquete.
+
+    Returns:
+        dict: total (ms), paquetes (los más lentos), pesados (cargados al
+        importar) o error si la importación falló
+    """
+    _, proceso = ejecutar(['-X', 'importtime', '-c', f'import {modulo}'])
+    if proceso.returncode != 0:
+        return {'error': ultima_linea(proceso.stderr)}
+
+    por_paquete = defaultdict(int)
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, _, nombre = linea[len('import time:'):].split('|')
+        por_paquete[nombre.strip().split('.')[0]] += int(propio)
+
+    paquetes = sorted(por_paquete.items(), key=lambda item: item[1], reverse=True)
+    return {
+        'total': round(sum(por_paquete.values()) / 1000, 1),
+        'paquetes': [(paquete, round(us / 1000, 1)) for paquete, us in paquetes[:cantidad]],
+        'pesados': [paquete for paquete in PESADOS if paquete in por_paquete],
+    }
+
+
+def primera_pantalla(programa, repeticiones):
+    """
+    Mide el tiempo hasta la primera pantalla en procesos nuevos.
+
+    Returns:
+        dict: mediana y mínimo en segundos, o error si la interfaz no pudo abrir
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        duracion, proceso = ejecutar(['-c', programa])
+        if proceso.returncode != 0:
+            return {'error': ultima_linea(proceso.stderr) or ultima_linea(proceso.stdout)}
+        tiempos.append(duracion)
+    return {
+        'mediana': round(statistics.median(tiempos), 4),
+        'minimo': round(min(tiempos), 4),
+        'repeticiones': repeticiones,
+    }
+
+
+def comparar(actual, anterior, tolerancia):
+    """Imprime la razón con la corrida anterior; retorna las interfaces que empeoraron"""
+    print()
+    print(f"=== Comparación con {anterior['fecha']} (tolerancia x{tolerancia}) ===")
+    regresiones = []
+    for interfaz, resultado in actual['interfaces'].items():
+        antes = anterior['interfaces'].get(interfaz, {}).get('primera_pantalla', {})
+        ahora = resultado['primera_pantalla']
+        if 'mediana' not in antes or 'mediana' not in ahora:
+            continue
+        razon = ahora['mediana'] / antes['mediana']
+        marca = ''
+        if razon > tolerancia:
+            regresiones.append(interfaz)
+            marca = '  <-- REGRESIÓN'
+        print(f"  {interfaz:10s} {antes['mediana'] * 1000:8.1f} ms -> {ahora['mediana'] * 1000:8.1f} ms  "
+              f"(x{razon:.2f}){marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el arranque de cada interfaz")
+    parser.add_argument("--interfaces", nargs="*", default=list(INTERFACES), choices=list(INTERFACES))
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto en benchmarks/resultados)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=1.25,
+                        help="Razón máxima aceptada contra la corrida anterior")
+    args = parser.parse_args()
+
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'interfaces': {},
+    }
+
+    print("=== Benchmark de arranque ===")
+    for interfaz in args.interfaces:
+        modulo, programa = INTERFACES[interfaz]
+        importacion = reporte_importacion(modulo)
+        pantalla = primera_pantalla(programa, args.repeticiones) if 'error' not in importacion else {
+            'error': importacion['error']}
+        resultado['interfaces'][interfaz] = {'importacion': importacion, 'primera_pantalla': pantalla}
+
+        print()
+        print(f"[{interfaz}] {modulo}")
+        if 'error' in importacion:
+            print(f"  No disponible: {importacion['error']}")
+            continue
+        print(f"  Importación: {importacion['total']:.1f} ms")
+        for paquete, ms in importacion['paquetes']:
+            print(f"    {paquete:28s} {ms:8.1f} ms")
+        if importacion['pesados']:
+            print(f"  [AVISO] Dependencias pesadas cargadas al importar: {', '.join(importacion['pesados'])}")
+        if 'error' in pantalla:
+            print(f"  Primera pantalla no disponible: {pantalla['error']}")
+        else:
+            print(f"  Primera pantalla: {pantalla['mediana'] * 1000:.1f} ms (mínimo {pantalla['minimo'] * 1000:.1f} ms)")
+
+    salida = args.salida or os.path.join(
+        DIRECTORIO_RESULTADOS, f"arranque_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    print()
+    print(f"Resultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            regresiones = comparar(resultado, json.load(archivo), args.tolerancia)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
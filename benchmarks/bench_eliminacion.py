@@ -0,0 +1,98 @@
+"""
+Benchmark de la eliminación en cascada de una materia grande.
+
+Compara MateriaManager.eliminar_materia(forzar=True), que elimina cada
+tabla con un DELETE con subconsulta dentro de una transacción, contra la
+versión anterior que recorría paralelos y estudiantes con un DELETE de
+calificaciones por estudiante (sin transacción). Ambas corren sobre la
+misma base de datos temporal con los triggers de resumen instalados.
+
+Uso:
+    python -m benchmarks.bench_eliminacion --paralelos 10 --estudiantes 300 --laboratorios 15
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.materia import Materia
+from models.paralelo import Paralelo
+from models.estudiante import Estudiante
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
+from managers.materia_manager import MateriaManager
+from benchmarks.generador import base_temporal, generar
+
+
+def eliminar_materia_por_estudiante(materia_id):
+    """Eliminación en cascada como se hacía antes: un DELETE por estudiante"""
+    materia = Materia.get_by_id(materia_id)
+    eliminados = {'calificaciones': 0, 'estudiantes': 0}
+    for paralelo in materia.paralelos:
+        for estudiante in paralelo.estudiantes:
+            eliminados['calificaciones'] += Calificacion.delete().where(
+                Calificacion.id_estudiante == estudiante
+            ).execute()
+    for paralelo in materia.paralelos:
+        eliminados['estudiantes'] += Estudiante.delete().where(
+            Estudiante.id_paralelo == paralelo
+        ).execute()
+    eliminados['laboratorios'] = Laboratorio.delete().where(Laboratorio.id_materia == materia).execute()
+    eliminados['paralelos'] = Paralelo.delete().where(Paralelo.id_materia == materia).execute()
+    materia.delete_instance()
+    return eliminados
+
+
+def eliminar_materia_conjunto(materia_id):
+    """Eliminación actual del manager"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = MateriaManager.eliminar_materia(materia_id, forzar=True)
+    if not resultado['success']:
+        raise RuntimeError(resultado['mensaje'])
+    return resultado['eliminados']
+
+
+def medir(funcion, args, directorio, nombre):
+    """Crea la base de datos, la llena y mide la eliminación de la materia"""
+    with base_temporal(os.path.join(directorio, f"{nombre}.db")) as db:
+        generar(materias=1, paralelos=args.paralelos, estudiantes=args.estudiantes,
+                laboratorios=args.laboratorios)
+        materia_id = Materia.select(Materia.id).scalar()
+
+        inicio = time.perf_counter()
+        eliminados = funcion(materia_id)
+        duracion = time.perf_counter() - inicio
+
+        restantes = db.execute_sql("SELECT COUNT(*) FROM resumen_paralelo").fetchone()[0]
+    return eliminados, duracion, restantes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide la eliminación en cascada de una materia")
+    parser.add_argument("--paralelos", type=int, default=10)
+    parser.add_argument("--estudiantes", type=int, default=300, help="Estudiantes por paralelo")
+    parser.add_argument("--laboratorios", type=int, default=15)
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix="away_bench_")
+    try:
+        print("=== Benchmark de eliminación en cascada ===")
+        print(f"{args.paralelos} paralelos x {args.estudiantes} estudiantes x {args.laboratorios} laboratorios")
+        print()
+        for nombre, funcion in (("por estudiante", eliminar_materia_por_estudiante),
+                                ("DELETE con subconsulta", eliminar_materia_conjunto)):
+            eliminados, duracion, restantes = medir(funcion, args, directorio, nombre.replace(" ", "_"))
+            print(f"{nombre:24s}: {duracion:7.3f} s  {eliminados}  (filas de resumen restantes: {restantes})")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
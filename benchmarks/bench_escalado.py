@@ -0,0 +1,174 @@
+"""
+Benchmark de escalado de las operaciones más usadas.
+
+Para cada escala de benchmarks.generador crea una base de datos temporal,
+la llena con datos sintéticos y mide (mediana de varias repeticiones):
+- Calificacion.matriz_calificaciones_paralelo
+- Calificacion.estadisticas_paralelo
+- MateriaManager.obtener_estadisticas_generales
+- CalificacionManager.calificar_por_lotes (un laboratorio, un paralelo)
+- PDFExporter: reporte completo, reporte simple y consolidado
+
+La caché de lecturas de los managers se desactiva para medir las
+consultas (--con-cache la mantiene). Los resultados se guardan en JSON
+para comparar corridas con --comparar.
+
+Uso:
+    python -m benchmarks.bench_escalado --escalas pequena mediana grande
+    python -m benchmarks.bench_escalado --comparar benchmarks/resultados/escalado_anterior.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.paralelo import Paralelo
+from models.estudiante import Estudiante
+from models.calificacion import Calificacion
+from managers.materia_manager import MateriaManager
+from managers.calificacion_manager import CalificacionManager
+from models.cache import activar_cache
+from benchmarks.generador import ESCALAS, base_temporal, generar
+
+DIRECTORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+
+
+def cronometrar(funcion, repeticiones):
+    """Ejecuta la función varias veces y retorna mediana y mínimo en segundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        'mediana': round(statistics.median(tiempos), 6),
+        'minimo': round(min(tiempos), 6),
+        'repeticiones': repeticiones,
+    }
+
+
+def operaciones(datos, directorio):
+    """Retorna {nombre: (función, repeticiones)} con las operaciones a medir"""
+    from utils.pdf_exporter import PDFExporter
+
+    paralelo = Paralelo.get_by_id(datos['paralelos'][0])
+    laboratorio_id = datos['laboratorios'][0]
+    ids = [est_id for (est_id,) in (Estudiante.select(Estudiante.id)
+                                     .where(Estudiante.id_paralelo == paralelo).tuples())]
+    lote = {est_id: float(i % 101) for i, est_id in enumerate(ids)}
+
+    return {
+        'matriz_calificaciones_paralelo': (lambda: Calificacion.matriz_calificaciones_paralelo(paralelo), 10),
+        'estadisticas_paralelo': (lambda: Calificacion.estadisticas_paralelo(paralelo), 20),
+        'obtener_estadisticas_generales': (MateriaManager.obtener_estadisticas_generales, 20),
+        'calificar_por_lotes': (lambda: CalificacionManager.calificar_por_lotes(laboratorio_id, lote), 5),
+        'pdf_reporte_paralelo': (lambda: PDFExporter.generar_reporte_paralelo(
+            paralelo.id, os.path.join(directorio, 'paralelo.pdf')), 3),
+        'pdf_reporte_simple': (lambda: PDFExporter.generar_reporte_simple(
+            paralelo.id, os.path.join(directorio, 'simple.pdf')), 3),
+        'pdf_reporte_consolidado': (lambda: PDFExporter.generar_reporte_consolidado(
+            os.path.join(directorio, 'consolidado.pdf')), 1),
+    }
+
+
+def medir_escala(nombre, parametros, semilla, en_memoria, directorio):
+    """Genera una escala y mide todas las operaciones"""
+    ruta = None if en_memoria else os.path.join(directorio, f"{nombre}.db")
+    with base_temporal(ruta) as db:
+        inicio = time.perf_counter()
+        datos = generar(semilla=semilla, **parametros)
+        generacion = time.perf_counter() - inicio
+
+        mediciones = {}
+        for operacion, (funcion, repeticiones) in operaciones(datos, directorio).items():
+            mediciones[operacion] = cronometrar(funcion, repeticiones)
+
+    return {
+        'parametros': parametros,
+        'estudiantes': datos['estudiantes'],
+        'calificaciones': datos['calificaciones'],
+        'generacion': round(generacion, 3),
+        'mediciones': mediciones,
+    }
+
+
+def comparar(actual, anterior):
+    """Imprime la razón entre la corrida actual y una anterior (menor a 1 = más rápido)"""
+    print()
+    print(f"=== Comparación con {anterior['fecha']} ===")
+    for escala, resultado in actual['escalas'].items():
+        previo = anterior['escalas'].get(escala)
+        if not previo:
+            continue
+        print(f"[{escala}]")
+        for operacion, medicion in resultado['mediciones'].items():
+            antes = previo['mediciones'].get(operacion)
+            if not antes or not antes['mediana']:
+                continue
+            razon = medicion['mediana'] / antes['mediana']
+            print(f"  {operacion:32s} {antes['mediana'] * 1000:10.2f} ms -> "
+                  f"{medicion['mediana'] * 1000:10.2f} ms  (x{razon:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide las operaciones principales a varias escalas")
+    parser.add_argument("--escalas", nargs="*", default=list(ESCALAS), choices=list(ESCALAS))
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--memoria", action="store_true", help="Usar bases de datos en memoria")
+    parser.add_argument("--con-cache", action="store_true",
+                        help="Mantener la caché de lecturas de los managers (por defecto se desactiva)")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto en benchmarks/resultados)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'semilla': args.semilla,
+        'en_memoria': args.memoria,
+        'cache': args.con_cache,
+        'escalas': {},
+    }
+    activar_cache(args.con_cache)
+
+    directorio = tempfile.mkdtemp(prefix="away_bench_")
+    try:
+        print("=== Benchmark de escalado ===")
+        for escala in args.escalas:
+            r = medir_escala(escala, ESCALAS[escala], args.semilla, args.memoria, directorio)
+            resultado['escalas'][escala] = r
+            print(f"[{escala}] {r['estudiantes']} estudiantes, {r['calificaciones']} calificaciones "
+                  f"(generadas en {r['generacion']:.2f} s)")
+            for operacion, medicion in r['mediciones'].items():
+                print(f"  {operacion:32s} {medicion['mediana'] * 1000:10.2f} ms")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    salida = args.salida or os.path.join(
+        DIRECTORIO_RESULTADOS, f"escalado_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar(resultado, json.load(archivo))
+
+
+if __name__ == "__main__":
+    main()
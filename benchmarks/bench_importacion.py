@@ -0,0 +1,111 @@
+"""
+Benchmark de la importación masiva de estudiantes (utils.importador_estudiantes).
+
+Genera archivos CSV y XLSX sintéticos con la cantidad de filas pedida y los
+importa en una base de datos temporal, midiendo filas por segundo. Como
+referencia registra una muestra de estudiantes uno por uno con
+EstudianteManager.registrar_estudiante (una transacción por estudiante).
+
+Uso:
+    python -m benchmarks.bench_importacion --filas 10000 100000
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.estudiante_manager import EstudianteManager
+from utils.importador_estudiantes import ImportadorEstudiantes
+from benchmarks.generador import base_temporal, generar
+
+PARALELOS = ["A", "B", "C", "D"]
+
+
+def generar_csv(ruta, filas):
+    """Escribe un archivo CSV con encabezados nombre, ci, grupo y paralelo"""
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['Nombre', 'CI', 'Grupo', 'Paralelo'])
+        for i in range(filas):
+            escritor.writerow([f"Estudiante {i:06d}", f"{1000000 + i}", f"Grupo {i % 8 + 1}", PARALELOS[i % len(PARALELOS)]])
+
+
+def generar_xlsx(ruta, filas):
+    """Escribe el mismo contenido que generar_csv en un XLSX (modo write-only)"""
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(['Nombre', 'CI', 'Grupo', 'Paralelo'])
+    for i in range(filas):
+        hoja.append([f"Estudiante {i:06d}", 1000000 + i, f"Grupo {i % 8 + 1}", PARALELOS[i % len(PARALELOS)]])
+    libro.save(ruta)
+
+
+@contextlib.contextmanager
+def preparar_bd(directorio, nombre):
+    """Crea una base de datos temporal con una materia y sus paralelos, sin estudiantes"""
+    with base_temporal(os.path.join(directorio, f"{nombre}.db")):
+        datos = generar(materias=1, paralelos=len(PARALELOS), estudiantes=0, laboratorios=0)
+        yield datos['materias'][0], datos['paralelos'][0]
+
+
+def medir_importacion(ruta, directorio):
+    """Importa un archivo en una base de datos nueva y retorna el reporte"""
+    with preparar_bd(directorio, os.path.basename(ruta)) as (materia_id, _):
+        return ImportadorEstudiantes.importar(ruta, materia_id=materia_id)
+
+
+def medir_uno_por_uno(filas, directorio):
+    """Registra estudiantes uno por uno y retorna filas por segundo"""
+    with preparar_bd(directorio, "uno_por_uno") as (_, paralelo_id):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(filas):
+                EstudianteManager.registrar_estudiante(f"Estudiante {i:06d}", f"{1000000 + i}", paralelo_id, f"Grupo {i % 8 + 1}")
+        return filas / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide la importación masiva de estudiantes")
+    parser.add_argument("--filas", type=int, nargs="*", default=[10000, 100000])
+    parser.add_argument("--formatos", nargs="*", default=["csv", "xlsx"])
+    parser.add_argument("--muestra", type=int, default=2000,
+                        help="Estudiantes registrados uno por uno como referencia")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix="away_bench_")
+    generadores = {'csv': generar_csv, 'xlsx': generar_xlsx}
+    try:
+        print("=== Benchmark de importación de estudiantes ===")
+        if args.muestra:
+            print(f"Referencia uno por uno ({args.muestra} estudiantes): "
+                  f"{medir_uno_por_uno(args.muestra, directorio):.1f} filas/s")
+        print()
+        print(f"{'Formato':8s} | {'Filas':>8s} | {'Importadas':>10s} | {'Segundos':>8s} | {'Filas/s':>10s}")
+        print("-" * 56)
+
+        for filas in args.filas:
+            for formato in args.formatos:
+                ruta = os.path.join(directorio, f"estudiantes_{filas}.{formato}")
+                generadores[formato](ruta, filas)
+                reporte = medir_importacion(ruta, directorio)
+                if not reporte['success']:
+                    print(f"{formato:8s} | {filas:8d} | {reporte['mensaje']}")
+                    continue
+                print(f"{formato:8s} | {filas:8d} | {reporte['insertados']:10d} | "
+                      f"{reporte['duracion']:8.2f} | {reporte['insertados'] / reporte['duracion']:10.1f}")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark del recálculo incremental de estadísticas.
+
+Llena una base temporal, deja en EstadisticasIncrementales las estadísticas
+y matrices de todos los paralelos y las estadísticas de laboratorios de
+todas las materias (un tablero completo) y compara, después de cada tipo
+de escritura, recalcular todo contra EstadisticasIncrementales.actualizar().
+
+Uso:
+    python -m benchmarks.bench_incremental --escala grande
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.paralelo import Paralelo
+from models.estudiante import Estudiante
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
+from models.cambios import ultimo_cambio
+from models.recalculo import EstadisticasIncrementales
+from managers.calificacion_manager import CalificacionManager
+from managers.estudiante_manager import EstudianteManager
+from benchmarks.generador import ESCALAS, base_temporal, generar
+
+
+def recalcular_todo(datos):
+    """Recalcula el tablero completo como se haría sin registro de cambios"""
+    for paralelo in Paralelo.select().where(Paralelo.id.in_(datos['paralelos'])):
+        Calificacion.estadisticas_paralelo(paralelo)
+        Calificacion.matriz_calificaciones_paralelo(paralelo)
+    for materia_id in datos['materias']:
+        Laboratorio.estadisticas_materia(materia_id)
+
+
+def llenar_tablero(servicio, datos):
+    """Pide al servicio todo lo que mostraría un tablero completo"""
+    for paralelo_id in datos['paralelos']:
+        servicio.estadisticas_paralelo(paralelo_id)
+        servicio.matriz_paralelo(paralelo_id)
+    for materia_id in datos['materias']:
+        servicio.estadisticas_laboratorios(materia_id)
+
+
+def escrituras(datos):
+    """Retorna [(nombre, función)] con las escrituras a aplicar en orden"""
+    paralelo_id = datos['paralelos'][0]
+    laboratorio_id = datos['laboratorios'][0]
+    ids = [est_id for (est_id,) in (Estudiante.select(Estudiante.id)
+                                     .where(Estudiante.id_paralelo == paralelo_id)
+                                     .order_by(Estudiante.id).tuples())]
+    return [
+        ("una calificación", lambda: CalificacionManager.actualizar_calificacion(
+            Calificacion.select(Calificacion.id).where(Calificacion.id_estudiante == ids[0]).scalar(), 77)),
+        ("un laboratorio de un paralelo",
+         lambda: CalificacionManager.calificar_por_lotes(laboratorio_id, {est_id: 60.0 for est_id in ids})),
+        ("cambio de grupo", lambda: EstudianteManager.organizar_grupos_automatico(
+            paralelo_id, estudiantes_por_grupo=4, estrategia='equilibrado')),
+        ("eliminar un estudiante", lambda: EstudianteManager.eliminar_estudiante(ids[-1], forzar=True)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el recálculo completo con el incremental")
+    parser.add_argument("--escala", default='grande', choices=list(ESCALAS))
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    with base_temporal():
+        datos = generar(semilla=args.semilla, **ESCALAS[args.escala])
+        print("=== Benchmark de recálculo incremental ===")
+        print(f"[{args.escala}] {datos['estudiantes']} estudiantes, {datos['calificaciones']} calificaciones, "
+              f"{len(datos['paralelos'])} paralelos, {ultimo_cambio()} cambios registrados")
+
+        servicio = EstadisticasIncrementales()
+        inicio = time.perf_counter()
+        llenar_tablero(servicio, datos)
+        print(f"Tablero inicial: {(time.perf_counter() - inicio) * 1000:9.1f} ms")
+        print()
+
+        for nombre, escribir in escrituras(datos):
+            with contextlib.redirect_stdout(io.StringIO()):
+                escribir()
+
+            inicio = time.perf_counter()
+            recalcular_todo(datos)
+            completo = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            resultado = servicio.actualizar()
+            incremental = time.perf_counter() - inicio
+
+            print(f"{nombre:30s} completo {completo * 1000:9.1f} ms   incremental {incremental * 1000:8.1f} ms "
+                  f"({resultado['paralelos']} paralelos, {resultado['laboratorios']} laboratorios)")
+
+
+if __name__ == "__main__":
+    main()
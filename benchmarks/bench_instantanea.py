@@ -0,0 +1,99 @@
+"""
+Benchmark de la instantánea columnar de calificaciones.
+
+Compara, sobre una base temporal, tres formas de obtener promedios,
+tasas de aprobación y medianas por estudiante, laboratorio, paralelo y
+materia:
+
+- por objeto: instancias de Model fila por fila (promedio_calificaciones()
+  de cada estudiante y laboratorio, y las notas agrupadas en Python)
+- SQL agregado: las consultas agrupadas actuales de los modelos
+- instantánea: una consulta a arreglos de NumPy y reducciones vectorizadas
+  (construcción incluida y reutilizando una ya construida)
+
+Uso:
+    python -m benchmarks.bench_instantanea --escala grande
+"""
+
+import argparse
+import os
+import statistics
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.materia import Materia
+from models.paralelo import Paralelo
+from models.estudiante import Estudiante
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
+from models.instantanea import AGRUPACIONES, InstantaneaCalificaciones
+from benchmarks.bench_escalado import cronometrar
+from benchmarks.generador import ESCALAS, base_temporal, generar
+
+
+def por_objeto():
+    """Agregados recorriendo instancias de Model"""
+    for estudiante in Estudiante.select(Estudiante, Paralelo).join(Paralelo):
+        estudiante.promedio_calificaciones()
+    for laboratorio in Laboratorio.select():
+        laboratorio.promedio_calificaciones()
+
+    notas = defaultdict(list)
+    for calificacion in (Calificacion.select(Calificacion, Estudiante, Laboratorio)
+                         .join(Estudiante).switch(Calificacion).join(Laboratorio)):
+        if calificacion.calificacion is None:
+            continue
+        notas[('laboratorio', calificacion.id_laboratorio.id)].append(calificacion.calificacion)
+        notas[('paralelo', calificacion.id_estudiante.id_paralelo_id)].append(calificacion.calificacion)
+        notas[('materia', calificacion.id_laboratorio.id_materia_id)].append(calificacion.calificacion)
+    return {clave: (statistics.mean(valores), statistics.median(valores),
+                    sum(v >= 51 for v in valores) / len(valores))
+            for clave, valores in notas.items()}
+
+
+def sql_agregado():
+    """Agregados con las consultas agrupadas de los modelos"""
+    Estudiante.promedios_calificaciones()
+    for materia in Materia.select():
+        Laboratorio.estadisticas_materia(materia)
+    for paralelo in Paralelo.select():
+        Calificacion.estadisticas_paralelo(paralelo)
+
+
+def instantanea(construida=None):
+    """Agregados con la instantánea (construyéndola si no se pasa una)"""
+    instantanea = construida or InstantaneaCalificaciones.construir()
+    return {por: instantanea.resumen(por) for por in AGRUPACIONES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la instantánea columnar con el código por objeto")
+    parser.add_argument("--escala", default='grande', choices=list(ESCALAS))
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    with base_temporal():
+        datos = generar(semilla=args.semilla, **ESCALAS[args.escala])
+        print("=== Benchmark de la instantánea de calificaciones ===")
+        print(f"[{args.escala}] {datos['estudiantes']} estudiantes, {datos['calificaciones']} calificaciones")
+        print()
+
+        construida = InstantaneaCalificaciones.construir()
+        mediciones = {
+            'por objeto': cronometrar(por_objeto, 1),
+            'SQL agregado': cronometrar(sql_agregado, args.repeticiones),
+            'construir instantánea': cronometrar(InstantaneaCalificaciones.construir, args.repeticiones),
+            'instantánea (con construcción)': cronometrar(instantanea, args.repeticiones),
+            'instantánea (reutilizada)': cronometrar(lambda: instantanea(construida), args.repeticiones),
+        }
+
+    base = mediciones['por objeto']['mediana']
+    for nombre, medicion in mediciones.items():
+        print(f"{nombre:32s} {medicion['mediana'] * 1000:10.1f} ms  (x{base / medicion['mediana']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
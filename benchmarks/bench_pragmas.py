@@ -0,0 +1,147 @@
+"""
+Benchmark de los perfiles de pragmas de SQLite (models.database.PERFILES_SQLITE).
+
+Por cada perfil genera un conjunto de datos sintético (benchmarks.generador)
+en un archivo temporal y mide:
+- escritura: notas guardadas una por una, cada una en su propia transacción
+  (como lo hacen las interfaces)
+- lectura: matrices de calificaciones por segundo
+- concurrencia: lecturas completadas por varios hilos mientras otro hilo guarda
+  notas, y cuántas fallaron con "database is locked"
+
+Uso:
+    python -m benchmarks.bench_pragmas --paralelos 4 --estudiantes 500 --laboratorios 12
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from peewee import OperationalError
+from models.database import PERFILES_SQLITE
+from models.paralelo import Paralelo
+from models.calificacion import Calificacion
+from benchmarks.generador import base_temporal, generar
+
+
+def medir_escritura(ids_calificaciones, cantidad, rnd):
+    """Guarda notas una por una y retorna escrituras por segundo"""
+    inicio = time.perf_counter()
+    for _ in range(cantidad):
+        (Calificacion.update(calificacion=round(rnd.uniform(0, 100), 1))
+         .where(Calificacion.id == rnd.choice(ids_calificaciones))
+         .execute())
+    return cantidad / (time.perf_counter() - inicio)
+
+
+def medir_lectura(paralelos, repeticiones):
+    """Genera matrices de calificaciones y retorna matrices por segundo"""
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        Calificacion.matriz_calificaciones_paralelo(paralelos[i % len(paralelos)])
+    return repeticiones / (time.perf_counter() - inicio)
+
+
+def medir_concurrencia(db, paralelos, ids_calificaciones, hilos_lectores, segundos):
+    """Ejecuta lectores y un escritor al mismo tiempo y cuenta operaciones y bloqueos"""
+    resultados = {'lecturas': 0, 'escrituras': 0, 'bloqueos': 0}
+    candado = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def lector(semilla):
+        rnd = random.Random(semilla)
+        while time.perf_counter() < fin:
+            try:
+                Calificacion.estadisticas_paralelo(rnd.choice(paralelos))
+                clave = 'lecturas'
+            except OperationalError:
+                clave = 'bloqueos'
+            with candado:
+                resultados[clave] += 1
+        db.close()
+
+    def escritor():
+        rnd = random.Random(0)
+        while time.perf_counter() < fin:
+            try:
+                with db.atomic():
+                    for _ in range(20):
+                        (Calificacion.update(calificacion=round(rnd.uniform(0, 100), 1))
+                         .where(Calificacion.id == rnd.choice(ids_calificaciones))
+                         .execute())
+                clave = 'escrituras'
+            except OperationalError:
+                clave = 'bloqueos'
+            with candado:
+                resultados[clave] += 1
+        db.close()
+
+    hilos = [threading.Thread(target=lector, args=(i,)) for i in range(hilos_lectores)]
+    hilos.append(threading.Thread(target=escritor))
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    resultados['lecturas_por_segundo'] = resultados['lecturas'] / segundos
+    resultados['escrituras_por_segundo'] = resultados['escrituras'] / segundos
+    return resultados
+
+
+def ejecutar_perfil(perfil, args):
+    """Ejecuta todas las mediciones con un perfil en una base de datos temporal"""
+    directorio = tempfile.mkdtemp(prefix="away_bench_")
+    try:
+        with base_temporal(os.path.join(directorio, "bench.db"), perfil) as db:
+            generar(materias=1, paralelos=args.paralelos, estudiantes=args.estudiantes,
+                    laboratorios=args.laboratorios)
+
+            paralelos = list(Paralelo.select())
+            ids_calificaciones = [cal_id for (cal_id,) in Calificacion.select(Calificacion.id).tuples()]
+            rnd = random.Random(1)
+
+            resultado = {
+                'perfil': perfil,
+                'escrituras_por_segundo': medir_escritura(ids_calificaciones, args.escrituras, rnd),
+                'matrices_por_segundo': medir_lectura(paralelos, args.lecturas),
+            }
+            resultado['concurrencia'] = medir_concurrencia(db, paralelos, ids_calificaciones,
+                                                           args.hilos, args.segundos)
+            return resultado
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los perfiles de pragmas de SQLite")
+    parser.add_argument("--paralelos", type=int, default=4)
+    parser.add_argument("--estudiantes", type=int, default=500, help="Estudiantes por paralelo")
+    parser.add_argument("--laboratorios", type=int, default=12)
+    parser.add_argument("--escrituras", type=int, default=300, help="Notas guardadas una por una")
+    parser.add_argument("--lecturas", type=int, default=20, help="Matrices generadas")
+    parser.add_argument("--hilos", type=int, default=4, help="Hilos lectores en la prueba concurrente")
+    parser.add_argument("--segundos", type=float, default=3.0, help="Duración de la prueba concurrente")
+    parser.add_argument("--perfiles", nargs="*", default=list(PERFILES_SQLITE))
+    args = parser.parse_args()
+
+    total_notas = args.paralelos * args.estudiantes * args.laboratorios
+    print(f"=== Benchmark de perfiles SQLite ({total_notas} calificaciones) ===")
+    print(f"{'Perfil':12s} | {'Escrit./s':>10s} | {'Matrices/s':>10s} | {'Lect. conc./s':>13s} | {'Escrit. conc./s':>15s} | {'Bloqueos':>8s}")
+    print("-" * 85)
+
+    for perfil in args.perfiles:
+        r = ejecutar_perfil(perfil, args)
+        c = r['concurrencia']
+        print(f"{perfil:12s} | {r['escrituras_por_segundo']:10.1f} | {r['matrices_por_segundo']:10.1f} | "
+              f"{c['lecturas_por_segundo']:13.1f} | {c['escrituras_por_segundo']:15.1f} | {c['bloqueos']:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Generador determinista de datos sintéticos para los benchmarks.
+
+Crea una base de datos temporal (archivo o en memoria) con el esquema
+completo de la aplicación, incluidas las migraciones (índices, tablas de
+resumen y sus triggers), y la llena con materias, paralelos, estudiantes,
+laboratorios y calificaciones. Con la misma escala y semilla siempre se
+generan los mismos datos.
+
+Uso desde otro benchmark:
+
+    with base_temporal() as db:
+        datos = generar(**ESCALAS['mediana'])
+        ...
+"""
+
+import random
+from contextlib import contextmanager
+
+from peewee import SqliteDatabase, chunked
+from models.database import PERFILES_SQLITE
+from models.materia import Materia
+from models.paralelo import Paralelo
+from models.estudiante import Estudiante
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
+from models.migraciones import VersionEsquema, aplicar_migraciones
+from models.resumen import ResumenEstudiante, ResumenLaboratorio, ResumenParalelo
+from models.cambios import RegistroCambio
+
+# Modelos de la aplicación (se crean con create_tables)
+MODELOS_BASE = [Materia, Paralelo, Estudiante, Laboratorio, Calificacion]
+
+# Todos los modelos que deben apuntar a la base temporal, incluidas las
+# tablas que crean las migraciones
+MODELOS = MODELOS_BASE + [VersionEsquema, ResumenEstudiante, ResumenLaboratorio, ResumenParalelo,
+                          RegistroCambio]
+
+# Escalas predefinidas: materias, paralelos por materia, estudiantes por
+# paralelo, laboratorios por materia y fracción de notas registradas
+ESCALAS = {
+    'pequena': {'materias': 2, 'paralelos': 2, 'estudiantes': 40, 'laboratorios': 8, 'densidad': 0.9},
+    'mediana': {'materias': 4, 'paralelos': 3, 'estudiantes': 150, 'laboratorios': 12, 'densidad': 0.9},
+    'grande': {'materias': 8, 'paralelos': 4, 'estudiantes': 400, 'laboratorios': 15, 'densidad': 0.9},
+}
+
+TAMANO_LOTE = 100
+
+
+def crear_bd(ruta=None, perfil='rendimiento'):
+    """
+    Crea la base de datos de un benchmark.
+
+    Args:
+        ruta (str): Archivo de la base de datos (None para usar una en memoria)
+        perfil (str): Perfil de pragmas de PERFILES_SQLITE
+
+    Returns:
+        SqliteDatabase: Base de datos sin tablas
+    """
+    return SqliteDatabase(ruta or ':memory:', pragmas=PERFILES_SQLITE[perfil])
+
+
+def preparar_esquema(db):
+    """Crea las tablas y aplica las migraciones en la base ya vinculada a MODELOS"""
+    db.create_tables(MODELOS_BASE)
+    aplicar_migraciones()
+
+
+@contextmanager
+def base_temporal(ruta=None, perfil='rendimiento'):
+    """
+    Vincula todos los modelos a una base temporal con el esquema completo.
+
+    Args:
+        ruta (str): Archivo de la base de datos (None para usar una en memoria)
+        perfil (str): Perfil de pragmas de PERFILES_SQLITE
+
+    Yields:
+        SqliteDatabase: La base de datos vinculada
+    """
+    db = crear_bd(ruta, perfil)
+    with db.bind_ctx(MODELOS):
+        preparar_esquema(db)
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+def generar(materias=1, paralelos=4, estudiantes=500, laboratorios=12, densidad=1.0, semilla=42):
+    """
+    Llena la base vinculada con datos sintéticos.
+
+    Las notas se insertan por lotes dentro de una transacción; los
+    triggers de resumen se mantienen al día igual que en la aplicación.
+
+    Args:
+        materias (int): Cantidad de materias
+        paralelos (int): Paralelos por materia
+        estudiantes (int): Estudiantes por paralelo
+        laboratorios (int): Laboratorios por materia
+        densidad (float): Fracción de pares estudiante/laboratorio con nota (0 a 1)
+        semilla (int): Semilla del generador aleatorio
+
+    Returns:
+        dict: IDs de materias, paralelos y laboratorios, y totales de
+        estudiantes y calificaciones
+    """
+    rnd = random.Random(semilla)
+    datos = {'materias': [], 'paralelos': [], 'laboratorios': [], 'estudiantes': 0, 'calificaciones': 0}
+
+    with Materia._meta.database.atomic():
+        for m in range(materias):
+            materia = Materia.create(materia=f"MATERIA SINTETICA {m + 1}", sigla=f"BEN-{m + 1:04d}")
+            datos['materias'].append(materia.id)
+
+            labs = [Laboratorio.create(numero=i + 1, titulo=f"LABORATORIO {i + 1}", id_materia=materia,
+                                       puntaje_maximo=100)
+                    for i in range(laboratorios)]
+            datos['laboratorios'] += [lab.id for lab in labs]
+
+            for p in range(paralelos):
+                paralelo = Paralelo.create(paralelo=chr(ord('A') + p) if p < 26 else f"P{p + 1}",
+                                           id_materia=materia, docente_teoria=f"DOCENTE {p + 1}")
+                datos['paralelos'].append(paralelo.id)
+
+                filas = [{'nombre': f"ESTUDIANTE {m + 1}-{p + 1}-{i:05d}",
+                          'ci': f"{m + 1:02d}{p + 1:02d}{i:06d}",
+                          'id_paralelo': paralelo.id,
+                          'grupo': f"GRUPO {i // 5 + 1}"}
+                         for i in range(estudiantes)]
+                for lote in chunked(filas, TAMANO_LOTE):
+                    Estudiante.insert_many(lote).execute()
+                datos['estudiantes'] += estudiantes
+
+                ids = [est_id for (est_id,) in (Estudiante.select(Estudiante.id)
+                                                 .where(Estudiante.id_paralelo == paralelo)
+                                                 .order_by(Estudiante.id).tuples())]
+                notas = [{'id_estudiante': est_id, 'id_laboratorio': lab.id,
+                          'calificacion': round(rnd.uniform(0, 100), 1)}
+                         for est_id in ids for lab in labs if rnd.random() < densidad]
+                for lote in chunked(notas, TAMANO_LOTE):
+                    Calificacion.insert_many(lote).execute()
+                datos['calificaciones'] += len(notas)
+
+    return datos
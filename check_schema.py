@@ -11,6 +11,7 @@ import sqlite3
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from models.database import DB_PATH
+from models.migraciones import MIGRACIONES
 
 def check_database_schema():
     print("=== Checking Database Schema ===")
@@ -41,6 +42,24 @@ def check_database_schema():
     table_sql = cursor.fetchone()
     if table_sql:
         print(f"Table SQL: {table_sql[0]}")
+
+    print("\nChecking schema migrations:")
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version';")
+    if cursor.fetchone():
+        cursor.execute("SELECT version, descripcion, fecha_aplicacion FROM schema_version ORDER BY version;")
+        for version in cursor.fetchall():
+            print(f"  Version: {version}")
+    else:
+        print("  No schema_version table (run inicializar_bd to apply migrations)")
+
+    print("\nChecking query plans:")
+    for migracion in MIGRACIONES:
+        if 'verificacion' not in migracion:
+            continue
+        sql, parametros = migracion['verificacion']
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)
+        plan = " | ".join(fila[-1] for fila in cursor.fetchall())
+        print(f"  [{migracion['version']}] {plan}")
     
     conn.close()
 
@@ -5,13 +5,16 @@ Interfaz de consola para el Sistema de gestión de laboratorios.
 import os
 import sys
 
-from models.database import inicializar_bd, cerrar_bd
+from models.database import inicializar_bd, cerrar_bd, describir_perfil, PERFIL_BD
 from managers.materia_manager import MateriaManager
 from managers.paralelo_manager import ParaleloManager
 from managers.estudiante_manager import EstudianteManager
 from managers.laboratorio_manager import LaboratorioManager
 from managers.calificacion_manager import CalificacionManager
+from models.instrumentacion import instrumentar_clase
 
+# Los menús contienen los bucles de entrada, se mide cada acción por separado
+@instrumentar_clase(excluir=('ejecutar', 'menu_', 'mostrar_menu', 'obtener_opcion', 'procesar_opcion'))
 class InterfazConsola:
     """
     Interfaz principal de consola del sistema.
@@ -30,6 +33,8 @@ class InterfazConsola:
 
             # Inicializar base de datos
             inicializar_bd()
+            pragmas = describir_perfil()
+            print(f"[INFO] Base de datos con perfil '{PERFIL_BD}' (journal: {pragmas['journal_mode']}, synchronous: {pragmas['synchronous']})")
 
             while self.running:
                 self.mostrar_menu_principal()
@@ -270,7 +275,7 @@ class InterfazConsola:
         """ Muestra las estadísticas de materias """
         print()
         print("--- Estadísticas de Materias ---")
-        materias = MateriaManager.listar_materias()
+        materias = MateriaManager.obtener_estadisticas_generales()['materias']
         if not materias:
             print("No hay materias registradas.")
             return
@@ -280,9 +285,8 @@ class InterfazConsola:
         print("Sigla     | Paralelos          | Estudiantes        | Laboratorios")
         print("-"*50)
 
-        for materia in materias:
-            stats = materia.estadisticas_completas()
-            print(f"{materia.sigla:10s} | {stats['paralelos']:5d} | {stats['estudiantes']:5d} | {stats['laboratorios']:5d}")
+        for stats in materias:
+            print(f"{stats['sigla']:10s} | {stats['paralelos']:5d} | {stats['estudiantes']:5d} | {stats['laboratorios']:5d}")
 
 
     # ===========================================================
@@ -515,6 +519,7 @@ class InterfazConsola:
             print("4. Actualizar Estudiante")
             print("5. Eliminar Estudiante")            
             print("6. Estadísticas de paralelo")
+            print("7. Importar estudiantes (CSV/Excel)")
             print("0. Volver al menú principal")
 
             opcion = self.obtener_opcion()
@@ -531,6 +536,8 @@ class InterfazConsola:
                 self.eliminar_estudiante()
             elif opcion == "6":                
                 self.estadisticas_estudiantes_paralelo()
+            elif opcion == "7":
+                self.importar_estudiantes()
             elif opcion == "0":
                 break
             else:
@@ -584,6 +591,45 @@ class InterfazConsola:
         except ValueError:
             print("[ERROR] ID de paralelo no válido")
     
+    def importar_estudiantes(self):
+        """ Importa estudiantes desde un archivo CSV o Excel """
+        from utils.importador_estudiantes import ImportadorEstudiantes
+
+        print("")
+        print("--- Importar Estudiantes ---")
+        print("El archivo debe tener los encabezados Nombre y CI (opcionales: Grupo y Paralelo).")
+
+        materias = MateriaManager.listar_materias()
+        if not materias:
+            print("[ERROR] No hay materias registradas. Debe registrar una materia primero.")
+            return
+
+        print("\nEstructura de Materias:")
+        for materia in materias:
+            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            print(f"ID: {materia.id} - {materia.sigla} | {materia.materia}")
+            for paralelo in paralelos:
+                print(f"    ID: {paralelo.id} - Paralelo: {paralelo.paralelo}")
+
+        ruta = input("\nRuta del archivo (.csv o .xlsx): ").strip().strip('"')
+        if not os.path.isfile(ruta):
+            print("[ERROR] No existe el archivo indicado.")
+            return
+
+        try:
+            destino = input("ID del paralelo (vacío para usar la columna Paralelo del archivo): ").strip()
+            if destino:
+                reporte = ImportadorEstudiantes.importar(ruta, paralelo_id=int(destino))
+            else:
+                materia_id = int(input("ID de la materia: "))
+                reporte = ImportadorEstudiantes.importar(ruta, materia_id=materia_id)
+        except ValueError:
+            print("[ERROR] ID no válido")
+            return
+
+        print()
+        print(ImportadorEstudiantes.formatear_reporte(reporte))
+
     def listar_estudiantes_por_paralelo(self):
         """ Lista estudiantes de un paralelo específico """
         print("\n--- Listar Estudiantes por Paralelo ---")
@@ -622,9 +668,10 @@ class InterfazConsola:
             print("ID | CI                | Nombre                 | Grupo              | Promedio")
             print("-"*80)
 
+            promedios = EstudianteManager.obtener_promedios(paralelo_id=paralelo_id)
             for estudiante in estudiantes:
                 grupo_str = estudiante.grupo if estudiante.grupo else "Sin Grupo"
-                promedio = estudiante.promedio_calificaciones()
+                promedio = promedios.get(estudiante.id, 0.0)
                 print(f"{estudiante.id:2d} | {estudiante.ci:10s} | {estudiante.nombre:20s} | {grupo_str:10s} | {promedio:5.2f}")
 
         except ValueError:
@@ -862,7 +909,10 @@ class InterfazConsola:
             print("[ERROR] ID de la materia no válido")
     
     def listar_laboratorios_por_materia(self):
-        """ Lista Laboratorios de una materia específica """
+        """
+        Lista Laboratorios de una materia específica.
+        Retorna las estadísticas de los laboratorios listados ({laboratorio_id: estadísticas}).
+        """
 
         print("\n--- Listar Laboratorios por Materia ---")
 
@@ -885,11 +935,16 @@ class InterfazConsola:
                 print("No hay laboratorios registrados en esta materia.")
                 return
             
+            estadisticas = LaboratorioManager.obtener_estadisticas_materia(materia_id)
+
             print("\n--- Laboratorios ---")
-            print("ID | Num | Titulo                         | Puntaje     | Calificaciones")
-            print("-"*80)
+            print("ID | Num | Titulo                         | Puntaje     | Calificaciones | Completitud")
+            print("-"*95)
             for laboratorio in laboratorios:
-                print(f"{laboratorio.id:2d} | {laboratorio.numero:2d} | {laboratorio.titulo:20s} | {laboratorio.puntaje_maximo:5.2f} | {laboratorio.contar_calificaciones():13d}")
+                stats = estadisticas.get(laboratorio.id, {})
+                print(f"{laboratorio.id:2d} | {laboratorio.numero:2d} | {laboratorio.titulo:20s} | {laboratorio.puntaje_maximo:5.2f} | {stats.get('calificaciones_registradas', 0):13d} | {stats.get('tasa_completitud', 0.0):9.2f}%")
+
+            return estadisticas
         
         except ValueError:
             print("[ERROR] ID de materia no válido")
@@ -992,8 +1047,8 @@ class InterfazConsola:
         """ Muestra estadísticas de un laboratorio específico """
         print("\n--- Estadísticas de Laboratorio ---")
 
-        # Primero listar por materia
-        self.listar_laboratorios_por_materia()
+        # Primero listar por materia (calcula las estadísticas de todos sus laboratorios)
+        estadisticas = self.listar_laboratorios_por_materia() or {}
 
         try:
             laboratorio_id = int(input("\nID del laboratorio: "))
@@ -1003,7 +1058,7 @@ class InterfazConsola:
                 print("[ERROR] No existe laboratorio con ese ID.")
                 return
             
-            stats = laboratorio.estadisticas_detalladas()
+            stats = estadisticas.get(laboratorio.id) or laboratorio.estadisticas_detalladas()
             print(f"\n--- Estadísticas: {laboratorio} ---")
             print(f"Total Calificaciones: {stats['total_calificaciones']}")
             print(f"Promedio general: {stats['promedio']:.2f}")
@@ -1011,6 +1066,7 @@ class InterfazConsola:
             print(f"Nota mínima: {stats['nota_minima']:.2f}")
             print(f"Aprobados: {stats['aprobados']}")
             print(f"Reprobados: {stats['reprobados']}")
+            print(f"Completitud: {stats['tasa_completitud']:.2f}%")
 
             if stats['total_calificaciones'] > 0:
                 porcentaje_aprobacion = (stats['aprobados'] / stats['total_calificaciones'])*100
@@ -1357,7 +1413,7 @@ class InterfazConsola:
             print("Ejemplo: 123456789, 10.0")
             print("Ingrese 'fin' para finalizar.")
 
-            calificaciones_dict = {}
+            lineas = []
             while True:
                 entrada = input("\nIngrese CI, calificacion (fin para finalizar): ").strip()
 
@@ -1369,22 +1425,21 @@ class InterfazConsola:
                     continue
 
                 try:
-                    ci, calificacion_str = entrada.split(',')
-                    ci = ci.strip()
-                    calificacion = float(calificacion_str.strip())
-
-                    # Verificar que el estudiante existe
-                    estudiante = EstudianteManager.buscar_por_ci(ci)
-                    if not estudiante:
-                        print(f"[ERROR] No existe estudiante con CI {ci}")
-                        continue
-                    
-                    calificaciones_dict[estudiante.id] = calificacion
-                    print(f"[OK] Calificando {estudiante.nombre} con {calificacion}")
-            
+                    float(entrada.split(',', 1)[1].strip())
                 except ValueError:
                     print("[ERROR] Calificacion no válida")
                     continue
+
+                lineas.append(entrada)
+
+            # Resolver todos los CIs juntos contra la materia del laboratorio
+            lote = CalificacionManager.preparar_lote_por_ci(laboratorio_id, lineas)
+            for error in lote['errores']:
+                print(f"[ERROR] {error}")
+
+            calificaciones_dict = lote['calificaciones']
+            for estudiante_id, calificacion in calificaciones_dict.items():
+                print(f"[OK] Calificando {lote['estudiantes'][estudiante_id].nombre} con {calificacion}")
             
             if not calificaciones_dict:
                 print("[ERROR] No se ingresaron calificaciones")
@@ -1396,7 +1451,7 @@ class InterfazConsola:
                 print("Operacion Cancelada")
                 return
             
-            resultado = CalificacionManager.calificar_por_lote(laboratorio_id, calificaciones_dict)
+            resultado = CalificacionManager.calificar_por_lotes(laboratorio_id, calificaciones_dict)
 
             if resultado['success']:
                 print(f"[OK] {resultado['mensaje']}")
@@ -1657,8 +1712,17 @@ class InterfazConsola:
             print(f"Total de paralelos: {stats['total_paralelos']}")
             print(f"Total de estudiantes: {stats['total_estudiantes']}")
             print(f"Total de laboratorios: {stats['total_laboratorios']}")
+            print(f"Total de calificaciones: {stats['total_calificaciones']}")
             if 'promedio_estudiantes_por_materia' in stats:
                 print(f"Promedio de estudiantes por materia: {stats['promedio_estudiantes_por_materia']:.2f}")
+
+            if stats['materias']:
+                print()
+                print("Sigla      | Paralelos | Estudiantes | Laboratorios | Calificaciones")
+                print("-"*70)
+                for materia in stats['materias']:
+                    print(f"{materia['sigla']:10s} | {materia['paralelos']:9d} | {materia['estudiantes']:11d} | "
+                          f"{materia['laboratorios']:12d} | {materia['calificaciones']:14d}")
             
         except Exception as e:
             print(f"[ERROR] No se pudieron obtener las estadísticas: {e}")
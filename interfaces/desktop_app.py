@@ -6,17 +6,137 @@ Utiliza Tkinter para crear una interfaz gráfica completa con todos los CRUDs.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import os
+import queue
+import threading
 from datetime import datetime
 
-from models.database import inicializar_bd, cerrar_bd
+from models.database import inicializar_bd, cerrar_bd, sesion_bd
 from models.paralelo import Paralelo
 from managers.materia_manager import MateriaManager
 from managers.paralelo_manager import ParaleloManager
 from managers.estudiante_manager import EstudianteManager
 from managers.laboratorio_manager import LaboratorioManager
 from managers.calificacion_manager import CalificacionManager
-from utils.pdf_exporter import PDFExporter
+from models.instrumentacion import instrumentar_clase
 
+# Filas por página en las tablas de estudiantes y calificaciones
+TAMANO_PAGINA_TABLAS = 200
+
+# Filas insertadas en un Treeview por cada vuelta del bucle de Tk y
+# milisegundos entre revisiones del resultado del hilo de trabajo
+TAMANO_BLOQUE_TABLA = 50
+INTERVALO_CARGA_MS = 20
+
+
+class CargadorTabla:
+    """
+    Llena un Treeview sin bloquear la ventana.
+
+    La consulta corre en un hilo de trabajo con su propia conexión
+    (sesion_bd) y las filas se insertan de a TAMANO_BLOQUE_TABLA por vez con
+    root.after, así la ventana sigue respondiendo mientras se llena la tabla.
+    Empezar otra carga (por ejemplo al cambiar de paralelo) o llamar a
+    cancelar() descarta la carga en curso: el resultado de una consulta ya
+    iniciada se ignora cuando llega.
+
+    obtener() se ejecuta en el hilo de trabajo y debe retornar un diccionario
+    con 'filas' (lista de tuplas de valores); no debe tocar widgets.
+    al_recibir(resultado) y al_terminar(resultado) se ejecutan en el hilo de
+    Tk, antes de insertar la primera fila y después de la última; si
+    al_recibir retorna False no se inserta nada.
+    """
+
+    def __init__(self, root, tree, al_progresar=None, tamano_bloque=TAMANO_BLOQUE_TABLA):
+        self.root = root
+        self.tree = tree
+        self.al_progresar = al_progresar
+        self.tamano_bloque = tamano_bloque
+        self._generacion = 0
+        self._pendiente = None
+
+    def cargar(self, obtener, al_recibir=None, al_terminar=None, descripcion="filas"):
+        """Vacía la tabla y empieza una carga nueva (cancela la anterior)"""
+        self.cancelar()
+        generacion = self._generacion
+        self.vaciar()
+        self._progreso(f"Cargando {descripcion}...")
+
+        resultados = queue.Queue(maxsize=1)
+
+        def trabajar():
+            try:
+                with sesion_bd():
+                    resultados.put((obtener(), None))
+            except Exception as e:
+                resultados.put((None, e))
+
+        threading.Thread(target=trabajar, name=f"carga-{descripcion}", daemon=True).start()
+        self._programar(self._esperar, generacion, resultados, al_recibir, al_terminar, descripcion)
+
+    def cancelar(self):
+        """Descarta la carga en curso (las filas ya insertadas quedan)"""
+        self._generacion += 1
+        if self._pendiente is not None:
+            try:
+                self.root.after_cancel(self._pendiente)
+            except tk.TclError:
+                pass
+            self._pendiente = None
+
+    def vaciar(self):
+        """Elimina todas las filas de la tabla"""
+        filas = self.tree.get_children()
+        if filas:
+            self.tree.delete(*filas)
+
+    @property
+    def cargando(self):
+        return self._pendiente is not None
+
+    def _programar(self, funcion, *args):
+        self._pendiente = self.root.after(INTERVALO_CARGA_MS, funcion, *args)
+
+    def _progreso(self, mensaje):
+        if self.al_progresar:
+            self.al_progresar(mensaje)
+
+    def _esperar(self, generacion, resultados, al_recibir, al_terminar, descripcion):
+        """Revisa si el hilo de trabajo terminó (en el hilo de Tk)"""
+        self._pendiente = None
+        if generacion != self._generacion:
+            return
+        try:
+            resultado, error = resultados.get_nowait()
+        except queue.Empty:
+            self._programar(self._esperar, generacion, resultados, al_recibir, al_terminar, descripcion)
+            return
+
+        if error is not None:
+            self._progreso(f"Error al cargar {descripcion}")
+            messagebox.showerror("Error", f"Error al cargar {descripcion}: {error}")
+            return
+        if al_recibir and al_recibir(resultado) is False:
+            return
+        self._insertar(generacion, resultado, 0, al_terminar, descripcion)
+
+    def _insertar(self, generacion, resultado, inicio, al_terminar, descripcion):
+        """Inserta un bloque de filas y programa el siguiente"""
+        self._pendiente = None
+        if generacion != self._generacion:
+            return
+
+        filas = resultado['filas']
+        fin = min(inicio + self.tamano_bloque, len(filas))
+        for valores in filas[inicio:fin]:
+            self.tree.insert('', tk.END, values=valores)
+
+        if fin < len(filas):
+            self._progreso(f"Cargando {descripcion}... {fin}/{len(filas)}")
+            self._programar(self._insertar, generacion, resultado, fin, al_terminar, descripcion)
+        elif al_terminar:
+            al_terminar(resultado)
+
+@instrumentar_clase(excluir=('ejecutar',))
 class MainDesktopApp:
     """Aplicación principal desktop del sistema de laboratorios"""
     
@@ -29,6 +149,10 @@ class MainDesktopApp:
         # Variables de control
         self.current_module = None
         
+        # Página mostrada en las tablas paginadas: {tabla: {'id', 'pagina', 'inicio'}}
+        self.paginacion = {}
+        self.barras_paginacion = {}
+        
         # Configurar cierre
         self.root.protocol("WM_DELETE_WINDOW", self.cerrar_aplicacion)
         
@@ -278,6 +402,7 @@ class MainDesktopApp:
         toolbar.pack(fill=tk.X, padx=10, pady=5)
         
         ttk.Button(toolbar, text="Nuevo Estudiante", command=self.nuevo_estudiante).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Importar", command=self.importar_estudiantes).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Editar", command=self.editar_estudiante).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Eliminar", command=self.eliminar_estudiante).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Organizar Grupos", command=self.organizar_grupos).pack(side=tk.LEFT, padx=5)
@@ -310,6 +435,9 @@ class MainDesktopApp:
         self.tree_estudiantes.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.tree_estudiantes.bind('<Double-1>', lambda e: self.editar_estudiante())
         
+        self.crear_barra_paginacion(frame, 'estudiantes', self.cargar_estudiantes)
+        self.cargador_estudiantes = CargadorTabla(self.root, self.tree_estudiantes, self.actualizar_estado)
+        
         # Cargar paralelos en combo
         self.cargar_combo_paralelos_estudiantes()
     
@@ -398,6 +526,9 @@ class MainDesktopApp:
         self.tree_calificaciones.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.tree_calificaciones.bind('<Double-1>', lambda e: self.editar_calificacion())
         
+        self.crear_barra_paginacion(frame, 'calificaciones', self.cargar_calificaciones)
+        self.cargador_calificaciones = CargadorTabla(self.root, self.tree_calificaciones, self.actualizar_estado)
+        
         # Cargar laboratorios en combo
         self.cargar_combo_laboratorios_calificaciones()
     
@@ -471,10 +602,11 @@ class MainDesktopApp:
     # MÉTODOS DEL DASHBOARD
     # ==========================================
     
-    def actualizar_dashboard(self):
-        """Actualiza el dashboard con estadísticas actuales"""
+    def actualizar_dashboard(self, stats=None):
+        """Actualiza el dashboard con estadísticas actuales (o las ya obtenidas)"""
         try:
-            stats = MateriaManager.obtener_estadisticas_generales()
+            if stats is None:
+                stats = MateriaManager.obtener_estadisticas_generales()
             
             # Limpiar frame de métricas
             for widget in self.metrics_frame.winfo_children():
@@ -531,21 +663,22 @@ class MainDesktopApp:
             for item in self.tree_materias.get_children():
                 self.tree_materias.delete(item)
             
-            # Cargar datos
-            materias = MateriaManager.listar_materias()
+            # Cargar datos (los conteos vienen de las estadísticas generales)
+            stats = MateriaManager.obtener_estadisticas_generales()
+            materias = stats['materias']
             
             for materia in materias:
                 self.tree_materias.insert('', tk.END, values=(
-                    materia.id,
-                    materia.sigla,
-                    materia.materia,
-                    materia.contar_paralelos(),
-                    materia.contar_estudiantes_total(),
-                    materia.contar_laboratorios()
+                    materia['id'],
+                    materia['sigla'],
+                    materia['materia'],
+                    materia['paralelos'],
+                    materia['estudiantes'],
+                    materia['laboratorios']
                 ))
             
             self.actualizar_estado(f"{len(materias)} materias cargadas")
-            self.actualizar_dashboard()
+            self.actualizar_dashboard(stats)
             
         except Exception as e:
             messagebox.showerror("Error", f"Error al cargar materias: {e}")
@@ -615,15 +748,17 @@ class MainDesktopApp:
             
             # Buscar materias
             materias = MateriaManager.buscar_materias(termino)
+            conteos = {m['id']: m for m in MateriaManager.obtener_estadisticas_generales()['materias']}
             
             for materia in materias:
+                conteo = conteos.get(materia.id, {})
                 self.tree_materias.insert('', tk.END, values=(
                     materia.id,
                     materia.sigla,
                     materia.materia,
-                    materia.contar_paralelos(),
-                    materia.contar_estudiantes_total(),
-                    materia.contar_laboratorios()
+                    conteo.get('paralelos', 0),
+                    conteo.get('estudiantes', 0),
+                    conteo.get('laboratorios', 0)
                 ))
             
             self.actualizar_estado(f"{len(materias)} materias encontradas")
@@ -803,32 +938,37 @@ class MainDesktopApp:
                     if paralelo:
                         self.cargar_estudiantes(paralelo.id)
     
-    def cargar_estudiantes(self, paralelo_id=None):
-        """Carga estudiantes de un paralelo"""
-        try:
-            # Limpiar tabla
-            for item in self.tree_estudiantes.get_children():
-                self.tree_estudiantes.delete(item)
-            
-            if not paralelo_id:
-                return
-            
-            estudiantes = EstudianteManager.listar_por_paralelo(paralelo_id)
-            
-            for estudiante in estudiantes:
-                self.tree_estudiantes.insert('', tk.END, values=(
-                    estudiante.id,
-                    estudiante.ci,
-                    estudiante.nombre,
-                    estudiante.grupo or "Sin asignar",
-                    estudiante.contar_calificaciones(),
-                    f"{estudiante.promedio_calificaciones():.2f}"
-                ))
-            
-            self.actualizar_estado(f"{len(estudiantes)} estudiantes cargados")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar estudiantes: {e}")
+    def cargar_estudiantes(self, paralelo_id=None, despues=None, antes=None):
+        """Carga una página de estudiantes de un paralelo (sin ID recarga el paralelo actual)"""
+        paralelo_id = paralelo_id or self.paginacion.get('estudiantes', {}).get('id')
+        if not paralelo_id:
+            self.cargador_estudiantes.cancelar()
+            self.cargador_estudiantes.vaciar()
+            return
+        
+        def obtener():
+            # Hilo de trabajo: la página, los conteos y los promedios en consultas por lote
+            pagina = EstudianteManager.listar_por_paralelo_paginado(
+                paralelo_id, TAMANO_PAGINA_TABLAS, despues=despues, antes=antes)
+            estudiantes = pagina['elementos']
+            conteos = EstudianteManager.obtener_conteos_calificaciones([e.id for e in estudiantes])
+            promedios = EstudianteManager.obtener_promedios(paralelo_id=paralelo_id)
+            filas = [(
+                estudiante.id,
+                estudiante.ci,
+                estudiante.nombre,
+                estudiante.grupo or "Sin asignar",
+                conteos.get(estudiante.id, 0),
+                f"{promedios.get(estudiante.id, 0.0):.2f}"
+            ) for estudiante in estudiantes]
+            return {'pagina': pagina, 'filas': filas}
+        
+        self.cargador_estudiantes.cargar(
+            obtener,
+            al_recibir=lambda r: self.mostrar_pagina('estudiantes', paralelo_id, r['pagina'], despues, antes),
+            al_terminar=lambda r: self.actualizar_estado(f"{r['pagina']['total']} estudiantes en el paralelo"),
+            descripcion="estudiantes"
+        )
     
     def nuevo_estudiante(self):
         """Abre formulario para nuevo estudiante"""
@@ -936,7 +1076,54 @@ class MainDesktopApp:
                             self.cargar_estudiantes(paralelo.id)
                         else:
                             messagebox.showerror("Error", resultado['mensaje'])
-    
+
+    def importar_estudiantes(self):
+        """Importa estudiantes desde un archivo CSV o Excel al paralelo seleccionado"""
+        from utils.importador_estudiantes import ImportadorEstudiantes
+
+        seleccion = self.combo_estudiantes_paralelo.get()
+        if not seleccion or seleccion == "Seleccione un paralelo...":
+            messagebox.showwarning("Advertencia", "Seleccione un paralelo primero")
+            return
+
+        parts = seleccion.split(' - Paralelo ')
+        if len(parts) != 2:
+            return
+        materia = MateriaManager.obtener_materia_por_sigla(parts[0])
+        paralelo = Paralelo.obtener_por_materia_paralelo(materia.id, parts[1]) if materia else None
+        if not paralelo:
+            return
+
+        ruta = filedialog.askopenfilename(
+            title="Importar estudiantes",
+            filetypes=[("Archivos de estudiantes", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if not ruta:
+            return
+
+        # Sí: todo al paralelo seleccionado. No: según la columna Paralelo del archivo
+        destino = messagebox.askyesnocancel(
+            "Importar estudiantes",
+            f"¿Importar todos los estudiantes al paralelo {paralelo.paralelo}?\n\n"
+            f"Elija 'No' para usar la columna Paralelo del archivo (materia {materia.sigla})."
+        )
+        if destino is None:
+            return
+
+        self.actualizar_estado("Importando estudiantes...")
+        if destino:
+            reporte = ImportadorEstudiantes.importar(ruta, paralelo_id=paralelo.id)
+        else:
+            reporte = ImportadorEstudiantes.importar(ruta, materia_id=materia.id)
+
+        texto = ImportadorEstudiantes.formatear_reporte(reporte, max_errores=10)
+        if reporte['success']:
+            messagebox.showinfo("Importación completada", texto)
+            self.cargar_estudiantes(paralelo.id)
+        else:
+            messagebox.showerror("Error", texto)
+        self.actualizar_estado(reporte['mensaje'])
+
     def buscar_estudiantes(self, event=None):
         """Busca estudiantes por CI"""
         ci = self.search_estudiantes_var.get().strip()
@@ -958,7 +1145,8 @@ class MainDesktopApp:
         try:
             estudiante = EstudianteManager.buscar_por_ci(ci)
             
-            # Limpiar tabla
+            # Limpiar tabla (y descartar la página que se estuviera cargando)
+            self.cargador_estudiantes.cancelar()
             for item in self.tree_estudiantes.get_children():
                 self.tree_estudiantes.delete(item)
             
@@ -1034,6 +1222,7 @@ class MainDesktopApp:
                 return
             
             laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia_id)
+            estadisticas = LaboratorioManager.obtener_estadisticas_materia(materia_id)
             
             for lab in laboratorios:
                 self.tree_laboratorios.insert('', tk.END, values=(
@@ -1042,7 +1231,7 @@ class MainDesktopApp:
                     lab.titulo,
                     lab.descripcion[:50] + "..." if lab.descripcion and len(lab.descripcion) > 50 else (lab.descripcion or ""),
                     f"{lab.puntaje_maximo:.1f}",
-                    lab.contar_calificaciones()
+                    estadisticas.get(lab.id, {}).get('calificaciones_registradas', 0)
                 ))
             
             self.actualizar_estado(f"{len(laboratorios)} laboratorios cargados")
@@ -1163,26 +1352,26 @@ class MainDesktopApp:
                                 self.cargar_calificaciones(lab.id)
                                 break
     
-    def cargar_calificaciones(self, laboratorio_id=None):
-        """Carga calificaciones de un laboratorio"""
-        try:
-            # Limpiar tabla
-            for item in self.tree_calificaciones.get_children():
-                self.tree_calificaciones.delete(item)
-            
-            if not laboratorio_id:
-                return
-            
-            calificaciones = CalificacionManager.obtener_calificaciones_laboratorio(laboratorio_id)
-            
-            for cal in calificaciones:
+    def cargar_calificaciones(self, laboratorio_id=None, despues=None, antes=None):
+        """Carga una página de calificaciones de un laboratorio (sin ID recarga el laboratorio actual)"""
+        laboratorio_id = laboratorio_id or self.paginacion.get('calificaciones', {}).get('id')
+        if not laboratorio_id:
+            self.cargador_calificaciones.cancelar()
+            self.cargador_calificaciones.vaciar()
+            return
+        
+        def obtener():
+            # Hilo de trabajo: la página ya trae al estudiante de cada calificación
+            pagina = CalificacionManager.obtener_calificaciones_laboratorio_paginado(
+                laboratorio_id, TAMANO_PAGINA_TABLAS, despues=despues, antes=antes)
+            filas = []
+            for cal in pagina['elementos']:
                 estudiante = cal.id_estudiante
                 nota_str = f"{cal.calificacion:.1f}" if cal.calificacion else "Sin nota"
                 estado = cal.estado_aprobacion()
                 fecha = cal.fecha_registro.strftime("%d/%m/%Y")
                 observaciones = cal.observaciones[:30] + "..." if cal.observaciones and len(cal.observaciones) > 30 else (cal.observaciones or "")
-                
-                self.tree_calificaciones.insert('', tk.END, values=(
+                filas.append((
                     cal.id,
                     estudiante.ci,
                     estudiante.nombre,
@@ -1191,11 +1380,14 @@ class MainDesktopApp:
                     fecha,
                     observaciones
                 ))
-            
-            self.actualizar_estado(f"{len(calificaciones)} calificaciones cargadas")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar calificaciones: {e}")
+            return {'pagina': pagina, 'filas': filas}
+        
+        self.cargador_calificaciones.cargar(
+            obtener,
+            al_recibir=lambda r: self.mostrar_pagina('calificaciones', laboratorio_id, r['pagina'], despues, antes),
+            al_terminar=lambda r: self.actualizar_estado(f"{r['pagina']['total']} calificaciones en el laboratorio"),
+            descripcion="calificaciones"
+        )
     
     def nueva_calificacion(self):
         """Abre formulario para nueva calificación"""
@@ -1384,14 +1576,13 @@ DETALLE POR MATERIA:
 {'=' * 60}
 """
             
-            materias = MateriaManager.listar_materias()
-            for materia in materias:
-                stats_materia = materia.estadisticas_completas()
+            for stats_materia in stats['materias']:
                 info += f"""
-{materia.sigla} - {materia.materia}
+{stats_materia['sigla']} - {stats_materia['materia']}
   Paralelos: {stats_materia['paralelos']}
   Estudiantes: {stats_materia['estudiantes']}
   Laboratorios: {stats_materia['laboratorios']}
+  Calificaciones: {stats_materia['calificaciones']}
 """
             
             self.info_text.config(state=tk.NORMAL)
@@ -1420,6 +1611,7 @@ DETALLE POR MATERIA:
                     paralelo = Paralelo.obtener_por_materia_paralelo(materia.id, paralelo_nombre)
                     if paralelo:
                         self.actualizar_estado("Generando PDF...")
+                        from utils.pdf_exporter import PDFExporter
                         archivo = PDFExporter.generar_reporte_paralelo(paralelo.id)
                         
                         if archivo:
@@ -1457,7 +1649,7 @@ DETALLE POR MATERIA:
             if materia:
                 paralelo = ParaleloManager.obtener_por_materia_paralelo(materia.id, paralelo_nombre)
                 if paralelo:
-                    MatrizCalificacionesDialog(self.root, paralelo.id)
+                    MatrizCalificacionesDialog(self.root, paralelo.id, self.actualizar_estado)
     
     def ver_estadisticas_paralelo(self):
         """Muestra estadísticas del paralelo seleccionado"""
@@ -1484,7 +1676,7 @@ DETALLE POR MATERIA:
     def callback_matriz(self, paralelo_id):
         """Callback para mostrar matriz"""
         if paralelo_id:
-            MatrizCalificacionesDialog(self.root, paralelo_id)
+            MatrizCalificacionesDialog(self.root, paralelo_id, self.actualizar_estado)
     
     # ==========================================
     # MÉTODOS AUXILIARES
@@ -1498,6 +1690,60 @@ DETALLE POR MATERIA:
         self.cargar_combo_laboratorios_calificaciones()
         self.cargar_combo_paralelos_reportes()
     
+    def crear_barra_paginacion(self, frame, tabla, cargar):
+        """
+        Crea los botones Anterior/Siguiente debajo de una tabla paginada.
+
+        Args:
+            frame: Contenedor de la tabla
+            tabla (str): Nombre de la tabla en self.paginacion
+            cargar (callable): cargar(id, despues=..., antes=...) de la tabla
+        """
+        barra = ttk.Frame(frame)
+        barra.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        def pagina_anterior():
+            estado = self.paginacion.get(tabla)
+            if estado and estado['pagina']['anterior']:
+                cargar(estado['id'], antes=estado['pagina']['anterior'])
+        
+        def pagina_siguiente():
+            estado = self.paginacion.get(tabla)
+            if estado and estado['pagina']['siguiente']:
+                cargar(estado['id'], despues=estado['pagina']['siguiente'])
+        
+        boton_anterior = ttk.Button(barra, text="< Anterior", command=pagina_anterior, state='disabled')
+        boton_anterior.pack(side=tk.LEFT, padx=5)
+        etiqueta = ttk.Label(barra, text="")
+        etiqueta.pack(side=tk.LEFT, padx=10)
+        boton_siguiente = ttk.Button(barra, text="Siguiente >", command=pagina_siguiente, state='disabled')
+        boton_siguiente.pack(side=tk.LEFT, padx=5)
+        
+        self.barras_paginacion[tabla] = (boton_anterior, etiqueta, boton_siguiente)
+    
+    def mostrar_pagina(self, tabla, id_origen, pagina, despues=None, antes=None):
+        """Guarda la página cargada y actualiza su barra de paginación"""
+        anterior = self.paginacion.get(tabla)
+        inicio = 0
+        if anterior and anterior['id'] == id_origen:
+            if despues is not None:
+                inicio = anterior['inicio'] + len(anterior['pagina']['elementos'])
+            elif antes is not None:
+                inicio = max(0, anterior['inicio'] - len(pagina['elementos']))
+        if pagina['anterior'] is None:
+            inicio = 0
+        
+        self.paginacion[tabla] = {'id': id_origen, 'pagina': pagina, 'inicio': inicio}
+        
+        boton_anterior, etiqueta, boton_siguiente = self.barras_paginacion[tabla]
+        cantidad = len(pagina['elementos'])
+        if cantidad:
+            etiqueta.config(text=f"{inicio + 1}-{inicio + cantidad} de {pagina['total']}")
+        else:
+            etiqueta.config(text=f"0 de {pagina['total']}")
+        boton_anterior.config(state='normal' if pagina['anterior'] else 'disabled')
+        boton_siguiente.config(state='normal' if pagina['siguiente'] else 'disabled')
+    
     def actualizar_estado(self, mensaje):
         """Actualiza la barra de estado"""
         self.status_label.config(text=mensaje)
@@ -1548,6 +1794,8 @@ DETALLE POR MATERIA:
     def cerrar_aplicacion(self):
         """Cierra la aplicación"""
         if messagebox.askyesno("Confirmar Salida", "¿Está seguro que desea cerrar el sistema?"):
+            self.cargador_estudiantes.cancelar()
+            self.cargador_calificaciones.cancelar()
             cerrar_bd()
             self.root.destroy()
     
@@ -2197,6 +2445,7 @@ class FormularioCalificacionDialog:
         if self.callback:
             self.callback(False)
 
+@instrumentar_clase
 class CalificacionLotesDialog:
     """Diálogo para calificar por lotes"""
     
@@ -2281,34 +2530,10 @@ class CalificacionLotesDialog:
             messagebox.showerror("Error", "Debe ingresar al menos una calificación")
             return
         
-        lineas = [linea.strip() for linea in texto.split('\n') if linea.strip()]
-        calificaciones_dict = {}
-        errores = []
-        
-        for i, linea in enumerate(lineas, 1):
-            if ',' not in linea:
-                errores.append(f"Línea {i}: Formato incorrecto")
-                continue
-            
-            try:
-                ci, calificacion_str = linea.split(',', 1)
-                ci = ci.strip()
-                calificacion = float(calificacion_str.strip())
-                
-                # Verificar estudiante
-                estudiante = EstudianteManager.buscar_por_ci(ci)
-                if not estudiante:
-                    errores.append(f"Línea {i}: No existe estudiante con CI {ci}")
-                    continue
-                
-                calificaciones_dict[estudiante.id] = calificacion
-                
-            except ValueError:
-                errores.append(f"Línea {i}: La calificación debe ser un número")
-                continue
-            except Exception as e:
-                errores.append(f"Línea {i}: {e}")
-                continue
+        # Todos los CIs se resuelven en una sola consulta contra la materia del laboratorio
+        lote = CalificacionManager.preparar_lote_por_ci(self.laboratorio_id, texto)
+        calificaciones_dict = lote['calificaciones']
+        errores = lote['errores']
         
         if not calificaciones_dict:
             messagebox.showerror("Error", "No hay calificaciones válidas para procesar")
@@ -2330,6 +2555,7 @@ class CalificacionLotesDialog:
             if resultado['success']:
                 mensaje_resultado = f"Procesamiento completado:\n"
                 mensaje_resultado += f"- Calificaciones exitosas: {resultado['exitosas']}\n"
+                mensaje_resultado += f"  ({resultado['creadas']} nuevas, {resultado['actualizadas']} actualizadas)\n"
                 
                 if resultado['errores']:
                     mensaje_resultado += f"- Errores: {len(resultado['errores'])}\n\n"
@@ -2356,11 +2582,13 @@ class CalificacionLotesDialog:
         if self.callback:
             self.callback(False)
 
+@instrumentar_clase
 class MatrizCalificacionesDialog:
     """Diálogo para mostrar matriz de calificaciones"""
     
-    def __init__(self, parent, paralelo_id):
+    def __init__(self, parent, paralelo_id, al_progresar=None):
         self.paralelo_id = paralelo_id
+        self.al_progresar = al_progresar
         
         # Crear ventana
         self.dialog = tk.Toplevel(parent)
@@ -2411,6 +2639,7 @@ class MatrizCalificacionesDialog:
         
         matriz_frame.grid_rowconfigure(0, weight=1)
         matriz_frame.grid_columnconfigure(0, weight=1)
+        self.cargador = CargadorTabla(self.dialog, self.tree, self.al_progresar)
         
         # Botones
         btn_frame = ttk.Frame(main_frame)
@@ -2424,25 +2653,50 @@ class MatrizCalificacionesDialog:
     
     def cargar_matriz(self):
         """Carga la matriz de calificaciones"""
-        try:
-            paralelo = ParaleloManager.obtener_paralelo(self.paralelo_id)
-            if not paralelo:
-                return
-            
+        paralelo_id = self.paralelo_id
+        
+        def obtener():
+            # Hilo de trabajo: la matriz se arma con una cantidad fija de consultas
             from models.calificacion import Calificacion
             from models.laboratorio import Laboratorio
             
-            # Obtener matriz y laboratorios
+            paralelo = ParaleloManager.obtener_paralelo(paralelo_id)
+            if not paralelo:
+                return {'laboratorios': [], 'filas': []}
+            
             matriz = Calificacion.matriz_calificaciones_paralelo(paralelo)
-            laboratorios = list(Laboratorio.obtener_por_materia(paralelo.id_materia))
+            laboratorios = [lab.numero for lab in Laboratorio.obtener_por_materia(paralelo.id_materia)]
+            
+            filas = []
+            for fila in matriz:
+                valores = [
+                    fila['ci'],
+                    fila['estudiante'],
+                    fila['grupo'] or 'Sin asignar'
+                ]
+                
+                # Agregar calificaciones por laboratorio
+                for numero in laboratorios:
+                    cal = fila['calificaciones'].get(f'lab_{numero}')
+                    if cal is not None:
+                        valores.append(f"{cal:.0f}")
+                    else:
+                        valores.append("--")
+                
+                # Agregar promedio
+                valores.append(f"{fila['promedio']:.1f}")
+                filas.append(valores)
             
-            if not matriz or not laboratorios:
+            return {'laboratorios': laboratorios, 'filas': filas}
+        
+        def configurar_columnas(resultado):
+            if not resultado['filas'] or not resultado['laboratorios']:
                 messagebox.showinfo("Información", "No hay datos de calificaciones disponibles")
-                return
+                return False
             
             # Configurar columnas
             columnas = ['CI', 'Estudiante', 'Grupo']
-            columnas.extend([f'Lab {lab.numero}' for lab in laboratorios])
+            columnas.extend([f'Lab {numero}' for numero in resultado['laboratorios']])
             columnas.append('Promedio')
             
             self.tree['columns'] = columnas
@@ -2456,33 +2710,17 @@ class MatrizCalificacionesDialog:
                     self.tree.column(col, width=200)
                 else:
                     self.tree.column(col, width=60)
-            
-            # Insertar datos
-            for fila in matriz:
-                valores = [
-                    fila['ci'],
-                    fila['estudiante'],
-                    fila['grupo'] or 'Sin asignar'
-                ]
-                
-                # Agregar calificaciones por laboratorio
-                for lab in laboratorios:
-                    cal = fila['calificaciones'].get(f'lab_{lab.numero}')
-                    if cal is not None:
-                        valores.append(f"{cal:.0f}")
-                    else:
-                        valores.append("--")
-                
-                # Agregar promedio
-                valores.append(f"{fila['promedio']:.1f}")
-                
-                self.tree.insert('', tk.END, values=valores)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar matriz: {e}")
+        
+        def terminar(resultado):
+            if self.al_progresar:
+                self.al_progresar(f"Matriz cargada: {len(resultado['filas'])} estudiantes")
+        
+        self.cargador.cargar(obtener, al_recibir=configurar_columnas, al_terminar=terminar,
+                             descripcion="matriz de calificaciones")
     
     def exportar_pdf(self):
         """Exporta la matriz a PDF"""
+        from utils.pdf_exporter import PDFExporter
         try:
             archivo = PDFExporter.generar_reporte_paralelo(self.paralelo_id)
             if archivo:
@@ -2494,8 +2732,10 @@ class MatrizCalificacionesDialog:
     
     def cerrar(self):
         """Cierra el diálogo"""
+        self.cargador.cancelar()
         self.dialog.destroy()
 
+@instrumentar_clase
 class EstadisticasGeneralesDialog:
     """Diálogo para mostrar estadísticas generales"""
     
@@ -2549,7 +2789,7 @@ class EstadisticasGeneralesDialog:
         """Carga las estadísticas del sistema"""
         try:
             stats = MateriaManager.obtener_estadisticas_generales()
-            materias = MateriaManager.listar_materias()
+            materias = stats['materias']
             
             contenido = f"""ESTADÍSTICAS GENERALES DEL SISTEMA
 {'=' * 60}
@@ -2567,13 +2807,12 @@ PROMEDIOS:
 DETALLE POR MATERIA:
 {'=' * 60}
 
-Sigla      | Materia                  | Par | Est | Lab
+Sigla      | Materia                  | Par | Est | Lab | Calif
 {'-' * 60}
 """
             
-            for materia in materias:
-                stats_materia = materia.estadisticas_completas()
-                contenido += f"{stats_materia['sigla']:10s} | {materia.materia[:23]:23s} | {stats_materia['paralelos']:3d} | {stats_materia['estudiantes']:3d} | {stats_materia['laboratorios']:3d}\n"
+            for stats_materia in materias:
+                contenido += f"{stats_materia['sigla']:10s} | {stats_materia['materia'][:23]:23s} | {stats_materia['paralelos']:3d} | {stats_materia['estudiantes']:3d} | {stats_materia['laboratorios']:3d} | {stats_materia['calificaciones']:5d}\n"
             
             contenido += f"\n\nReporte generado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
             
@@ -14,10 +14,13 @@ from models.calificacion import Calificacion
 from models.laboratorio import Laboratorio
 from managers.materia_manager import MateriaManager
 from managers.paralelo_manager import ParaleloManager
-from managers.estudiante_manager import EstudianteManager
+from managers.estudiante_manager import EstudianteManager, ESTRATEGIAS_GRUPOS
 from managers.laboratorio_manager import LaboratorioManager
 from managers.calificacion_manager import CalificacionManager
-from utils.pdf_exporter import PDFExporter
+
+# Filas que se agregan a una tabla paginada cada vez que el cursor llega cerca del final
+TAMANO_PAGINA_TABLAS = 100
+MARGEN_CARGA = 10
 
 class MenuPrincipal(Screen):
     """
@@ -71,13 +74,18 @@ class MenuPrincipal(Screen):
     def on_ready(self):
         """ Se ejecuta cuando la pantalla esta lista """
         self.title = "AWAY - Sistema de Gestión de Laboratorios"
-        self.actualizar_dashboard()
-        self.cargar_tabla_materias()
+        try:
+            stats = MateriaManager.obtener_estadisticas_generales()
+        except Exception:
+            stats = None
+        self.actualizar_dashboard(stats)
+        self.cargar_tabla_materias(stats)
     
-    def actualizar_dashboard(self):
+    def actualizar_dashboard(self, stats=None):
         """ Actualiza las estadísticas del dashboard """
         try: 
-            stats = MateriaManager.obtener_estadisticas_generales()
+            if stats is None:
+                stats = MateriaManager.obtener_estadisticas_generales()
 
             stats_text = f"""
             Resumen del Sistema
@@ -93,20 +101,24 @@ class MenuPrincipal(Screen):
             stats_display = self.query_one("#stats-display", Static)
             stats_display.update(f"Error al cargar estadísticas: {e}")
     
-    def cargar_tabla_materias(self):
+    def cargar_tabla_materias(self, stats=None):
         """ Carga la tabla de materias en el Dashboard """
         try:
             tabla = self.query_one("#tabla-materias", DataTable)
             tabla.clear(columns=True)
 
-            tabla.add_columns("Sigla", "Materia", "Paralelos", "Estudiantes")
-            materias = MateriaManager.listar_materias()
-            for materia in materias:
+            if stats is None:
+                stats = MateriaManager.obtener_estadisticas_generales()
+
+            tabla.add_columns("Sigla", "Materia", "Paralelos", "Estudiantes", "Laboratorios", "Calificaciones")
+            for materia in stats['materias']:
                 tabla.add_row(
-                    materia.sigla,
-                    materia.materia,
-                    materia.contar_paralelos(),
-                    materia.contar_estudiantes_total()
+                    materia['sigla'],
+                    materia['materia'],
+                    materia['paralelos'],
+                    materia['estudiantes'],
+                    materia['laboratorios'],
+                    materia['calificaciones']
                 )
         
         except Exception as e:
@@ -184,16 +196,16 @@ class MateriasScreen(Screen):
         tabla.clear(columns=True)
 
         tabla.add_columns("ID", "Sigla", "Materia", "Paralelos",  "Estudiantes")
-        materias = MateriaManager.listar_materias()
+        materias = MateriaManager.obtener_estadisticas_generales()['materias']
 
         for materia in materias:
             tabla.add_row(
-                str(materia.id),
-                materia.sigla,
-                materia.materia,
-                str(materia.contar_paralelos()),
-                str(materia.contar_estudiantes_total()),
-                key=str(materia.id)
+                str(materia['id']),
+                materia['sigla'],
+                materia['materia'],
+                str(materia['paralelos']),
+                str(materia['estudiantes']),
+                key=str(materia['id'])
             )
 
     def on_button_pressed(self, event: Button.Pressed):
@@ -446,24 +458,41 @@ class EstudiantesScreen(Screen):
         select.set_options(opciones)
     
     def cargar_estudiantes(self, paralelo_id):
-        """ Carga estudiantes de un paralelo """
+        """ Carga la primera página de estudiantes de un paralelo """
         tabla = self.query_one("#tabla-estudiantes", DataTable)
         tabla.clear(columns=True)
 
         tabla.add_columns("ID", "CI","Nombre", "Grupo", "Promedio")
 
-        estudiantes = EstudianteManager.listar_por_paralelo(paralelo_id)
+        self.paralelo_id = paralelo_id
+        self.siguiente = None
+        self.promedios = EstudianteManager.obtener_promedios(paralelo_id=paralelo_id)
+        self.cargar_pagina_estudiantes()
+
+    def cargar_pagina_estudiantes(self):
+        """ Agrega a la tabla la página siguiente de estudiantes """
+        tabla = self.query_one("#tabla-estudiantes", DataTable)
+        pagina = EstudianteManager.listar_por_paralelo_paginado(
+            self.paralelo_id, TAMANO_PAGINA_TABLAS, despues=self.siguiente)
 
-        for estudiante in estudiantes:
+        for estudiante in pagina['elementos']:
             tabla.add_row(
                 str(estudiante.id),
                 estudiante.ci,
                 estudiante.nombre,
                 estudiante.grupo or "Sin asignar",
-                f"{estudiante.promedio_calificaciones():.2f}",
+                f"{self.promedios.get(estudiante.id, 0.0):.2f}",
                 key=str(estudiante.id)
             )
 
+        self.siguiente = pagina['siguiente']
+        self.sub_title = f"{tabla.row_count} de {pagina['total']} estudiantes"
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
+        """ Carga la página siguiente al acercarse al final de la tabla """
+        if getattr(self, 'siguiente', None) and event.cursor_row >= event.data_table.row_count - MARGEN_CARGA:
+            self.cargar_pagina_estudiantes()
+
     def on_select_changed(self, event: Select.Changed):
         """ Maneja cambio de paralelo """
         if event.value is not None:
@@ -588,17 +617,21 @@ class LaboratoriosScreen(Screen):
         """ Carga laboratorios de una materia """
         tabla = self.query_one("#tabla-laboratorios", DataTable)
         tabla.clear(columns=True)
-        tabla.add_columns("ID", "Num", "Titulo", "Puntaje", "Calificaciones")
+        tabla.add_columns("ID", "Num", "Titulo", "Puntaje", "Calificaciones", "Promedio", "Completitud")
 
         laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia_id)
+        estadisticas = LaboratorioManager.obtener_estadisticas_materia(materia_id)
 
         for laboratorio in laboratorios:
+            stats = estadisticas.get(laboratorio.id, {})
             tabla.add_row(
                 str(laboratorio.id),
                 str(laboratorio.numero),
                 laboratorio.titulo,
                 f"{laboratorio.puntaje_maximo:.2f}",
-                str(laboratorio.contar_calificaciones()),
+                str(stats.get('calificaciones_registradas', 0)),
+                f"{stats.get('promedio', 0.0):.2f}",
+                f"{stats.get('tasa_completitud', 0.0):.1f}%",
                 key=str(laboratorio.id)
             )
         
@@ -731,15 +764,23 @@ class CalificacionesScreen(Screen):
         select.set_options(opciones)
     
     def cargar_calificaciones(self, laboratorio_id):
-        """ Carga calificaciones de un laboratorio """
+        """ Carga la primera página de calificaciones de un laboratorio """
         tabla = self.query_one("#tabla-calificaciones", DataTable)
         tabla.clear(columns=True)
 
         tabla.add_columns("ID", "CI", "Estudiante", "Calificacion", "Estado")
 
-        calificaciones = CalificacionManager.obtener_calificaciones_laboratorio(laboratorio_id)
+        self.laboratorio_id = laboratorio_id
+        self.siguiente = None
+        self.cargar_pagina_calificaciones()
+
+    def cargar_pagina_calificaciones(self):
+        """ Agrega a la tabla la página siguiente de calificaciones """
+        tabla = self.query_one("#tabla-calificaciones", DataTable)
+        pagina = CalificacionManager.obtener_calificaciones_laboratorio_paginado(
+            self.laboratorio_id, TAMANO_PAGINA_TABLAS, despues=self.siguiente)
 
-        for calificacion in calificaciones:
+        for calificacion in pagina['elementos']:
             estudiante = calificacion.id_estudiante
             nota_str = f"{calificacion.calificacion:.2f}" if calificacion.calificacion else "Sin nota"
             estado = calificacion.estado_aprobacion()
@@ -753,6 +794,14 @@ class CalificacionesScreen(Screen):
                 key=str(calificacion.id)
             )
 
+        self.siguiente = pagina['siguiente']
+        self.sub_title = f"{tabla.row_count} de {pagina['total']} calificaciones"
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
+        """ Carga la página siguiente al acercarse al final de la tabla """
+        if getattr(self, 'siguiente', None) and event.cursor_row >= event.data_table.row_count - MARGEN_CARGA:
+            self.cargar_pagina_calificaciones()
+
     def on_select_changed(self, event: Select.Changed):
         """ Maneja cambio de Laboratorio """
         if event.value is not None:
@@ -896,6 +945,7 @@ class ReportesScreen(Screen):
             self.notify("Seleccione un paralelo", severity="warning")
             return
         
+        from utils.pdf_exporter import PDFExporter
         try:
             archivo = PDFExporter.generar_reporte_paralelo(select.value)
             if archivo:
@@ -945,7 +995,7 @@ class EstadisticasScreen(Screen):
 
         try:
             stats = MateriaManager.obtener_estadisticas_generales()
-            materias = MateriaManager.listar_materias()
+            materias = stats['materias']
 
             contenido = f"""
             RESUMEN GENERAL DEL SISTEMA
@@ -959,13 +1009,12 @@ class EstadisticasScreen(Screen):
             
             DETALLE POR MATERIA
             {'=' * 50}
-            Sigla      | Materia        | Paralelos      | Estudiantes        |Labs
+            Sigla      | Materia        | Paralelos      | Estudiantes        |Labs  |Calif
             {"-" * 50}
             """
 
-            for materia in materias:
-                stats_materia = materia.estadisticas_completas()
-                contenido = contenido + f"{stats_materia['sigla']:10s} | {materia.materia[:23]:23s} | {stats_materia['paralelos']:3d} | {stats_materia['estudiantes']:3d} | {stats_materia['laboratorios']:3d}\n"
+            for stats_materia in materias:
+                contenido = contenido + f"{stats_materia['sigla']:10s} | {stats_materia['materia'][:23]:23s} | {stats_materia['paralelos']:3d} | {stats_materia['estudiantes']:3d} | {stats_materia['laboratorios']:3d} | {stats_materia['calificaciones']:5d}\n"
 
             stats_display = self.query_one("#stats-content", Static)
             stats_display.update(contenido)
@@ -1433,6 +1482,10 @@ class OrganizarGruposScreen(ModalScreen):
             yield Label("Estudiantes por grupo:")
             yield Input(placeholder="5", value="5", id="input-estudiantes")
 
+            yield Label("Estrategia:")
+            yield Select([(descripcion, clave) for clave, descripcion in ESTRATEGIAS_GRUPOS.items()],
+                         value='alfabetico', allow_blank=False, id="select-estrategia")
+
             with Horizontal():
                 yield Button("Organizar", id="btn-organizar", variant="primary")
                 yield Button("Cancelar", id="btn-cancelar")
@@ -1459,7 +1512,8 @@ class OrganizarGruposScreen(ModalScreen):
             return
 
         try:
-            resultado = EstudianteManager.organizar_grupos_automatico(self.paralelo_id, estudiantes_por_grupo)
+            estrategia = self.query_one("#select-estrategia", Select).value
+            resultado = EstudianteManager.organizar_grupos_automatico(self.paralelo_id, estudiantes_por_grupo, estrategia)
 
             if resultado['success']:
                 self.dismiss(True)
@@ -4,17 +4,22 @@ Utiliza Streamlit para crear una interfaz web con todos los CRUDs.
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import os
 
-from models.database import inicializar_bd
+from models.database import database, inicializar_bd, sesion_bd, metricas_conexiones, PERFIL_BD
+from models import instrumentacion
+from models.cache import cache_lecturas, metricas_cache
+from models.recalculo import EstadisticasIncrementales
+from models.materia import Materia
+from models.paralelo import Paralelo
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
 from managers.materia_manager import MateriaManager
 from managers.paralelo_manager import ParaleloManager
-from managers.estudiante_manager import EstudianteManager
+from managers.estudiante_manager import EstudianteManager, ESTRATEGIAS_GRUPOS
 from managers.laboratorio_manager import LaboratorioManager
 from managers.calificacion_manager import CalificacionManager
-from utils.pdf_exporter import PDFExporter
 
 # Configuración de la página
 st.set_page_config(
@@ -68,11 +73,112 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Cargadores de datos.
+# Los resultados se guardan con st.cache_data usando como clave la versión de
+# datos (models.cache): cualquier escritura de los managers, de otra sesión o
+# de otro proceso la cambia y la siguiente ejecución vuelve a leer. Streamlit
+# entrega a cada llamada una copia deserializada, así ninguna sesión modifica
+# lo que ven las demás.
+# Las estadísticas y matrices de paralelos y laboratorios vienen del servicio
+# de recálculo incremental (models.recalculo), compartido por las sesiones:
+# después de una escritura solo se recalcula lo que esta afectó.
+
+@st.cache_resource
+def recursos_compartidos():
+    """Recursos del proceso compartidos por todas las sesiones (se crean una sola vez)"""
+    inicializar_bd()
+    return {
+        'database': database,
+        'estrategias_grupos': dict(ESTRATEGIAS_GRUPOS),
+        'estadisticas': EstadisticasIncrementales(),
+    }
+
+def version_datos():
+    """Versión actual de los datos vista desde la conexión de esta ejecución"""
+    return cache_lecturas.version_datos(recursos_compartidos()['database'])
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cargar_catalogo(version):
+    """Materias con sus paralelos y laboratorios en tres consultas"""
+    materias = list(Materia.select().order_by(Materia.sigla))
+    paralelos = {}
+    for paralelo in (Paralelo.select(Paralelo, Materia).join(Materia)
+                     .order_by(Paralelo.id_materia, Paralelo.paralelo)):
+        paralelos.setdefault(paralelo.id_materia_id, []).append(paralelo)
+    laboratorios = {}
+    for laboratorio in (Laboratorio.select(Laboratorio, Materia).join(Materia)
+                        .order_by(Laboratorio.id_materia, Laboratorio.numero)):
+        laboratorios.setdefault(laboratorio.id_materia_id, []).append(laboratorio)
+    return {'materias': materias, 'paralelos': paralelos, 'laboratorios': laboratorios}
+
+def cargar_materias():
+    """Materias ordenadas por sigla"""
+    return _cargar_catalogo(version_datos())['materias']
+
+def cargar_paralelos(materia_id):
+    """Paralelos de una materia ordenados por nombre"""
+    return _cargar_catalogo(version_datos())['paralelos'].get(materia_id, [])
+
+def cargar_laboratorios(materia_id):
+    """Laboratorios de una materia ordenados por número"""
+    return _cargar_catalogo(version_datos())['laboratorios'].get(materia_id, [])
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cargar_estadisticas_generales(version):
+    return MateriaManager.obtener_estadisticas_generales()
+
+def cargar_estadisticas_generales():
+    """Estadísticas generales del sistema (ver MateriaManager.obtener_estadisticas_generales)"""
+    return _cargar_estadisticas_generales(version_datos())
+
+def cargar_estadisticas_paralelo(paralelo_id):
+    """Estadísticas de calificaciones de un paralelo (ver Calificacion.estadisticas_paralelo)"""
+    return recursos_compartidos()['estadisticas'].estadisticas_paralelo(paralelo_id)
+
+def cargar_matriz_paralelo(paralelo_id):
+    """Matriz de calificaciones de un paralelo (ver Calificacion.matriz_calificaciones_paralelo)"""
+    return recursos_compartidos()['estadisticas'].matriz_paralelo(paralelo_id)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cargar_matriz_materia(materia_id, version):
+    return CalificacionManager.matriz_calificaciones_materia(materia_id)
+
+def cargar_matriz_materia(materia_id):
+    """DataFrame con las calificaciones de toda una materia"""
+    return _cargar_matriz_materia(materia_id, version_datos())
+
+def cargar_estadisticas_laboratorios(materia_id):
+    """Estadísticas de los laboratorios de una materia por ID de laboratorio"""
+    return recursos_compartidos()['estadisticas'].estadisticas_laboratorios(materia_id)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cargar_estadisticas_estudiantes(paralelo_id, version):
+    return EstudianteManager.obtener_estadisticas_paralelo(paralelo_id)
+
+def cargar_estadisticas_estudiantes(paralelo_id):
+    """Estudiantes, grupos y promedio general de un paralelo"""
+    return _cargar_estadisticas_estudiantes(paralelo_id, version_datos())
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cargar_promedios(paralelo_id, version):
+    return EstudianteManager.obtener_promedios(paralelo_id=paralelo_id)
+
+def cargar_promedios(paralelo_id):
+    """Promedio de cada estudiante de un paralelo"""
+    return _cargar_promedios(paralelo_id, version_datos())
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cargar_distribucion(materia_id, version):
+    from utils.estadisticas import EstadisticasNotas
+    return EstadisticasNotas.obtener(materia_id=materia_id)
+
+def cargar_distribucion(materia_id=None):
+    """Distribución de notas de una materia o de todo el sistema (ver EstadisticasNotas.calcular)"""
+    return _cargar_distribucion(materia_id, version_datos())
+
 def inicializar_aplicacion():
-    """Inicializa la aplicación y la base de datos"""
-    if 'initialized' not in st.session_state:
-        inicializar_bd()
-        st.session_state.initialized = True
+    """Inicializa la aplicación y la base de datos (una vez por proceso)"""
+    recursos_compartidos()
 
 def mostrar_titulo_principal():
     """Muestra el título principal del sistema"""
@@ -102,6 +208,38 @@ def sidebar_navegacion():
         **Away - Sistema de Gestión de Laboratorios**
         - Desarrollado por: ErwinSaul
         """)
+        st.caption(f"Perfil de base de datos: {PERFIL_BD}")
+        with st.expander("Conexiones a la base de datos"):
+            metricas = metricas_conexiones()
+            st.caption(f"En uso: {metricas['en_uso']} / {metricas['max_conexiones']} - Disponibles: {metricas['disponibles']}")
+            st.caption(f"Creadas: {metricas['conexiones_creadas']} - Reutilizadas: {metricas['reutilizaciones']} ({metricas['tasa_reutilizacion']}%)")
+            st.caption(f"Esperas: {metricas['esperas']} ({metricas['tiempo_espera']} s)")
+            cache = metricas_cache()
+            if cache['activa']:
+                st.caption(f"Caché de lecturas: {cache['entradas']} / {cache['max_entradas']} - "
+                           f"Aciertos: {cache['aciertos']} ({cache['tasa_aciertos']}%) - Fallos: {cache['fallos']}")
+            else:
+                st.caption("Caché de lecturas desactivada")
+            incremental = recursos_compartidos()['estadisticas'].metricas()
+            st.caption(f"Estadísticas incrementales: {incremental['paralelos']} paralelos, "
+                       f"{incremental['materias']} materias - Cambios procesados: {incremental['cambios']} - "
+                       f"Recálculos: {incremental['paralelos_recalculados']} paralelos, "
+                       f"{incremental['laboratorios_recalculados']} laboratorios")
+        if instrumentacion.ACTIVA:
+            import pandas as pd
+            with st.expander("Consultas por acción"):
+                acciones = instrumentacion.resumen_por_accion()
+                if acciones:
+                    st.dataframe(pd.DataFrame([{
+                        'Acción': a['nombre'],
+                        'Llamadas': a['llamadas'],
+                        'Consultas': a['consultas'],
+                        'Máx': a['consultas_max'],
+                        'SQL (ms)': round(a['tiempo_sql'] * 1000, 1),
+                        'N+1': a['repetidas'],
+                    } for a in acciones]), hide_index=True)
+                else:
+                    st.caption("Sin mediciones todavía")
         
         st.markdown("---")
         st.markdown("### Sesión Actual")
@@ -112,11 +250,12 @@ def sidebar_navegacion():
 
 def mostrar_dashboard():
     """Muestra el dashboard principal"""
+    import pandas as pd
     st.header("Dashboard del Sistema")
     
     # Obtener estadísticas
     try:
-        stats = MateriaManager.obtener_estadisticas_generales()
+        stats = cargar_estadisticas_generales()
         
         # Mostrar métricas principales
         col1, col2, col3, col4 = st.columns(4)
@@ -177,18 +316,19 @@ def mostrar_dashboard():
         # Resumen de materias
         st.subheader("Materias Registradas")
         
-        materias = MateriaManager.listar_materias()
+        materias = stats.get('materias', [])
         
         if materias:
             datos = []
             for materia in materias:
                 datos.append({
-                    'ID': materia.id,
-                    'Sigla': materia.sigla,
-                    'Materia': materia.materia,
-                    'Paralelos': materia.contar_paralelos(),
-                    'Estudiantes': materia.contar_estudiantes_total(),
-                    'Laboratorios': materia.contar_laboratorios()
+                    'ID': materia['id'],
+                    'Sigla': materia['sigla'],
+                    'Materia': materia['materia'],
+                    'Paralelos': materia['paralelos'],
+                    'Estudiantes': materia['estudiantes'],
+                    'Laboratorios': materia['laboratorios'],
+                    'Calificaciones': materia['calificaciones']
                 })
             
             df = pd.DataFrame(datos)
@@ -205,6 +345,7 @@ def mostrar_dashboard():
 
 def pagina_materias():
     """Página de gestión de materias"""
+    import pandas as pd
     st.header("Gestión de Materias")
     
     tab1, tab2, tab3, tab4 = st.tabs(["Lista de Materias", "Nueva Materia", "Editar Materia", "Estadísticas"])
@@ -218,7 +359,7 @@ def pagina_materias():
                 st.rerun()
         
         try:
-            materias = MateriaManager.listar_materias()
+            materias = cargar_materias()
             
             if materias:
                 # Buscador
@@ -229,15 +370,19 @@ def pagina_materias():
                 else:
                     materias_filtradas = materias
                 
+                # Conteos de todas las materias en una cantidad fija de consultas
+                conteos = {m['id']: m for m in cargar_estadisticas_generales()['materias']}
+                
                 datos = []
                 for materia in materias_filtradas:
+                    conteo = conteos.get(materia.id, {})
                     datos.append({
                         'ID': materia.id,
                         'Sigla': materia.sigla,
                         'Materia': materia.materia,
-                        'Paralelos': materia.contar_paralelos(),
-                        'Estudiantes': materia.contar_estudiantes_total(),
-                        'Laboratorios': materia.contar_laboratorios()
+                        'Paralelos': conteo.get('paralelos', 0),
+                        'Estudiantes': conteo.get('estudiantes', 0),
+                        'Laboratorios': conteo.get('laboratorios', 0)
                     })
                 
                 df = pd.DataFrame(datos)
@@ -346,7 +491,7 @@ def pagina_materias():
     with tab3:
         st.subheader("Editar Materia")
         
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         if materias:
             opciones_materias = {f"{m.sigla} - {m.materia}": m for m in materias}
@@ -393,8 +538,8 @@ def pagina_materias():
         st.subheader("Estadísticas de Materias")
         
         try:
-            stats = MateriaManager.obtener_estadisticas_generales()
-            materias = MateriaManager.listar_materias()
+            stats = cargar_estadisticas_generales()
+            materias = stats['materias']
             
             # Métricas generales
             col1, col2, col3 = st.columns(3)
@@ -413,14 +558,14 @@ def pagina_materias():
             
             if materias:
                 datos_stats = []
-                for materia in materias:
-                    stats_materia = materia.estadisticas_completas()
+                for stats_materia in materias:
                     datos_stats.append({
                         'Sigla': stats_materia['sigla'],
                         'Materia': stats_materia['materia'],
                         'Paralelos': stats_materia['paralelos'],
                         'Estudiantes': stats_materia['estudiantes'],
-                        'Laboratorios': stats_materia['laboratorios']
+                        'Laboratorios': stats_materia['laboratorios'],
+                        'Calificaciones': stats_materia['calificaciones']
                     })
                 
                 df_stats = pd.DataFrame(datos_stats)
@@ -431,6 +576,7 @@ def pagina_materias():
 
 def pagina_paralelos():
     """Página de gestión de paralelos"""
+    import pandas as pd
     st.header("Gestión de Paralelos")
     
     tab1, tab2, tab3, tab4 = st.tabs(["Lista de Paralelos", "Nuevo Paralelo", "Editar Paralelo", "Estadísticas"])
@@ -439,7 +585,7 @@ def pagina_paralelos():
         st.subheader("Paralelos por Materia")
         
         # Selector de materia
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         if not materias:
             st.warning("No hay materias registradas. Debe crear materias primero.")
@@ -453,7 +599,7 @@ def pagina_paralelos():
         
         if materia_seleccionada:
             materia_id = opciones_materias[materia_seleccionada]
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia_id)
+            paralelos = cargar_paralelos(materia_id)
             
             if paralelos:
                 datos = []
@@ -516,7 +662,7 @@ def pagina_paralelos():
                 with col2:
                     if st.button("Ver Estadísticas"):
                         paralelo_id = opciones_paralelos[paralelo_seleccionado]
-                        stats = EstudianteManager.obtener_estadisticas_paralelo(paralelo_id)
+                        stats = cargar_estadisticas_estudiantes(paralelo_id)
                         
                         if 'error' not in stats:
                             st.info(f"""
@@ -534,7 +680,7 @@ def pagina_paralelos():
     with tab2:
         st.subheader("Crear Nuevo Paralelo")
         
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         if materias:
             with st.form("form_nuevo_paralelo"):
@@ -575,7 +721,7 @@ def pagina_paralelos():
         st.subheader("Editar Paralelo")
 
         # Obtener todos los paralelos agrupados por materia
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
 
         if not materias:
             st.warning("No hay materias registradas.")
@@ -584,7 +730,7 @@ def pagina_paralelos():
         # Crear lista de paralelos disponibles
         paralelos_disponibles = []
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             for paralelo in paralelos:
                 paralelos_disponibles.append({
                     'texto': f"{materia.sigla} - Paralelo {paralelo.paralelo}",
@@ -635,10 +781,10 @@ def pagina_paralelos():
     with tab4:
         st.subheader("Estadísticas de Paralelos")
         
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             
             if paralelos:
                 st.write(f"**{materia.sigla} - {materia.materia}**")
@@ -659,19 +805,20 @@ def pagina_paralelos():
 
 def pagina_estudiantes():
     """Página de gestión de estudiantes"""
+    import pandas as pd
     st.header("Gestión de Estudiantes")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["Lista de Estudiantes", "Nuevo Estudiante", "Organizar Grupos", "Búsqueda"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Lista de Estudiantes", "Nuevo Estudiante", "Organizar Grupos", "Búsqueda", "Importar"])
     
     with tab1:
         st.subheader("Estudiantes por Paralelo")
         
         # Obtener paralelos
         paralelos_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             for paralelo in paralelos:
                 paralelos_disponibles.append({
                     'texto': f"{materia.sigla} - Paralelo {paralelo.paralelo}",
@@ -694,14 +841,16 @@ def pagina_estudiantes():
             
             if estudiantes:
                 datos = []
+                promedios = cargar_promedios(paralelo_id)
+                conteos = EstudianteManager.obtener_conteos_calificaciones([e.id for e in estudiantes])
                 for estudiante in estudiantes:
                     datos.append({
                         'ID': estudiante.id,
                         'CI': estudiante.ci,
                         'Nombre': estudiante.nombre,
                         'Grupo': estudiante.grupo or "Sin asignar",
-                        'Calificaciones': estudiante.contar_calificaciones(),
-                        'Promedio': f"{estudiante.promedio_calificaciones():.2f}"
+                        'Calificaciones': conteos.get(estudiante.id, 0),
+                        'Promedio': f"{promedios.get(estudiante.id, 0.0):.2f}"
                     })
                 
                 df = pd.DataFrame(datos)
@@ -785,10 +934,10 @@ def pagina_estudiantes():
 
         # Obtener paralelos
         paralelos_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
 
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             for paralelo in paralelos:
                 paralelos_disponibles.append({
                     'texto': f"{materia.sigla} - Paralelo {paralelo.paralelo}",
@@ -902,10 +1051,10 @@ def pagina_estudiantes():
         
         # Obtener paralelos
         paralelos_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             for paralelo in paralelos:
                 paralelos_disponibles.append({
                     'texto': f"{materia.sigla} - Paralelo {paralelo.paralelo}",
@@ -926,6 +1075,18 @@ def pagina_estudiantes():
                     max_value=10,
                     value=5
                 )
+
+                estrategia = st.selectbox(
+                    "Estrategia:",
+                    options=list(ESTRATEGIAS_GRUPOS.keys()),
+                    format_func=lambda clave: ESTRATEGIAS_GRUPOS[clave]
+                )
+
+                semilla = st.number_input(
+                    "Semilla (solo para orden aleatorio, 0 = nueva):",
+                    min_value=0,
+                    value=0
+                )
                 
                 submitted = st.form_submit_button("Organizar Grupos", 
                                                 type="primary",
@@ -933,11 +1094,16 @@ def pagina_estudiantes():
                 
                 if submitted:
                     paralelo_id = opciones_paralelos[paralelo_seleccionado]
-                    resultado = EstudianteManager.organizar_grupos_automatico(paralelo_id, estudiantes_por_grupo)
+                    resultado = EstudianteManager.organizar_grupos_automatico(
+                        paralelo_id, estudiantes_por_grupo, estrategia, semilla or None
+                    )
                     
                     if resultado['success']:
                         st.success(resultado['mensaje'])
-                        st.info(f"Se crearon {resultado['grupos_creados']} grupos")
+                        st.info(f"Se crearon {resultado['grupos_creados']} grupos "
+                                f"({resultado['actualizados']} estudiantes cambiaron de grupo)")
+                        if 'semilla' in resultado:
+                            st.caption(f"Semilla usada: {resultado['semilla']}")
                     else:
                         st.error(resultado['mensaje'])
         else:
@@ -1008,8 +1174,67 @@ def pagina_estudiantes():
             else:
                 st.warning(f"No se encontró estudiante con CI: {ci_busqueda}")
 
+    with tab5:
+        st.subheader("Importar Estudiantes desde CSV o Excel")
+        st.write("El archivo debe tener los encabezados **Nombre** y **CI**, y opcionalmente **Grupo** y **Paralelo**.")
+        st.code("Nombre,CI,Grupo,Paralelo\nJuan Pérez,12345678,Grupo 1,A", language="text")
+
+        materias = cargar_materias()
+        if not materias:
+            st.warning("No hay materias registradas.")
+            return
+
+        opciones_materias = {f"{m.sigla} - {m.materia}": m.id for m in materias}
+        materia_seleccionada = st.selectbox("Materia:", options=list(opciones_materias.keys()), key="importar_materia")
+        materia_id = opciones_materias[materia_seleccionada]
+
+        paralelos = cargar_paralelos(materia_id)
+        if not paralelos:
+            st.warning("La materia no tiene paralelos registrados.")
+            return
+
+        opciones_destino = {"Según la columna Paralelo del archivo": None}
+        opciones_destino.update({f"Paralelo {p.paralelo}": p.id for p in paralelos})
+        destino = st.selectbox("Inscribir en:", options=list(opciones_destino.keys()), key="importar_destino")
+
+        archivo = st.file_uploader("Archivo de estudiantes:", type=["csv", "xlsx"], key="importar_archivo")
+
+        if archivo and st.button("Importar Estudiantes", type="primary", use_container_width=True):
+            import tempfile
+            from utils.importador_estudiantes import ImportadorEstudiantes
+
+            extension = os.path.splitext(archivo.name)[1].lower()
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta = os.path.join(directorio, f"importacion{extension}")
+                with open(ruta, "wb") as temporal:
+                    temporal.write(archivo.getbuffer())
+
+                with st.spinner("Importando estudiantes..."):
+                    paralelo_id = opciones_destino[destino]
+                    if paralelo_id is None:
+                        reporte = ImportadorEstudiantes.importar(ruta, materia_id=materia_id)
+                    else:
+                        reporte = ImportadorEstudiantes.importar(ruta, paralelo_id=paralelo_id)
+
+            if reporte['success']:
+                st.success(reporte['mensaje'])
+            else:
+                st.error(reporte['mensaje'])
+
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Filas leídas", reporte['total_filas'])
+            col2.metric("Importados", reporte['insertados'])
+            col3.metric("Duplicados", reporte['duplicados_archivo'] + reporte['duplicados_existentes'])
+            col4.metric("Duración", f"{reporte['duracion']:.2f} s")
+
+            if reporte['errores']:
+                st.warning(f"{len(reporte['errores'])} filas omitidas:")
+                df_errores = pd.DataFrame(reporte['errores'], columns=['Fila', 'Motivo'])
+                st.dataframe(df_errores, use_container_width=True, hide_index=True)
+
 def pagina_laboratorios():
     """Página de gestión de laboratorios"""
+    import pandas as pd
     st.header("Gestión de Laboratorios")
     
     tab1, tab2, tab3 = st.tabs(["Lista de Laboratorios", "Nuevo Laboratorio", "Estadísticas"])
@@ -1017,7 +1242,7 @@ def pagina_laboratorios():
     with tab1:
         st.subheader("Laboratorios por Materia")
         
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         if not materias:
             st.warning("No hay materias registradas. Debe crear materias primero.")
@@ -1031,18 +1256,20 @@ def pagina_laboratorios():
         
         if materia_seleccionada:
             materia_id = opciones_materias[materia_seleccionada]
-            laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia_id)
+            laboratorios = cargar_laboratorios(materia_id)
             
             if laboratorios:
+                estadisticas = cargar_estadisticas_laboratorios(materia_id)
                 datos = []
                 for lab in laboratorios:
+                    stats = estadisticas.get(lab.id, {})
                     datos.append({
                         'ID': lab.id,
                         'Número': lab.numero,
                         'Título': lab.titulo,
                         'Puntaje Máximo': f"{lab.puntaje_maximo:.1f}",
-                        'Calificaciones': lab.contar_calificaciones(),
-                        'Promedio': f"{lab.promedio_calificaciones():.2f}"
+                        'Calificaciones': stats.get('calificaciones_registradas', 0),
+                        'Promedio': f"{stats.get('promedio', 0.0):.2f}"
                     })
                 
                 df = pd.DataFrame(datos)
@@ -1065,7 +1292,7 @@ def pagina_laboratorios():
                         lab = LaboratorioManager.obtener_laboratorio(lab_id)
                         
                         if lab:
-                            stats = lab.estadisticas_detalladas()
+                            stats = estadisticas[lab.id]
                             
                             st.info(f"""
                             **Laboratorio:** {lab.titulo}
@@ -1119,7 +1346,7 @@ def pagina_laboratorios():
     with tab2:
         st.subheader("Crear Nuevo Laboratorio")
         
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         if materias:
             with st.form("form_nuevo_laboratorio"):
@@ -1196,24 +1423,26 @@ def pagina_laboratorios():
     with tab3:
         st.subheader("Estadísticas de Laboratorios")
         
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia.id)
+            laboratorios = cargar_laboratorios(materia.id)
             
             if laboratorios:
                 st.write(f"**{materia.sigla} - {materia.materia}**")
                 
+                estadisticas = cargar_estadisticas_laboratorios(materia.id)
                 datos_stats = []
                 for lab in laboratorios:
-                    stats = lab.estadisticas_detalladas()
+                    stats = estadisticas[lab.id]
                     datos_stats.append({
                         'Lab': lab.numero,
                         'Título': lab.titulo,
                         'Calificaciones': stats['total_calificaciones'],
                         'Promedio': f"{stats['promedio']:.2f}",
                         'Aprobados': stats['aprobados'],
-                        'Reprobados': stats['reprobados']
+                        'Reprobados': stats['reprobados'],
+                        'Completitud': f"{stats['tasa_completitud']:.1f}%"
                     })
                 
                 df_stats = pd.DataFrame(datos_stats)
@@ -1223,6 +1452,7 @@ def pagina_laboratorios():
 
 def pagina_calificaciones():
     """Página de gestión de calificaciones"""
+    import pandas as pd
     st.header("Gestión de Calificaciones")
 
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Lista de Calificaciones", "Nueva Calificación", "Calificar por Lotes", "Estadísticas", "Calificaciones por Materia"])
@@ -1232,10 +1462,10 @@ def pagina_calificaciones():
         
         # Obtener laboratorios
         laboratorios_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia.id)
+            laboratorios = cargar_laboratorios(materia.id)
             for lab in laboratorios:
                 laboratorios_disponibles.append({
                     'texto': f"{materia.sigla} - Lab {lab.numero}: {lab.titulo}",
@@ -1339,10 +1569,10 @@ def pagina_calificaciones():
         
         # Obtener laboratorios
         laboratorios_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia.id)
+            laboratorios = cargar_laboratorios(materia.id)
             for lab in laboratorios:
                 laboratorios_disponibles.append({
                     'texto': f"{materia.sigla} - Lab {lab.numero}: {lab.titulo}",
@@ -1406,7 +1636,6 @@ def pagina_calificaciones():
             lab_id = st.session_state['laboratorio_actual_id']
             
             # Obtener calificación actual
-            from models.calificacion import Calificacion
             try:
                 cal = Calificacion.get_by_id(cal_id)
                 lab = LaboratorioManager.obtener_laboratorio(lab_id)
@@ -1456,10 +1685,10 @@ def pagina_calificaciones():
         
         # Obtener laboratorios
         laboratorios_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia.id)
+            laboratorios = cargar_laboratorios(materia.id)
             for lab in laboratorios:
                 laboratorios_disponibles.append({
                     'texto': f"{materia.sigla} - Lab {lab.numero}: {lab.titulo}",
@@ -1495,41 +1724,17 @@ def pagina_calificaciones():
                     if not calificaciones_texto.strip():
                         st.error("Debe ingresar al menos una calificación")
                     else:
-                        # Procesar texto
-                        lineas = [linea.strip() for linea in calificaciones_texto.strip().split('\n') if linea.strip()]
-                        calificaciones_dict = {}
-                        errores = []
-                        
-                        for i, linea in enumerate(lineas, 1):
-                            if ',' not in linea:
-                                errores.append(f"Línea {i}: Formato incorrecto")
-                                continue
-                            
-                            try:
-                                ci, calificacion_str = linea.split(',', 1)
-                                ci = ci.strip()
-                                calificacion = float(calificacion_str.strip())
-                                
-                                # Verificar estudiante
-                                estudiante = EstudianteManager.buscar_por_ci(ci)
-                                if not estudiante:
-                                    errores.append(f"Línea {i}: No existe estudiante con CI {ci}")
-                                    continue
-                                
-                                calificaciones_dict[estudiante.id] = calificacion
-                                
-                            except ValueError:
-                                errores.append(f"Línea {i}: La calificación debe ser un número")
-                                continue
-                            except Exception as e:
-                                errores.append(f"Línea {i}: {e}")
-                                continue
+                        # Procesar texto (todos los CIs se resuelven en una sola consulta)
+                        lote = CalificacionManager.preparar_lote_por_ci(lab_info['lab_id'], calificaciones_texto)
+                        calificaciones_dict = lote['calificaciones']
+                        errores = lote['errores']
                         
                         if calificaciones_dict:
                             resultado = CalificacionManager.calificar_por_lotes(lab_info['lab_id'], calificaciones_dict)
                             
                             if resultado['success']:
-                                st.success(f"Procesamiento completado: {resultado['exitosas']} calificaciones registradas")
+                                st.success(f"Procesamiento completado: {resultado['exitosas']} calificaciones registradas "
+                                           f"({resultado['creadas']} nuevas, {resultado['actualizadas']} actualizadas)")
                                 
                                 if resultado['errores']:
                                     st.warning(f"Se encontraron {len(resultado['errores'])} errores:")
@@ -1557,10 +1762,10 @@ def pagina_calificaciones():
         
         # Obtener paralelos para estadísticas
         paralelos_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             for paralelo in paralelos:
                 paralelos_disponibles.append({
                     'texto': f"{materia.sigla} - Paralelo {paralelo.paralelo}",
@@ -1578,8 +1783,7 @@ def pagina_calificaciones():
                 paralelo_id = opciones_paralelos[paralelo_seleccionado]
                 paralelo = ParaleloManager.obtener_paralelo(paralelo_id)
                 
-                from models.calificacion import Calificacion
-                stats = Calificacion.estadisticas_paralelo(paralelo)
+                stats = cargar_estadisticas_paralelo(paralelo.id)
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
@@ -1598,6 +1802,20 @@ def pagina_calificaciones():
                 if stats['total_calificaciones'] > 0:
                     porcentaje_aprobacion = (stats['aprobados'] / stats['total_calificaciones']) * 100
                     st.metric("Porcentaje de Aprobación", f"{porcentaje_aprobacion:.1f}%")
+
+                    col1, col2, col3, col4 = st.columns(4)
+
+                    with col1:
+                        st.metric("Nota Mínima", f"{stats['nota_minima']:.1f}")
+
+                    with col2:
+                        st.metric("Nota Máxima", f"{stats['nota_maxima']:.1f}")
+
+                    with col3:
+                        st.metric("Mediana", f"{stats['mediana']:.2f}")
+
+                    with col4:
+                        st.metric("Desviación Estándar", f"{stats['desviacion_estandar']:.2f}")
                 
                 if stats['sin_calificar'] > 0:
                     st.warning(f"Hay {stats['sin_calificar']} registros sin calificar")
@@ -1608,7 +1826,7 @@ def pagina_calificaciones():
         st.subheader("Calificaciones por Materia")
 
         # Obtener materias
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
 
         if not materias:
             st.warning("No hay materias registradas.")
@@ -1626,14 +1844,14 @@ def pagina_calificaciones():
             materia = MateriaManager.obtener_materia(materia_id)
 
             # Obtener todos los paralelos de la materia
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia_id)
+            paralelos = cargar_paralelos(materia_id)
 
             if not paralelos:
                 st.info("No hay paralelos registrados para esta materia.")
                 return
 
             # Obtener todos los laboratorios de la materia
-            laboratorios = LaboratorioManager.listar_laboratorios_por_materia(materia_id)
+            laboratorios = cargar_laboratorios(materia_id)
 
             if not laboratorios:
                 st.info("No hay laboratorios registrados para esta materia.")
@@ -1643,62 +1861,28 @@ def pagina_calificaciones():
             st.info(f"**{materia.sigla}** - {materia.materia}")
             st.write(f"**Paralelos:** {len(paralelos)} | **Laboratorios:** {len(laboratorios)}")
 
-            # Crear matriz de calificaciones para todos los estudiantes en la materia
-            from models.calificacion import Calificacion
-            from models.laboratorio import Laboratorio
-
-            # Obtener estudiantes de todos los paralelos de la materia
-            estudiantes_materia = []
-            for paralelo in paralelos:
-                estudiantes_paralelo = EstudianteManager.listar_por_paralelo(paralelo.id)
-                for est in estudiantes_paralelo:
-                    estudiantes_materia.append((est, paralelo.paralelo))  # Incluir paralelo
+            # Matriz de calificaciones de todos los estudiantes de la materia (una sola consulta)
+            matriz = cargar_matriz_materia(materia_id)
 
-            if not estudiantes_materia:
+            if matriz.empty:
                 st.info("No hay estudiantes registrados en esta materia.")
                 return
 
-            # Crear DataFrame con calificaciones por estudiante y laboratorio
-            datos_matriz = []
-            for estudiante, paralelo_nombre in estudiantes_materia:
-                fila = {
-                    'CI': estudiante.ci,
-                    'Estudiante': estudiante.nombre,
-                    'Paralelo': paralelo_nombre,
-                    'Grupo': estudiante.grupo or 'Sin asignar'
-                }
-
-                # Agregar calificaciones para cada laboratorio
-                for lab in laboratorios:
-                    # Buscar calificación específica para este estudiante y laboratorio
-                    calificacion = CalificacionManager.obtener_calificacion_especifica(lab.id, estudiante.id)
-                    if calificacion and calificacion.calificacion is not None:
-                        fila[f'Lab {lab.numero}'] = f"{calificacion.calificacion:.1f}"
-                    else:
-                        fila[f'Lab {lab.numero}'] = "--"
-
-                # Calcular promedio basado en la cantidad total de laboratorios
-                calificaciones = []
-                for lab in laboratorios:
-                    calificacion = CalificacionManager.obtener_calificacion_especifica(lab.id, estudiante.id)
-                    if calificacion and calificacion.calificacion is not None:
-                        calificaciones.append(calificacion.calificacion)
-
-                suma_calificaciones = sum(calificaciones) if calificaciones else 0
-                promedio = round(suma_calificaciones / len(laboratorios), 2) if len(laboratorios) > 0 else 0.0
-                fila['Promedio'] = f"{promedio:.2f}"
-
-                datos_matriz.append(fila)
-
-            df_matriz = pd.DataFrame(datos_matriz)
+            # Crear DataFrame para mostrar con las notas formateadas
+            columnas_labs = [f'Lab {lab.numero}' for lab in laboratorios]
+            df_matriz = matriz.drop(columns=['ID'])
+            df_matriz['Grupo'] = df_matriz['Grupo'].map(lambda grupo: grupo or 'Sin asignar')
+            for columna in columnas_labs:
+                df_matriz[columna] = df_matriz[columna].map(lambda nota: f"{nota:.1f}" if pd.notna(nota) else "--")
+            df_matriz['Promedio'] = df_matriz['Promedio'].map(lambda promedio: f"{promedio:.2f}")
 
             # Mostrar formulario vertical para editar calificaciones de un estudiante específico
             st.subheader("Editar Calificaciones por Estudiante")
 
             # Crear diccionario de estudiantes para el selector
             estudiantes_dict = {}
-            for est, par in estudiantes_materia:
-                estudiantes_dict[f"{est.ci} - {est.nombre} (Paralelo {par})"] = (est, par)
+            for fila in matriz.to_dict('records'):
+                estudiantes_dict[f"{fila['CI']} - {fila['Estudiante']} (Paralelo {fila['Paralelo']})"] = fila
 
             if estudiantes_dict:
                 # Selector de estudiante
@@ -1709,20 +1893,22 @@ def pagina_calificaciones():
                 )
 
                 if estudiante_seleccionado:
-                    estudiante, paralelo_nombre = estudiantes_dict[estudiante_seleccionado]
+                    fila_estudiante = estudiantes_dict[estudiante_seleccionado]
+                    estudiante_id = fila_estudiante['ID']
 
                     # Mostrar información del estudiante
-                    st.info(f"**Estudiante:** {estudiante.nombre}  \n**CI:** {estudiante.ci}  \n**Paralelo:** {paralelo_nombre}")
+                    st.info(f"**Estudiante:** {fila_estudiante['Estudiante']}  \n**CI:** {fila_estudiante['CI']}  \n**Paralelo:** {fila_estudiante['Paralelo']}")
 
                     # Crear formulario vertical para editar todas las calificaciones
-                    with st.form(f"form_calificaciones_{estudiante.id}"):
+                    with st.form(f"form_calificaciones_{estudiante_id}"):
                         # Diccionario para almacenar los valores actuales
                         valores_calificaciones = {}
 
                         for lab in laboratorios:
-                            # Obtener la calificación actual
-                            calificacion = CalificacionManager.obtener_calificacion_especifica(lab.id, estudiante.id)
-                            calificacion_valor = calificacion.calificacion if calificacion and calificacion.calificacion is not None else None
+                            # Obtener la calificación actual desde la matriz
+                            calificacion_valor = fila_estudiante[f'Lab {lab.numero}']
+                            if pd.isna(calificacion_valor):
+                                calificacion_valor = None
 
                             # Campo para editar la calificación
                             nuevo_valor = st.number_input(
@@ -1731,14 +1917,13 @@ def pagina_calificaciones():
                                 min_value=0.0,
                                 max_value=lab.puntaje_maximo,
                                 step=0.1,
-                                key=f"cal_input_{estudiante.id}_{lab.id}",
+                                key=f"cal_input_{estudiante_id}_{lab.id}",
                                 help=f"Puntaje máximo: {lab.puntaje_maximo}"
                             )
 
                             valores_calificaciones[lab.id] = {
                                 'actual': calificacion_valor,
-                                'nuevo': nuevo_valor,
-                                'objeto': calificacion
+                                'nuevo': nuevo_valor
                             }
 
                         # Botón para guardar todas las calificaciones
@@ -1749,7 +1934,6 @@ def pagina_calificaciones():
                             for lab_id, data in valores_calificaciones.items():
                                 nuevo_valor = data['nuevo']
                                 actual_valor = data['actual']
-                                calificacion = data['objeto']
 
                                 # Solo actualizar si hay un cambio real
                                 hay_cambio = False
@@ -1759,22 +1943,20 @@ def pagina_calificaciones():
                                     hay_cambio = True
 
                                 if hay_cambio:
-                                    lab = next(l for l in laboratorios if l.id == lab_id)
+                                    calificacion = CalificacionManager.obtener_calificacion_especifica(lab_id, estudiante_id)
                                     if calificacion:
                                         # Actualizar existente
                                         CalificacionManager.actualizar_calificacion(calificacion.id, nuevo_valor)
                                     else:
                                         # Crear nueva calificación
-                                        CalificacionManager.registrar_calificacion(lab.id, estudiante.id, nuevo_valor)
+                                        CalificacionManager.registrar_calificacion(lab_id, estudiante_id, nuevo_valor)
                                     actualizaciones_realizadas += 1
 
                             if actualizaciones_realizadas > 0:
-                                st.success(f"✓ {actualizaciones_realizadas} calificación(es) actualizada(s) para {estudiante.nombre}")
+                                st.success(f"✓ {actualizaciones_realizadas} calificación(es) actualizada(s) para {fila_estudiante['Estudiante']}")
                                 st.rerun()
                             else:
                                 st.info("No hubo cambios para guardar")
-            else:
-                st.info("No hay estudiantes registrados en esta materia.")
 
             # Mostrar tabla original (puede ser útil para referencia)
             st.subheader("Vista de Calificaciones")
@@ -1853,6 +2035,8 @@ def pagina_calificaciones():
 
 def pagina_reportes():
     """Página de reportes y exportación"""
+    import pandas as pd
+    from utils.pdf_exporter import PDFExporter
     st.header("Reportes y Exportación")
     
     tab1, tab2, tab3 = st.tabs(["Generar Reportes", "Matriz de Calificaciones", "Archivos Generados"])
@@ -1893,10 +2077,10 @@ def pagina_reportes():
 
         # Obtener paralelos
         paralelos_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             for paralelo in paralelos:
                 paralelos_disponibles.append({
                     'texto': f"{materia.sigla} - Paralelo {paralelo.paralelo}",
@@ -1977,10 +2161,10 @@ def pagina_reportes():
         
         # Obtener paralelos
         paralelos_disponibles = []
-        materias = MateriaManager.listar_materias()
+        materias = cargar_materias()
         
         for materia in materias:
-            paralelos = ParaleloManager.listar_paralelos_por_materia(materia.id)
+            paralelos = cargar_paralelos(materia.id)
             for paralelo in paralelos:
                 paralelos_disponibles.append({
                     'texto': f"{materia.sigla} - Paralelo {paralelo.paralelo}",
@@ -2001,11 +2185,9 @@ def pagina_reportes():
                 try:
                     paralelo = ParaleloManager.obtener_paralelo(paralelo_id)
                     
-                    from models.calificacion import Calificacion
-                    from models.laboratorio import Laboratorio
                     
-                    matriz = Calificacion.matriz_calificaciones_paralelo(paralelo)
-                    laboratorios = list(Laboratorio.obtener_por_materia(paralelo.id_materia))
+                    matriz = cargar_matriz_paralelo(paralelo.id)
+                    laboratorios = cargar_laboratorios(paralelo.id_materia_id)
                     
                     if matriz and laboratorios:
                         st.write(f"**Matriz de Calificaciones: {paralelo.id_materia.sigla} - Paralelo {paralelo.paralelo}**")
@@ -2033,8 +2215,7 @@ def pagina_reportes():
                         # Estadísticas de la matriz
                         st.subheader("Estadísticas de la Matriz")
                         
-                        from models.calificacion import Calificacion
-                        stats = Calificacion.estadisticas_paralelo(paralelo)
+                        stats = cargar_estadisticas_paralelo(paralelo.id)
                         
                         col1, col2, col3 = st.columns(3)
                         
@@ -2115,11 +2296,12 @@ def pagina_reportes():
 
 def pagina_estadisticas():
     """Página de estadísticas generales"""
+    import pandas as pd
     st.header("Estadísticas Generales del Sistema")
     
     try:
-        stats = MateriaManager.obtener_estadisticas_generales()
-        materias = MateriaManager.listar_materias()
+        stats = cargar_estadisticas_generales()
+        materias = stats['materias']
         
         # Resumen general
         st.subheader("Resumen General")
@@ -2158,23 +2340,22 @@ def pagina_estadisticas():
         
         if materias:
             datos_detalle = []
-            for materia in materias:
-                stats_materia = materia.estadisticas_completas()
+            for stats_materia in materias:
                 datos_detalle.append({
                     'Sigla': stats_materia['sigla'],
                     'Materia': stats_materia['materia'],
                     'Paralelos': stats_materia['paralelos'],
                     'Estudiantes': stats_materia['estudiantes'],
-                    'Laboratorios': stats_materia['laboratorios']
+                    'Laboratorios': stats_materia['laboratorios'],
+                    'Calificaciones': stats_materia['calificaciones']
                 })
             
             df_detalle = pd.DataFrame(datos_detalle)
             st.dataframe(df_detalle, use_container_width=True, hide_index=True)
             
-            # Gráficos de estadísticas (usando los datos pero sin librerías de gráficos adicionales)
+            # Gráficos nativos de Streamlit (no requieren matplotlib)
             st.subheader("Distribución de Datos")
             
-            # Mostrar información en formato tabular ya que no tenemos matplotlib u otras librerías
             col1, col2 = st.columns(2)
             
             with col1:
@@ -2189,6 +2370,10 @@ def pagina_estadisticas():
         
         st.markdown("---")
         
+        mostrar_distribucion_notas(materias)
+        
+        st.markdown("---")
+        
         # Información adicional
         st.subheader("Información del Sistema")
         
@@ -2215,8 +2400,92 @@ def pagina_estadisticas():
     except Exception as e:
         st.error(f"Error al cargar estadísticas: {e}")
 
+def mostrar_distribucion_notas(materias):
+    """Histogramas, bandas de notas, cuartiles por laboratorio y comparación de grupos"""
+    import pandas as pd
+    st.subheader("Distribución de Calificaciones")
+    st.caption("Calculado sobre las notas registradas: los laboratorios sin nota no cuentan como cero, "
+               "a diferencia del promedio de cada estudiante.")
+    
+    opciones = {"Todas las materias": None}
+    opciones.update({f"{m['sigla']} - {m['materia']}": m['id'] for m in materias})
+    seleccion = st.selectbox("Materia:", list(opciones.keys()), key="distribucion_materia")
+    
+    distribucion = cargar_distribucion(opciones[seleccion])
+    general = distribucion['general']
+    
+    if not general['cantidad']:
+        st.info("No hay calificaciones registradas")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Promedio de notas registradas", f"{general['promedio']:.2f}")
+    with col2:
+        st.metric("Desviación Estándar", f"{general['desviacion_estandar']:.2f}")
+    with col3:
+        st.metric("Mediana", f"{general['mediana']:.2f}")
+    with col4:
+        st.metric("Aprobación", f"{general['tasa_aprobacion']:.1f}%")
+    
+    paralelos = distribucion['paralelos']
+    etiquetas = {fila.paralelo: f"{fila.sigla} {fila.nombre_paralelo}" for fila in paralelos.itertuples()}
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Histograma de Notas**")
+        st.bar_chart(distribucion['histogramas']['paralelos'].sum(axis=0).rename('Notas'))
+    
+    with col2:
+        st.write("**Bandas de Notas por Paralelo**")
+        st.bar_chart(distribucion['bandas']['paralelos'].rename(index=etiquetas))
+    
+    st.write("**Cuartiles por Laboratorio**")
+    laboratorios = distribucion['laboratorios']
+    st.dataframe(pd.DataFrame({
+        'Materia': laboratorios['sigla'],
+        'Lab': laboratorios['numero_laboratorio'],
+        'Notas': laboratorios['cantidad'],
+        'Promedio (notas registradas)': laboratorios['promedio'],
+        'Desv. Est.': laboratorios['desviacion_estandar'],
+        'Mínimo': laboratorios['minimo'],
+        'Q1': laboratorios['q1'],
+        'Mediana': laboratorios['mediana'],
+        'Q3': laboratorios['q3'],
+        'Máximo': laboratorios['maximo'],
+        'Aprobación %': laboratorios['tasa_aprobacion'],
+    }), use_container_width=True, hide_index=True)
+    
+    st.write("**Comparación de Grupos**")
+    paralelo_id = st.selectbox("Paralelo:", list(etiquetas.keys()),
+                               format_func=etiquetas.get, key="distribucion_paralelo")
+    grupos = distribucion['grupos'][distribucion['grupos']['paralelo'] == paralelo_id]
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("Diferencia con el promedio del paralelo")
+        st.bar_chart(grupos.set_index('grupo')['diferencia'])
+    with col2:
+        st.dataframe(pd.DataFrame({
+            'Grupo': grupos['grupo'],
+            'Estudiantes': grupos['estudiantes'],
+            'Promedio (notas registradas)': grupos['promedio'],
+            'Desv. Est.': grupos['desviacion_estandar'],
+            'Mediana': grupos['mediana'],
+            'Aprobación %': grupos['tasa_aprobacion'],
+            'Diferencia': grupos['diferencia'],
+        }), use_container_width=True, hide_index=True)
+
 def main():
     """Función principal de la aplicación Streamlit"""
+
+    # Cada ejecución del script toma una conexión del pool y la devuelve al terminar
+    with sesion_bd():
+        renderizar_aplicacion()
+
+def renderizar_aplicacion():
+    """Renderiza la aplicación completa en una ejecución del script"""
     
     # Inicializar aplicación
     inicializar_aplicacion()
@@ -2227,23 +2496,24 @@ def main():
     # Navegación principal
     pagina = sidebar_navegacion()
     
-    # Renderizar página según selección
-    if pagina == "Dashboard":
-        mostrar_dashboard()
-    elif pagina == "Materias":
-        pagina_materias()
-    elif pagina == "Paralelos":
-        pagina_paralelos()
-    elif pagina == "Estudiantes":
-        pagina_estudiantes()
-    elif pagina == "Laboratorios":
-        pagina_laboratorios()
-    elif pagina == "Calificaciones":
-        pagina_calificaciones()
-    elif pagina == "Reportes":
-        pagina_reportes()
-    elif pagina == "Estadísticas":
-        pagina_estadisticas()
+    # Renderizar página según selección (cada ejecución cuenta como una acción)
+    with instrumentacion.medir(f"web:{pagina}"):
+        if pagina == "Dashboard":
+            mostrar_dashboard()
+        elif pagina == "Materias":
+            pagina_materias()
+        elif pagina == "Paralelos":
+            pagina_paralelos()
+        elif pagina == "Estudiantes":
+            pagina_estudiantes()
+        elif pagina == "Laboratorios":
+            pagina_laboratorios()
+        elif pagina == "Calificaciones":
+            pagina_calificaciones()
+        elif pagina == "Reportes":
+            pagina_reportes()
+        elif pagina == "Estadísticas":
+            pagina_estadisticas()
     
     # Footer
     st.markdown("---")
@@ -6,8 +6,30 @@ Contiene toda la lógica relacionada con crear, buscar y moficiar calificaciones
 from models.calificacion import Calificacion
 from models.estudiante import Estudiante
 from models.laboratorio import Laboratorio
-from peewee import IntegrityError
-
+from models.instrumentacion import instrumentar_clase
+from models.cache import invalida_cache
+from models.paginacion import TAMANO_PAGINA, paginar, pagina_vacia
+from peewee import IntegrityError, EXCLUDED, chunked, fn
+from datetime import datetime
+import math
+
+# Filas por sentencia en las operaciones por lotes (6 columnas por fila en
+# calificar_por_lotes: 600 parámetros, por debajo del límite de 999 de SQLite)
+TAMANO_LOTE = 100
+
+# Claves de orden de las consultas paginadas (el ID de la calificación se agrega al final).
+# Las calificaciones sin nota quedan antes que cualquier nota
+ORDENES_CALIFICACIONES_LABORATORIO = {
+    'nombre': (Estudiante.nombre,),
+    'ci': (Estudiante.ci,),
+    'nota': (fn.COALESCE(Calificacion.calificacion, -1),),
+}
+ORDENES_CALIFICACIONES_ESTUDIANTE = {
+    'numero': (Laboratorio.numero,),
+    'nota': (fn.COALESCE(Calificacion.calificacion, -1),),
+}
+
+@instrumentar_clase
 class CalificacionManager:
     """
     Encapsula toda la lógica de negocio para calificaciones.
@@ -16,6 +38,7 @@ class CalificacionManager:
     """
 
     @staticmethod
+    @invalida_cache
     def registrar_calificacion(laboratorio_id, estudiante_id, calificacion, observacion=None):
         """
         Registra una calificación
@@ -96,6 +119,71 @@ class CalificacionManager:
             print(f"[ERROR] No existe laboratorio con ID {laboratorio_id}")
             return []
     
+    @staticmethod
+    def obtener_calificaciones_estudiante_paginado(estudiante_id, tamano=TAMANO_PAGINA, despues=None, antes=None,
+                                                   ordenar_por='numero', descendente=False, filtro=None):
+        """
+        Página de calificaciones de un estudiante (paginación por clave, ver models/paginacion.py).
+
+        Args:
+            estudiante_id (int): ID del estudiante
+            tamano (int): Calificaciones por página
+            despues (tuple): Cursor 'siguiente' de la página anterior (Opcional)
+            antes (tuple): Cursor 'anterior' de la página siguiente (Opcional)
+            ordenar_por (str): Campo por el que ordenar (numero, nota)
+            descendente (bool): Orden descendente
+            filtro (str): Texto a buscar en el título del laboratorio (Opcional)
+
+        Returns:
+            dict: {'elementos': list, 'total': int, 'siguiente': tuple|None, 'anterior': tuple|None}
+        """
+        if not Estudiante.select().where(Estudiante.id == estudiante_id).exists():
+            print(f"[ERROR] No existe estudiante con ID {estudiante_id}")
+            return pagina_vacia()
+
+        consulta = (Calificacion.select(Calificacion, Laboratorio)
+                    .join(Laboratorio)
+                    .where(Calificacion.id_estudiante == estudiante_id))
+        if filtro and filtro.strip():
+            consulta = consulta.where(Laboratorio.titulo.contains(filtro.strip()))
+
+        claves = ORDENES_CALIFICACIONES_ESTUDIANTE.get(
+            ordenar_por, ORDENES_CALIFICACIONES_ESTUDIANTE['numero']) + (Calificacion.id,)
+        return paginar(consulta, claves, tamano, despues=despues, antes=antes, descendente=descendente)
+
+    @staticmethod
+    def obtener_calificaciones_laboratorio_paginado(laboratorio_id, tamano=TAMANO_PAGINA, despues=None, antes=None,
+                                                    ordenar_por='nombre', descendente=False, filtro=None):
+        """
+        Página de calificaciones de un laboratorio (paginación por clave, ver models/paginacion.py).
+
+        Args:
+            laboratorio_id (int): ID del laboratorio
+            tamano (int): Calificaciones por página
+            despues (tuple): Cursor 'siguiente' de la página anterior (Opcional)
+            antes (tuple): Cursor 'anterior' de la página siguiente (Opcional)
+            ordenar_por (str): Campo por el que ordenar (nombre, ci, nota)
+            descendente (bool): Orden descendente
+            filtro (str): Texto a buscar en el nombre o el CI del estudiante (Opcional)
+
+        Returns:
+            dict: {'elementos': list, 'total': int, 'siguiente': tuple|None, 'anterior': tuple|None}
+        """
+        if not Laboratorio.select().where(Laboratorio.id == laboratorio_id).exists():
+            print(f"[ERROR] No existe laboratorio con ID {laboratorio_id}")
+            return pagina_vacia()
+
+        consulta = (Calificacion.select(Calificacion, Estudiante)
+                    .join(Estudiante)
+                    .where(Calificacion.id_laboratorio == laboratorio_id))
+        if filtro and filtro.strip():
+            texto = filtro.strip().upper()
+            consulta = consulta.where(Estudiante.nombre.contains(texto) | Estudiante.ci.contains(texto))
+
+        claves = ORDENES_CALIFICACIONES_LABORATORIO.get(
+            ordenar_por, ORDENES_CALIFICACIONES_LABORATORIO['nombre']) + (Calificacion.id,)
+        return paginar(consulta, claves, tamano, despues=despues, antes=antes, descendente=descendente)
+
     @staticmethod
     def obtener_calificacion_especifica(laboratorio_id, estudiante_id):
         """
@@ -117,6 +205,66 @@ class CalificacionManager:
             return None
 
     @staticmethod
+    def matriz_calificaciones_materia(materia_id):
+        """
+        Obtiene la matriz de calificaciones de todos los paralelos de una materia.
+
+        Las notas se cargan con una sola consulta (estudiantes con LEFT JOIN a
+        sus calificaciones) y se pivotean en memoria.
+
+        Args:
+            materia_id (int): ID de la materia
+
+        Returns:
+            DataFrame: Una fila por estudiante con las columnas 'ID', 'CI',
+            'Estudiante', 'Paralelo', 'Grupo', una columna 'Lab N' por
+            laboratorio (None si no tiene nota) y 'Promedio'
+        """
+        import pandas as pd
+        from peewee import JOIN
+        from models.paralelo import Paralelo
+
+        laboratorios = list(Laboratorio.select(Laboratorio.id, Laboratorio.numero)
+                            .where(Laboratorio.id_materia == materia_id)
+                            .order_by(Laboratorio.numero)
+                            .tuples())
+        columnas_labs = {lab_id: f"Lab {numero}" for lab_id, numero in laboratorios}
+        columnas = ['ID', 'CI', 'Estudiante', 'Paralelo', 'Grupo'] + list(columnas_labs.values()) + ['Promedio']
+
+        labs_materia = Laboratorio.select(Laboratorio.id).where(Laboratorio.id_materia == materia_id)
+        consulta = (Estudiante
+                    .select(Estudiante.id, Estudiante.ci, Estudiante.nombre, Paralelo.paralelo,
+                            Estudiante.grupo, Calificacion.id_laboratorio, Calificacion.calificacion)
+                    .join(Paralelo)
+                    .switch(Estudiante)
+                    .join(Calificacion, JOIN.LEFT_OUTER,
+                          on=((Calificacion.id_estudiante == Estudiante.id) &
+                              (Calificacion.id_laboratorio.in_(labs_materia))))
+                    .where(Paralelo.id_materia == materia_id)
+                    .order_by(Paralelo.paralelo, Estudiante.nombre, Estudiante.id)
+                    .tuples())
+
+        filas = {}
+        for estudiante_id, ci, nombre, paralelo, grupo, laboratorio_id, calificacion in consulta:
+            fila = filas.get(estudiante_id)
+            if fila is None:
+                fila = {'ID': estudiante_id, 'CI': ci, 'Estudiante': nombre, 'Paralelo': paralelo, 'Grupo': grupo}
+                fila.update({columna: None for columna in columnas_labs.values()})
+                filas[estudiante_id] = fila
+
+            if laboratorio_id is not None:
+                fila[columnas_labs[laboratorio_id]] = calificacion
+
+        # Promedio sobre el total de laboratorios de la materia, no solo los calificados
+        total_laboratorios = len(laboratorios)
+        for fila in filas.values():
+            notas = [fila[columna] for columna in columnas_labs.values() if fila[columna] is not None]
+            fila['Promedio'] = round(sum(notas) / total_laboratorios, 2) if total_laboratorios > 0 else 0.0
+
+        return pd.DataFrame(list(filas.values()), columns=columnas)
+
+    @staticmethod
+    @invalida_cache
     def actualizar_calificacion(calificacion_id, nueva_calificacion=None, observacion=None):
         """
         Actualiza una calificación existente.
@@ -157,6 +305,7 @@ class CalificacionManager:
             return False
     
     @staticmethod
+    @invalida_cache
     def eliminar_calificacion(calificacion_id):
         """
         Elimina un calificación.
@@ -191,49 +340,190 @@ class CalificacionManager:
             }
     
     @staticmethod
+    def preparar_lote_por_ci(laboratorio_id, lineas):
+        """
+        Interpreta líneas "CI,calificacion" y resuelve todos los CIs de una vez.
+
+        Los CIs se buscan solo entre los estudiantes de la materia del
+        laboratorio (ver EstudianteManager.resolver_cis); las líneas mal
+        formadas, con CI desconocido o ambiguo se reportan como errores.
+
+        Args:
+            laboratorio_id (int): ID del laboratorio destino
+            lineas (str|list): Texto con una entrada por línea o lista de líneas
+
+        Returns:
+            dict: 'calificaciones' ({estudiante_id: calificacion}, listo para
+            calificar_por_lotes), 'estudiantes' ({estudiante_id: Estudiante}),
+            'errores' (mensajes por línea), 'desconocidos' y 'ambiguos'
+        """
+        from managers.estudiante_manager import EstudianteManager
+
+        if isinstance(lineas, str):
+            lineas = lineas.split('\n')
+        lineas = [linea.strip() for linea in lineas if linea.strip()]
+
+        entradas = []
+        errores = []
+        for i, linea in enumerate(lineas, 1):
+            if ',' not in linea:
+                errores.append((i, "Formato incorrecto"))
+                continue
+
+            ci, calificacion_str = linea.split(',', 1)
+            try:
+                calificacion = float(calificacion_str.strip())
+            except ValueError:
+                errores.append((i, "La calificación debe ser un número"))
+                continue
+            entradas.append((i, ci.strip().upper(), calificacion))
+
+        resolucion = EstudianteManager.resolver_cis([ci for _, ci, _ in entradas], laboratorio_id)
+
+        calificaciones = {}
+        estudiantes = {}
+        for i, ci, calificacion in entradas:
+            if ci in resolucion['ambiguos']:
+                paralelos = ", ".join(e.id_paralelo.paralelo for e in resolucion['ambiguos'][ci])
+                errores.append((i, f"El CI {ci} está inscrito en varios paralelos de la materia ({paralelos})"))
+                continue
+
+            estudiante = resolucion['encontrados'].get(ci)
+            if not estudiante:
+                errores.append((i, f"No existe estudiante con CI {ci} en la materia del laboratorio"))
+                continue
+
+            calificaciones[estudiante.id] = calificacion
+            estudiantes[estudiante.id] = estudiante
+
+        return {
+            'calificaciones': calificaciones,
+            'estudiantes': estudiantes,
+            'errores': [f"Línea {i}: {mensaje}" for i, mensaje in sorted(errores)],
+            'desconocidos': resolucion['desconocidos'],
+            'ambiguos': list(resolucion['ambiguos'])
+        }
+
+    @staticmethod
+    @invalida_cache
     def calificar_por_lotes(laboratorio_id, calificaciones_dict):
         """
         Registra múltiples calificacion de una vez.
 
+        Valida todas las entradas (estudiante existente, nota numérica y
+        dentro de 0 y el puntaje máximo del laboratorio) y guarda las válidas
+        con INSERT ... ON CONFLICT DO UPDATE por bloques, todo en una sola
+        transacción: las notas nuevas se crean y las existentes se actualizan.
+
         Args:
             laboratorio_id (int): ID del laboratorio
             calificacion_dict (dict): Diccionario con el formato {estudiante_id: calificacion, ...}
+                (también se acepta una lista de pares (estudiante_id, calificacion))
         
         Returns:
-            dict: Resultado de la operación por lotes
+            dict: Resultado de la operación por lotes. 'resultados' tiene una
+            entrada por fila con 'estudiante_id', 'calificacion', 'estado'
+            ('creada', 'actualizada' o 'error') y 'mensaje'
         """
         try:
             laboratorio = Laboratorio.get_by_id(laboratorio_id)
 
-            exitosas = 0
-            errores = []
+            entradas = calificaciones_dict.items() if hasattr(calificaciones_dict, 'items') else calificaciones_dict
+
+            resultados = []
+            validas = {}
+
+            # Validar formato y rango de cada fila
+            for estudiante_id, calificacion in entradas:
+                resultado = {
+                    'estudiante_id': estudiante_id,
+                    'calificacion': calificacion,
+                    'estado': 'error',
+                    'mensaje': ''
+                }
+                resultados.append(resultado)
 
-            for estudiante_id, calificacion in calificaciones_dict.items():
                 try:
-                    estudiante = Estudiante.get_by_id(estudiante_id)
-
-                    # Verificar si ya existe calificación
-
-                    cal_existente = CalificacionManager.obtener_calificacion_especifica(laboratorio_id, estudiante_id)
-                    if cal_existente:
-                        # Actualizar existente
-                        cal_existente.calificacion = calificacion
-                        cal_existente.save()
-                    else:
-                        # Crear nueva
-                        Calificacion.create(
-                            id_laboratorio=laboratorio,
-                            id_estudiante=estudiante,
-                            calificacion=calificacion
-                        )
-                    exitosas = exitosas + 1
-                except Exception as e:
-                    errores.append(f"Estudiante {estudiante_id}: {e}")
+                    resultado['estudiante_id'] = estudiante_id = int(estudiante_id)
+                    resultado['calificacion'] = calificacion = float(calificacion)
+                except (TypeError, ValueError):
+                    resultado['mensaje'] = 'Estudiante o calificación no válidos'
+                    continue
+
+                if math.isnan(calificacion) or calificacion < 0 or calificacion > laboratorio.puntaje_maximo:
+                    resultado['mensaje'] = f'Calificación de estar entre 0 y {laboratorio.puntaje_maximo}'
+                    continue
+
+                # Si el estudiante se repite vale la última nota
+                anterior = validas.get(estudiante_id)
+                if anterior is not None:
+                    anterior['mensaje'] = 'Reemplazada por una entrada posterior del mismo estudiante'
+                resultado['estado'] = 'valida'
+                validas[estudiante_id] = resultado
+
+            # Verificar estudiantes y notas existentes con consultas IN por bloques
+            existentes = set()
+            con_nota = set()
+            for bloque in chunked(list(validas), TAMANO_LOTE * 5):
+                existentes.update(estudiante_id for (estudiante_id,) in (Estudiante
+                    .select(Estudiante.id)
+                    .where(Estudiante.id.in_(bloque))
+                    .tuples()))
+                con_nota.update(estudiante_id for (estudiante_id,) in (Calificacion
+                    .select(Calificacion.id_estudiante)
+                    .where((Calificacion.id_laboratorio == laboratorio.id) &
+                           (Calificacion.id_estudiante.in_(bloque)))
+                    .tuples()))
+
+            ahora = datetime.now()
+            filas = []
+            for resultado in resultados:
+                if resultado['estado'] != 'valida':
+                    continue
+
+                estudiante_id = resultado['estudiante_id']
+                if validas[estudiante_id] is not resultado:
+                    resultado['estado'] = 'error'
+                    continue
+                if estudiante_id not in existentes:
+                    resultado['estado'] = 'error'
+                    resultado['mensaje'] = 'No existe el estudiante'
+                    continue
+
+                resultado['estado'] = 'actualizada' if estudiante_id in con_nota else 'creada'
+                filas.append({
+                    Calificacion.id_laboratorio: laboratorio.id,
+                    Calificacion.id_estudiante: estudiante_id,
+                    Calificacion.calificacion: resultado['calificacion'],
+                    Calificacion.fecha_registro: ahora,
+                    Calificacion.fecha_creacion: ahora,
+                    Calificacion.fecha_modificacion: ahora,
+                })
+
+            # Guardar todas las filas válidas en una sola transacción
+            with Calificacion._meta.database.atomic():
+                for bloque in chunked(filas, TAMANO_LOTE):
+                    (Calificacion
+                     .insert_many(bloque)
+                     .on_conflict(
+                         conflict_target=[Calificacion.id_estudiante, Calificacion.id_laboratorio],
+                         update={
+                             Calificacion.calificacion: EXCLUDED.calificacion,
+                             Calificacion.fecha_modificacion: EXCLUDED.fecha_modificacion
+                         })
+                     .execute())
+
+            exitosas = len(filas)
+            errores = [f"Estudiante {r['estudiante_id']}: {r['mensaje']}"
+                       for r in resultados if r['estado'] == 'error']
             
             return {
                 'success': True,
                 'exitosas': exitosas,
+                'creadas': sum(1 for r in resultados if r['estado'] == 'creada'),
+                'actualizadas': sum(1 for r in resultados if r['estado'] == 'actualizada'),
                 'errores': errores,
+                'resultados': resultados,
                 'mensaje': f'Procesadas {exitosas} calificaciones. {len(errores)} errores.'
             }
         
@@ -247,7 +537,3 @@ class CalificacionManager:
                 'success': False,
                 'mensaje': f'Error en procesamiento por lotes: {e}'
             }
-
-
-
-
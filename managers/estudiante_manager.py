@@ -3,14 +3,39 @@ Manager para gestionar estudiantes.
 Incluye registro, búsqueda y organzación por grupos.
 """
 
+import random
+from datetime import datetime
 from models.estudiante import Estudiante
 from models.paralelo import Paralelo
-from peewee import IntegrityError
-
+from models.instrumentacion import instrumentar_clase
+from models.cache import en_cache, invalida_cache
+from models.paginacion import TAMANO_PAGINA, paginar, pagina_vacia
+from peewee import IntegrityError, Case, chunked, fn
+
+# Estrategias de organizar_grupos_automatico
+ESTRATEGIAS_GRUPOS = {
+    'alfabetico': "Por nombre, grupos completos en orden",
+    'equilibrado': "Por nombre, grupos del mismo tamaño",
+    'aleatorio': "Orden aleatorio con semilla",
+    'mantener': "Mantener grupos y ubicar a los que no tienen",
+}
+
+# Claves de orden de listar_por_paralelo_paginado (el ID se agrega al final)
+ORDENES_ESTUDIANTES = {
+    'nombre': (Estudiante.nombre,),
+    'grupo': (fn.COALESCE(Estudiante.grupo, ''), Estudiante.nombre),
+    'ci': (Estudiante.ci,),
+}
+
+# Estudiantes por sentencia UPDATE ... CASE (3 parámetros por estudiante, bajo el límite de SQLite)
+TAMANO_LOTE_GRUPOS = 250
+
+@instrumentar_clase
 class EstudianteManager:
     """Gestiona todas las operaciones con estudiantes"""
 
     @staticmethod
+    @invalida_cache
     def registrar_estudiante(nombre, ci, paralelo_id, grupo=None):
         """
         Registra un nuevo estudiante en un paralelo.
@@ -90,6 +115,64 @@ class EstudianteManager:
             print(f"[ERROR] No existe paralelo con ID {paralelo_id}")
             return []
 
+    @staticmethod
+    def listar_por_paralelo_paginado(paralelo_id, tamano=TAMANO_PAGINA, despues=None, antes=None,
+                                     ordenar_por='nombre', descendente=False, filtro=None):
+        """
+        Página de estudiantes de un paralelo (paginación por clave, ver models/paginacion.py).
+
+        Args:
+            paralelo_id (int): ID del paralelo
+            tamano (int): Estudiantes por página
+            despues (tuple): Cursor 'siguiente' de la página anterior (Opcional)
+            antes (tuple): Cursor 'anterior' de la página siguiente (Opcional)
+            ordenar_por (str): Campo por el que ordenar (nombre, grupo, ci)
+            descendente (bool): Orden descendente
+            filtro (str): Texto a buscar en el nombre o el CI (Opcional)
+
+        Returns:
+            dict: {'elementos': list, 'total': int, 'siguiente': tuple|None, 'anterior': tuple|None}
+        """
+        if not Paralelo.select().where(Paralelo.id == paralelo_id).exists():
+            print(f"[ERROR] No existe paralelo con ID {paralelo_id}")
+            return pagina_vacia()
+
+        consulta = Estudiante.select().where(Estudiante.id_paralelo == paralelo_id)
+        if filtro and filtro.strip():
+            texto = filtro.strip().upper()
+            consulta = consulta.where(Estudiante.nombre.contains(texto) | Estudiante.ci.contains(texto))
+
+        claves = ORDENES_ESTUDIANTES.get(ordenar_por, ORDENES_ESTUDIANTES['nombre']) + (Estudiante.id,)
+        return paginar(consulta, claves, tamano, despues=despues, antes=antes, descendente=descendente)
+
+    @staticmethod
+    @en_cache(Estudiante)
+    def obtener_promedios(paralelo_id=None, materia_id=None):
+        """
+        Obtiene el promedio de varios estudiantes con una sola consulta.
+
+        Args:
+            paralelo_id (int): ID del paralelo (Opcional)
+            materia_id (int): ID de la materia (Opcional)
+
+        Returns:
+            dict: {estudiante_id: promedio}. Sin filtros incluye a todos los estudiantes
+        """
+        return Estudiante.promedios_calificaciones(paralelo=paralelo_id, materia=materia_id)
+
+    @staticmethod
+    def obtener_conteos_calificaciones(estudiante_ids):
+        """
+        Obtiene la cantidad de calificaciones de varios estudiantes a la vez.
+
+        Args:
+            estudiante_ids (list): IDs de los estudiantes
+
+        Returns:
+            dict: {estudiante_id: cantidad}
+        """
+        return Estudiante.conteos_calificaciones(estudiante_ids)
+
     @staticmethod
     def obtener_estudiante(estudiante_id):
         """
@@ -140,6 +223,45 @@ class EstudianteManager:
         except Exception:
             return None
 
+    @staticmethod
+    def resolver_cis(cis, laboratorio_id):
+        """
+        Resuelve los CIs de un lote contra los estudiantes de la materia del laboratorio.
+
+        Todos los CIs se buscan juntos (ver Estudiante.buscar_por_cis_en_materia)
+        y solo se consideran estudiantes inscritos en la materia del laboratorio.
+
+        Args:
+            cis (list): CIs a resolver (se normalizan como en registrar_estudiante)
+            laboratorio_id (int): ID del laboratorio destino
+
+        Returns:
+            dict: {'encontrados': {ci: Estudiante}, 'desconocidos': [ci],
+            'ambiguos': {ci: [Estudiante]}}; un CI es ambiguo si está inscrito
+            en más de un paralelo de la materia
+        """
+        from models.laboratorio import Laboratorio
+
+        resultado = {'encontrados': {}, 'desconocidos': [], 'ambiguos': {}}
+        try:
+            laboratorio = Laboratorio.get_by_id(laboratorio_id)
+        except Laboratorio.DoesNotExist:
+            print(f"[ERROR] No existe laboratorio con ID {laboratorio_id}")
+            return resultado
+
+        cis = [str(ci).strip().upper() for ci in cis]
+        estudiantes = Estudiante.buscar_por_cis_en_materia(cis, laboratorio.id_materia_id)
+
+        for ci in dict.fromkeys(cis):
+            coincidencias = estudiantes.get(ci, [])
+            if not coincidencias:
+                resultado['desconocidos'].append(ci)
+            elif len(coincidencias) > 1:
+                resultado['ambiguos'][ci] = coincidencias
+            else:
+                resultado['encontrados'][ci] = coincidencias[0]
+        return resultado
+
     @staticmethod
     def buscar_todos_por_ci(ci):
         """
@@ -154,6 +276,7 @@ class EstudianteManager:
         return Estudiante.buscar_todos_por_ci(ci)
     
     @staticmethod
+    @invalida_cache
     def actualizar_estudiante(estudiante_id, **campos):
         """
         Actualiza información de un estudiante.
@@ -211,6 +334,7 @@ class EstudianteManager:
             return False
     
     @staticmethod
+    @invalida_cache
     def actualizar_grupo(estudiante_id, nuevo_grupo):
         """
         Actualiza el grupo de un estudiante.
@@ -229,6 +353,7 @@ class EstudianteManager:
         )
     
     @staticmethod
+    @invalida_cache
     def eliminar_estudiante(estudiante_id, forzar=False):
         """
         Elimina un estudiante del sistema.
@@ -252,18 +377,19 @@ class EstudianteManager:
                     'calificaciones': num_calificaciones
                 }
             
-            if forzar and num_calificaciones > 0:
-                # Eliminar calificaciones primero
-                from models.calificacion import Calificacion
+            from models.calificacion import Calificacion
 
-                calificaciones_eliminadas = Calificacion.delete().where(
-                    Calificacion.id_estudiante == estudiante
-                ).execute()
+            estudiante_info = f"{estudiante.nombre} ({estudiante.ci})"
+            with Estudiante._meta.database.atomic():
+                if forzar and num_calificaciones > 0:
+                    # Eliminar calificaciones primero
+                    calificaciones_eliminadas = Calificacion.delete().where(
+                        Calificacion.id_estudiante == estudiante
+                    ).execute()
 
-                print(f"[INFO] Eliminadas {calificaciones_eliminadas} calificaciones")
+                    print(f"[INFO] Eliminadas {calificaciones_eliminadas} calificaciones")
 
-            estudiante_info = f"{estudiante.nombre} ({estudiante.ci})"
-            estudiante.delete_instance()
+                estudiante.delete_instance()
 
             return {
                 'success': True,
@@ -283,20 +409,44 @@ class EstudianteManager:
             }
     
     @staticmethod
-    def organizar_grupos_automatico(paralelo_id, estudiantes_por_grupo=5):
+    @invalida_cache
+    def organizar_grupos_automatico(paralelo_id, estudiantes_por_grupo=5, estrategia='alfabetico', semilla=None):
         """
         Organiza los grupos de estudiantes en grupos.
 
+        Estrategias (ver ESTRATEGIAS_GRUPOS):
+            - alfabetico: por orden de nombre, grupos llenos y el último con el resto
+            - equilibrado: por orden de nombre, grupos cuyo tamaño difiere en uno como máximo
+            - aleatorio: orden aleatorio reproducible con la semilla, grupos equilibrados
+            - mantener: no mueve a nadie; los estudiantes sin grupo completan
+              los grupos existentes y luego forman grupos nuevos
+
+        Todos los cambios se guardan con un UPDATE ... CASE dentro de una transacción.
+
         Args:
             paralelo_id (int): ID del paralelo
             estudiantes_por_grupo (int): Cantidad por grupo
+            estrategia (str): Una de ESTRATEGIAS_GRUPOS
+            semilla (int): Semilla para la estrategia aleatoria (Opcional)
         
         Returns:
             dict: Resultado de la organización
         """
 
         try:
-            estudiantes = EstudianteManager.listar_por_paralelo(paralelo_id)
+            if estrategia not in ESTRATEGIAS_GRUPOS:
+                return {
+                    'success': False,
+                    'mensaje': f"Estrategia desconocida '{estrategia}'. Use: {', '.join(ESTRATEGIAS_GRUPOS)}"
+                }
+            if estudiantes_por_grupo < 1:
+                return {'success': False, 'mensaje': "Debe haber al menos un estudiante por grupo"}
+
+            estudiantes = list(Estudiante
+                               .select(Estudiante.id, Estudiante.nombre, Estudiante.grupo)
+                               .where(Estudiante.id_paralelo == paralelo_id)
+                               .order_by(Estudiante.nombre, Estudiante.id)
+                               .tuples())
 
             if not estudiantes:
                 return {
@@ -304,33 +454,106 @@ class EstudianteManager:
                     'mensaje': "No hay estudiantes en el paralelo"
                 }
 
-            # Calcular número de grupos necesarios
             total_estudiantes = len(estudiantes)
-            num_grupos = (total_estudiantes + estudiantes_por_grupo - 1) // estudiantes_por_grupo
-
-            grupos_creados = 0
-
-            for i, estudiante in enumerate(estudiantes):
-                numero_grupo = (i // estudiantes_por_grupo) + 1
-                nombre_grupo = f"GRUPO {numero_grupo}".upper()
-
-                estudiante.grupo = nombre_grupo
-                estudiante.save()
 
-                if numero_grupo > grupos_creados:
-                    grupos_creados = numero_grupo
-            
-            return {
+            if estrategia == 'mantener':
+                asignacion = EstudianteManager._completar_grupos(estudiantes, estudiantes_por_grupo)
+            else:
+                ids = [est_id for est_id, _, _ in estudiantes]
+                if estrategia == 'aleatorio':
+                    if semilla is None:
+                        semilla = random.randrange(1_000_000)
+                    random.Random(semilla).shuffle(ids)
+                asignacion = EstudianteManager._repartir(ids, estudiantes_por_grupo,
+                                                         equilibrado=estrategia != 'alfabetico')
+
+            # Solo se escriben los estudiantes cuyo grupo cambia
+            actuales = {est_id: grupo for est_id, _, grupo in estudiantes}
+            cambios = [(est_id, grupo) for est_id, grupo in asignacion.items() if actuales[est_id] != grupo]
+
+            ahora = datetime.now()
+            with Estudiante._meta.database.atomic():
+                for lote in chunked(cambios, TAMANO_LOTE_GRUPOS):
+                    (Estudiante
+                     .update(grupo=Case(Estudiante.id, lote), fecha_modificacion=ahora)
+                     .where(Estudiante.id.in_([est_id for est_id, _ in lote]))
+                     .execute())
+
+            grupos = {}
+            for grupo in asignacion.values():
+                grupos[grupo] = grupos.get(grupo, 0) + 1
+            grupos_creados = len(grupos)
+
+            resultado = {
                 'success': True,
                 'grupos_creados': grupos_creados,
                 'total_estudiantes': total_estudiantes,
+                'actualizados': len(cambios),
+                'estrategia': estrategia,
+                'grupos': grupos,
                 'mensaje': f"{grupos_creados} grupos creados {total_estudiantes} estudiantes"
             }
+            if estrategia == 'aleatorio':
+                resultado['semilla'] = semilla
+            return resultado
     
         except Exception as e:
             return {'success': False, 'mensaje': f"Error: {e}"}
-        
+
+    @staticmethod
+    def _repartir(ids, estudiantes_por_grupo, equilibrado=False):
+        """
+        Reparte los estudiantes en orden en GRUPO 1, GRUPO 2, ...
+
+        Returns:
+            dict: {id del estudiante: nombre del grupo}
+        """
+        num_grupos = (len(ids) + estudiantes_por_grupo - 1) // estudiantes_por_grupo
+        asignacion = {}
+        for i, est_id in enumerate(ids):
+            if equilibrado:
+                # Los primeros len(ids) % num_grupos grupos llevan un estudiante más
+                numero_grupo = i * num_grupos // len(ids) + 1
+            else:
+                numero_grupo = i // estudiantes_por_grupo + 1
+            asignacion[est_id] = f"GRUPO {numero_grupo}"
+        return asignacion
+
+    @staticmethod
+    def _completar_grupos(estudiantes, estudiantes_por_grupo):
+        """
+        Mantiene los grupos existentes y ubica a los estudiantes sin grupo,
+        primero en los grupos con lugar (el más pequeño primero) y después
+        en grupos nuevos numerados a continuación del mayor GRUPO N.
+
+        Returns:
+            dict: {id del estudiante: nombre del grupo}
+        """
+        asignacion = {est_id: grupo for est_id, _, grupo in estudiantes if grupo}
+        sin_grupo = [est_id for est_id, _, grupo in estudiantes if not grupo]
+
+        tamanos = {}
+        for grupo in asignacion.values():
+            tamanos[grupo] = tamanos.get(grupo, 0) + 1
+
+        numeros = [int(grupo[6:]) for grupo in tamanos
+                   if grupo.startswith("GRUPO ") and grupo[6:].isdigit()]
+        siguiente = max(numeros, default=0) + 1
+
+        for est_id in sin_grupo:
+            con_lugar = [g for g, n in tamanos.items() if n < estudiantes_por_grupo]
+            if con_lugar:
+                grupo = min(con_lugar, key=lambda g: (tamanos[g], g))
+            else:
+                grupo = f"GRUPO {siguiente}"
+                siguiente += 1
+            asignacion[est_id] = grupo
+            tamanos[grupo] = tamanos.get(grupo, 0) + 1
+
+        return asignacion
+
     @staticmethod
+    @en_cache(Estudiante)
     def obtener_estadisticas_paralelo(paralelo_id):
         """
         Obtiene estadísticas de un paralelo.
@@ -356,7 +579,7 @@ class EstudianteManager:
                     estudiantes_sin_grupo = estudiantes_sin_grupo + 1
 
             # Calcular promedios
-            promedios = [est.promedio_calificaciones() for est in estudiantes]
+            promedios = list(Estudiante.promedios_calificaciones(paralelo=paralelo).values())
             promedio_general = sum(promedios) / len(promedios) if promedios else 0
 
             return {
@@ -5,8 +5,11 @@ Contiene toda la lógica relacionada con crear, buscar y moficiar laboratorios.
 
 from models.laboratorio import Laboratorio
 from models.materia import Materia
+from models.instrumentacion import instrumentar_clase
+from models.cache import en_cache, invalida_cache
 from peewee import IntegrityError
 
+@instrumentar_clase
 class LaboratorioManager:
     """
     Encapsula toda la lógica de negocio para laboratorios.
@@ -15,6 +18,7 @@ class LaboratorioManager:
     """
 
     @staticmethod
+    @invalida_cache
     def crear_laboratorio(materia_id, titulo, descripcion=None, puntaje_maximo=100.0):
         """
         Crea un nuevo laboratorio para una materia.
@@ -52,6 +56,7 @@ class LaboratorioManager:
             return None
     
     @staticmethod
+    @en_cache(Laboratorio)
     def listar_laboratorios_por_materia(materia_id):
         """
         Lista todos los laboratorios de una materia.
@@ -69,6 +74,25 @@ class LaboratorioManager:
             print(f"[ERROR] No existe materia con ID {materia_id}")
             return []
     
+    @staticmethod
+    @en_cache(Laboratorio)
+    def obtener_estadisticas_materia(materia_id):
+        """
+        Obtiene las estadísticas de todos los laboratorios de una materia en una sola consulta.
+
+        Args:
+            materia_id (int): ID de la materia
+
+        Returns:
+            dict: {laboratorio_id: estadísticas} (ver Laboratorio.estadisticas_materia)
+        """
+        try:
+            materia = Materia.get_by_id(materia_id)
+            return Laboratorio.estadisticas_materia(materia)
+        except Materia.DoesNotExist:
+            print(f"[ERROR] No existe materia con ID {materia_id}")
+            return {}
+
     @staticmethod
     def obtener_laboratorio(laboratorio_id):
         """
@@ -87,6 +111,7 @@ class LaboratorioManager:
             return None
 
     @staticmethod
+    @invalida_cache
     def actualizar_laboratorio(laboratorio_id, **campos):
         """
         Actualiza un laboratorio.
@@ -135,6 +160,7 @@ class LaboratorioManager:
             return False
     
     @staticmethod
+    @invalida_cache
     def eliminar_laboratorio(laboratorio_id, forzar=False):
         """
         Elimina un laboratorio del sistema.
@@ -158,23 +184,26 @@ class LaboratorioManager:
                     'calificaciones': num_calificaciones
                 }
             
-            if forzar and num_calificaciones > 0:
-                # Eliminar calificaciones primero
-                from models.calificacion import Calificacion
+            from models.calificacion import Calificacion
 
-                eliminadas = Calificacion.delete().where(
-                    Calificacion.id_laboratorio == laboratorio
-                ).execute()
-
-                print(f"[INFO] Eliminadas {eliminadas} calificaciones")
-            
+            eliminados = {}
             lab_info = str(laboratorio)
 
-            laboratorio.delete_instance()
+            with Laboratorio._meta.database.atomic():
+                if forzar and num_calificaciones > 0:
+                    eliminados['calificaciones'] = Calificacion.delete().where(
+                        Calificacion.id_laboratorio == laboratorio
+                    ).execute()
+
+                laboratorio.delete_instance()
+
+            if eliminados:
+                print(f"[INFO] Eliminadas {eliminados['calificaciones']} calificaciones")
 
             return {
                 'success': True,
                 'mensaje': f'laboratorio eliminado exitosamente',
+                'eliminados': eliminados
             }
         
         except Laboratorio.DoesNotExist:
@@ -4,14 +4,18 @@ Contiene toda la lógica relacionada con crear, buscar y moficiar materias.
 """
 
 from models.materia import Materia
+from models.instrumentacion import instrumentar_clase
+from models.cache import en_cache, invalida_cache
 from peewee import IntegrityError
 
+@instrumentar_clase
 class MateriaManager:
     """
     Encapsula toda la lógica de negocio para materias.
     """
 
     @staticmethod
+    @invalida_cache
     def crear_materia(materia, sigla):
         """
         Crea una nueva materia.
@@ -38,6 +42,7 @@ class MateriaManager:
             return None
     
     @staticmethod
+    @en_cache(Materia)
     def listar_materias():
         """
         Obtiene todas las materias ordenadas por su sigla.
@@ -77,6 +82,7 @@ class MateriaManager:
         return Materia.obtener_por_sigla(sigla)
     
     @staticmethod
+    @invalida_cache
     def actualizar_materia(materia_id, **campos):
         """
         Actualiza datos de una materia.
@@ -129,6 +135,7 @@ class MateriaManager:
             return False
     
     @staticmethod
+    @invalida_cache
     def eliminar_materia(materia_id, forzar=False):
         """
         Elimina una materia del sistema.
@@ -159,55 +166,57 @@ class MateriaManager:
                     }
                 }
             
-            # Si se fuerza la eliminación, eliminar dependencias primero
-            if forzar:
-                from models.calificacion import Calificacion
-                from models.estudiante import Estudiante
-                from models.paralelo import Paralelo
-                from models.laboratorio import Laboratorio
-
-                # Eliminar calificaciones
-                calificaciones_eliminadas = 0
-                for paralelo in materia.paralelos:
-                    for estudiante in paralelo.estudiantes:
-                        eliminadas = Calificacion.delete().where(
-                            Calificacion.id_estudiante == estudiante
-                        ).execute()
-                        calificaciones_eliminadas = calificaciones_eliminadas + eliminadas
-                
-                # Eliminar estudiantes
-                estudiantes_eliminados = 0
-                for paralelo in materia.paralelos:
-                    eliminados = Estudiante.delete().where(
-                        Estudiante.id_paralelo == paralelo
-                    ).execute()
-                    estudiantes_eliminados = estudiantes_eliminados + eliminados
-
-                # Eliminar laboratorios
-                laboratorios_eliminados = Laboratorio.delete().where(
-                    Laboratorio.id_materia == materia
-                ).execute()
-
-                # Eliminar paralelos
-                paralelos_eliminados = Paralelo.delete().where(
-                    Paralelo.id_materia == materia
-                ).execute()
-
-                print(f"[INFO] Eliminadas {calificaciones_eliminadas} calificaciones")
-                print(f"[INFO] Eliminados {estudiantes_eliminados} estudiantes")
-                print(f"[INFO] Eliminados {laboratorios_eliminados} laboratorios")
-                print(f"[INFO] Eliminados {paralelos_eliminados} paralelos")
-            
-            # Eliminar la materia
+            from models.calificacion import Calificacion
+            from models.estudiante import Estudiante
+            from models.paralelo import Paralelo
+            from models.laboratorio import Laboratorio
+
+            eliminados = {}
             sigla_eliminada = materia.sigla
-            materia.delete_instance()
+
+            # Todo en una transacción: si algo falla no quedan datos a medias.
+            # Cada dependencia se elimina con un solo DELETE con subconsulta; las
+            # calificaciones van antes que los estudiantes para que los triggers
+            # de resumen todavía encuentren el paralelo de cada estudiante.
+            with Materia._meta.database.atomic():
+                if forzar:
+                    paralelos_materia = Paralelo.select(Paralelo.id).where(Paralelo.id_materia == materia)
+                    estudiantes_materia = Estudiante.select(Estudiante.id).where(
+                        Estudiante.id_paralelo.in_(paralelos_materia)
+                    )
+
+                    eliminados['calificaciones'] = Calificacion.delete().where(
+                        Calificacion.id_estudiante.in_(estudiantes_materia)
+                    ).execute()
+
+                    eliminados['estudiantes'] = Estudiante.delete().where(
+                        Estudiante.id_paralelo.in_(paralelos_materia)
+                    ).execute()
+
+                    eliminados['laboratorios'] = Laboratorio.delete().where(
+                        Laboratorio.id_materia == materia
+                    ).execute()
+
+                    eliminados['paralelos'] = Paralelo.delete().where(
+                        Paralelo.id_materia == materia
+                    ).execute()
+
+                # Eliminar la materia
+                materia.delete_instance()
+
+            if forzar:
+                print(f"[INFO] Eliminadas {eliminados['calificaciones']} calificaciones")
+                print(f"[INFO] Eliminados {eliminados['estudiantes']} estudiantes")
+                print(f"[INFO] Eliminados {eliminados['laboratorios']} laboratorios")
+                print(f"[INFO] Eliminados {eliminados['paralelos']} paralelos")
 
             print(f"[OK] Materia {sigla_eliminada} eliminada")
 
             return {
                 'success': True,
                 'mensaje': f'Materia {sigla_eliminada} eliminada',
-                'materia_eliminada': sigla_eliminada
+                'materia_eliminada': sigla_eliminada,
+                'eliminados': eliminados
             }
         except Materia.DoesNotExist:
             return {
@@ -221,28 +230,37 @@ class MateriaManager:
             }
     
     @staticmethod
+    @en_cache(Materia)
     def obtener_estadisticas_generales():
         """
         Obtiene estadísticas generales del sistema.
 
+        Los totales y el detalle por materia salen de una cantidad fija de
+        consultas agrupadas (ver Materia.estadisticas_por_materia).
+
         Returns:
-            dict: Diccionario con estadísticas
+            dict: Diccionario con estadísticas. La clave 'materias' contiene
+            el detalle por materia (paralelos, estudiantes, laboratorios y
+            calificaciones) ordenado por sigla
         """
 
-        materias = Materia.select()
+        materias = Materia.estadisticas_por_materia()
 
-        total_materias = materias.count()
-        total_paralelos = sum(m.contar_paralelos() for m in materias)
-        total_estudiante = sum(m.contar_estudiantes_total() for m in materias)
-        total_laboratorios = sum(m.contar_laboratorios() for m in materias)
+        total_materias = len(materias)
+        total_paralelos = sum(m['paralelos'] for m in materias)
+        total_estudiante = sum(m['estudiantes'] for m in materias)
+        total_laboratorios = sum(m['laboratorios'] for m in materias)
+        total_calificaciones = sum(m['calificaciones'] for m in materias)
 
         return {
             'total_materias': total_materias,
             'total_paralelos': total_paralelos,
             'total_estudiantes': total_estudiante,
             'total_laboratorios': total_laboratorios,
+            'total_calificaciones': total_calificaciones,
             'promedio_paralelos_por_materia': round(total_paralelos / total_materias, 1) if total_materias > 0 else 0,
             'promedio_estudiantes_por_materia': round(total_estudiante / total_materias, 1) if total_materias > 0 else 0,
+            'materias': materias,
         }
 
     @staticmethod
@@ -6,13 +6,17 @@ Contiene toda la lógica relacionada con crear, buscar y moficiar paralelos.
 from models.paralelo import Paralelo
 from models.materia import Materia
 from models.estudiante import Estudiante
+from models.instrumentacion import instrumentar_clase
+from models.cache import en_cache, invalida_cache
 from peewee import IntegrityError
 
+@instrumentar_clase
 class ParaleloManager:
     """
     Encapsula toda la lógica de negocio para paralelos.
     """
     @staticmethod
+    @invalida_cache
     def crear_paralelo(materia_id, paralelo_nombre, docente_teoria):
         """
         Crea un nuevo paralelo para una materia.
@@ -45,6 +49,7 @@ class ParaleloManager:
             return None
     
     @staticmethod
+    @en_cache(Paralelo)
     def listar_paralelos_por_materia(materia_id):
         """
         Lista todos los paralelos de una materia.
@@ -80,6 +85,7 @@ class ParaleloManager:
             return None
 
     @staticmethod
+    @invalida_cache
     def actualizar_paralelo(paralelo_id, **campos):
         """
         Actualiza un paralelo.
@@ -125,6 +131,7 @@ class ParaleloManager:
             return False
 
     @staticmethod
+    @invalida_cache
     def eliminar_paralelo(paralelo_id, forzar=False):
         """
         Elimina un paralelo del sistema.
@@ -148,31 +155,35 @@ class ParaleloManager:
                     'estudiantes': num_estudiantes
                 }
             
-            if forzar and num_estudiantes > 0:
-                # Eliminar calificaciones de estudiantes primero
-                from models.calificacion import Calificacion
-
-                calificaciones_eliminadas = 0
-                for estudiante in paralelo.estudiantes:
-                    eliminadas = Calificacion.delete().where(
-                        Calificacion.id_estudiante == estudiante
-                    ).execute()
-                    calificaciones_eliminadas = calificaciones_eliminadas + eliminadas
-                
-                # Eliminar estudiantes
-                estudiantes_eliminados = Estudiante.delete().where(
-                    Estudiante.id_paralelo == paralelo
-                ).execute()
+            from models.calificacion import Calificacion
 
-                print(f"[INFO] Eliminadas {calificaciones_eliminadas} calificaciones")
-                print(f"[INFO] Eliminados {estudiantes_eliminados} estudiantes")
-            
+            eliminados = {}
             paralelo_info = str(paralelo)
-            paralelo.delete_instance()
+
+            # Una transacción con un DELETE por tabla (calificaciones antes que
+            # estudiantes para que los triggers de resumen sigan funcionando)
+            with Paralelo._meta.database.atomic():
+                if forzar and num_estudiantes > 0:
+                    eliminados['calificaciones'] = Calificacion.delete().where(
+                        Calificacion.id_estudiante.in_(
+                            Estudiante.select(Estudiante.id).where(Estudiante.id_paralelo == paralelo)
+                        )
+                    ).execute()
+
+                    eliminados['estudiantes'] = Estudiante.delete().where(
+                        Estudiante.id_paralelo == paralelo
+                    ).execute()
+
+                paralelo.delete_instance()
+
+            if eliminados:
+                print(f"[INFO] Eliminadas {eliminados['calificaciones']} calificaciones")
+                print(f"[INFO] Eliminados {eliminados['estudiantes']} estudiantes")
 
             return {
                 'success': True,
                 'mensaje': f'Paralelo {paralelo_info} eliminado exitosamente',
+                'eliminados': eliminados
             }
         except Paralelo.DoesNotExist:
             return {
@@ -0,0 +1,192 @@
+"""
+Caché de lecturas de los managers.
+
+Las lecturas que se repiten en cada ejecución de Streamlit o cambio de
+pestaña (listas de materias, paralelos, laboratorios y estadísticas) se
+guardan por función y argumentos. Cada resultado queda asociado a la
+versión de datos con la que se calculó; la versión cambia cuando:
+
+- un manager escribe (decorador invalida_cache)
+- la conexión actual ve cambios de otra conexión o proceso (PRAGMA data_version)
+  o escribió filas por su cuenta (total_changes de la conexión)
+
+Variables de entorno:
+    AWAY_CACHE=0        desactiva la caché
+    AWAY_CACHE_MAX=N    cantidad máxima de resultados guardados (256)
+"""
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+
+# Conexiones cuya huella se recuerda (las del pool más algunas ya cerradas)
+MAX_CONEXIONES_OBSERVADAS = 32
+
+class CacheLecturas:
+    """
+    Caché LRU de resultados de lectura con invalidación por versión de datos.
+    """
+
+    def __init__(self, max_entradas=256, activa=True):
+        self.max_entradas = max_entradas
+        self.activa = activa
+        self.version = 0
+        self._entradas = OrderedDict()     # clave -> (versión, valor)
+        self._conexiones = OrderedDict()   # id(conexión) -> (conexión, data_version, total_changes)
+        self._bloqueo = threading.RLock()
+        self._metricas = {'aciertos': 0, 'fallos': 0, 'desalojos': 0, 'invalidaciones': 0}
+
+    def invalidar(self):
+        """Avanza la versión de datos: todo lo guardado deja de ser válido"""
+        with self._bloqueo:
+            self.version += 1
+            self._metricas['invalidaciones'] += 1
+            self._entradas.clear()
+
+    def version_datos(self, db):
+        """
+        Retorna la versión de datos vista desde la conexión actual de db.
+
+        Si la conexión cambió algo o ve cambios de otra conexión desde la
+        última vez, la versión avanza antes de retornarla.
+        """
+        conexion = db.connection()
+        huella = (db.execute_sql('PRAGMA data_version').fetchone()[0], conexion.total_changes)
+        with self._bloqueo:
+            anterior = self._conexiones.get(id(conexion))
+            if anterior is None or anterior[1:] != huella:
+                if anterior is not None or self._entradas:
+                    self.invalidar()
+                self._conexiones[id(conexion)] = (conexion,) + huella
+                self._conexiones.move_to_end(id(conexion))
+                while len(self._conexiones) > MAX_CONEXIONES_OBSERVADAS:
+                    self._conexiones.popitem(last=False)
+            return self.version
+
+    def obtener(self, clave, calcular, db):
+        """
+        Retorna el valor guardado para la clave o lo calcula y lo guarda.
+
+        Args:
+            clave (tuple): Función y argumentos
+            calcular (callable): Función sin argumentos que produce el valor
+            db (Database): Base de datos de la que se lee
+
+        Returns:
+            Una copia completa del valor (ver _copiar)
+        """
+        version = self.version_datos(db)
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] == version:
+                self._entradas.move_to_end(clave)
+                self._metricas['aciertos'] += 1
+                return _copiar(entrada[1])
+            self._metricas['fallos'] += 1
+
+        valor = calcular()
+
+        with self._bloqueo:
+            # Si hubo una escritura mientras se calculaba, el valor ya no se guarda
+            if self.version == version:
+                self._entradas[clave] = (version, valor)
+                self._entradas.move_to_end(clave)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+                    self._metricas['desalojos'] += 1
+        return _copiar(valor)
+
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores"""
+        with self._bloqueo:
+            self._entradas.clear()
+            self._conexiones.clear()
+            for clave in self._metricas:
+                self._metricas[clave] = 0
+
+    def metricas(self):
+        """
+        Retorna el estado de la caché.
+
+        Returns:
+            dict: activa, entradas, max_entradas, version, aciertos, fallos,
+            desalojos, invalidaciones y tasa_aciertos (%)
+        """
+        with self._bloqueo:
+            metricas = dict(self._metricas)
+            consultas = metricas['aciertos'] + metricas['fallos']
+            metricas.update({
+                'activa': self.activa,
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'version': self.version,
+                'tasa_aciertos': round(metricas['aciertos'] / consultas * 100, 2) if consultas else 0.0,
+            })
+            return metricas
+
+def _copiar(valor):
+    """
+    Copia el valor para que quien lo recibe no modifique lo guardado.
+
+    Las listas y diccionarios se copian completos: sus elementos suelen ser
+    instancias de Model o diccionarios que los formularios modifican antes
+    de guardar, y la misma entrada se entrega a todos los hilos.
+    """
+    if isinstance(valor, (list, dict)):
+        return copy.deepcopy(valor)
+    return valor
+
+cache_lecturas = CacheLecturas(
+    max_entradas=int(os.environ.get('AWAY_CACHE_MAX', 256)),
+    activa=os.environ.get('AWAY_CACHE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+)
+
+def en_cache(modelo):
+    """
+    Decorador para lecturas de managers: guarda el resultado por argumentos.
+
+    Args:
+        modelo (Model): Modelo cuya base de datos se consulta (para leer la
+            versión de datos de la conexión correcta)
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not cache_lecturas.activa:
+                return funcion(*args, **kwargs)
+            db = modelo._meta.database
+            clave = (funcion.__qualname__, id(db), args, tuple(sorted(kwargs.items())))
+            try:
+                hash(clave)
+            except TypeError:
+                return funcion(*args, **kwargs)
+            return cache_lecturas.obtener(clave, lambda: funcion(*args, **kwargs), db)
+        return envoltura
+    return decorador
+
+def invalida_cache(funcion):
+    """Decorador para escrituras de managers: invalida la caché al terminar"""
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            cache_lecturas.invalidar()
+    return envoltura
+
+def invalidar_cache():
+    """Invalida la caché de lecturas (para escrituras hechas fuera de los managers)"""
+    cache_lecturas.invalidar()
+
+def activar_cache(activa=True):
+    """Activa o desactiva la caché de lecturas en tiempo de ejecución"""
+    cache_lecturas.activa = activa
+    if not activa:
+        cache_lecturas.invalidar()
+
+def metricas_cache():
+    """Retorna las métricas de la caché de lecturas (ver CacheLecturas.metricas)"""
+    return cache_lecturas.metricas()
@@ -8,6 +8,7 @@ from .database import BaseModel
 from .estudiante import Estudiante
 from .laboratorio import Laboratorio
 from datetime import datetime
+import math
 
 class Calificacion(BaseModel):
     """
@@ -25,6 +26,7 @@ class Calificacion(BaseModel):
     class Meta:
         table_name = 'calificaciones'
         # Un estudiantes no puede tener dos notas del mismo laboratorio
+        # (el índice por laboratorio y nota se crea en models/migraciones.py)
         indexes = (
             (('id_estudiante', 'id_laboratorio'), True),    
         )
@@ -65,88 +67,162 @@ class Calificacion(BaseModel):
 
     @classmethod
     def estadisticas_paralelo(cls, paralelo):
-        """Calcula estadisticas generales de un paralelo"""
+        """
+        Calcula estadisticas generales de un paralelo.
+
+        Totales, aprobados, reprobados, sin calificar, mínimo, máximo y
+        desviación estándar salen de una sola consulta agregada; la mediana
+        se obtiene en SQL leyendo solo los valores centrales.
+        """
         from .estudiante import Estudiante
         from .laboratorio import Laboratorio
-        
-        calificaciones = cls.obtener_por_paralelo(paralelo)
-        # Contar estudiantes en el paralelo y laboratorios en la materia
-        total_estudiantes = paralelo.contar_estudiantes()
-        total_laboratorios = Laboratorio.select().where(Laboratorio.id_materia == paralelo.id_materia).count()
-        
-        if total_estudiantes == 0 or total_laboratorios == 0:
+
+        # Contar estudiantes en el paralelo y laboratorios en la materia como subconsultas
+        EstudianteConteo = Estudiante.alias()
+        total_estudiantes = (EstudianteConteo.select(fn.COUNT(EstudianteConteo.id))
+                             .where(EstudianteConteo.id_paralelo == paralelo))
+        total_laboratorios = (Laboratorio.select(fn.COUNT(Laboratorio.id))
+                              .where(Laboratorio.id_materia == paralelo.id_materia))
+
+        aprobado = Case(None, [(cls.calificacion >= 51, 1)], 0)
+        sin_nota = Case(None, [(cls.calificacion.is_null(True), 1)], 0)
+
+        (cantidad_notas, suma_notas, aprobados, sin_calificar, nota_minima, nota_maxima,
+         suma_cuadrados, estudiantes, laboratorios) = (cls
+            .select(fn.COUNT(cls.calificacion),
+                    fn.SUM(cls.calificacion),
+                    fn.SUM(aprobado),
+                    fn.SUM(sin_nota),
+                    fn.MIN(cls.calificacion),
+                    fn.MAX(cls.calificacion),
+                    fn.SUM(cls.calificacion * cls.calificacion),
+                    total_estudiantes,
+                    total_laboratorios)
+            .join(Estudiante)
+            .where(Estudiante.id_paralelo == paralelo)
+            .tuples()
+            .get())
+
+        sin_calificar = sin_calificar or 0
+
+        if estudiantes == 0 or laboratorios == 0:
             return {
                 "total_calificaciones": 0,
                 "promedio_general": 0.0,
                 "aprobados": 0,
                 "reprobados": 0,
-                "sin_calificar": calificaciones.where(cls.calificacion.is_null(True)).count()
+                "sin_calificar": sin_calificar,
+                "nota_minima": 0.0,
+                "nota_maxima": 0.0,
+                "desviacion_estandar": 0.0,
+                "mediana": 0.0
             }
-        
+
         # Calcular promedio considerando total de posibles calificaciones (estudiantes * laboratorios)
-        calificaciones_con_nota = calificaciones.where(cls.calificacion.is_null(False))
-        total_calificaciones = sum(cal.calificacion for cal in calificaciones_con_nota)
-        total_posibles = total_estudiantes * total_laboratorios
-        
-        # Calcular aprobados basados en las notas existentes
-        notas = [cal.calificacion for cal in calificaciones_con_nota]
-        aprobados = len([nota for nota in notas if nota >= 51])
-        
+        suma_notas = suma_notas or 0
+        aprobados = aprobados or 0
+        total_posibles = estudiantes * laboratorios
+
+        # Desviación estándar poblacional de las notas existentes
+        desviacion = 0.0
+        if cantidad_notas:
+            media = suma_notas / cantidad_notas
+            desviacion = math.sqrt(max(suma_cuadrados / cantidad_notas - media * media, 0.0))
+
         return{
-            "total_calificaciones": len(notas),
-            "promedio_general": round(total_calificaciones / total_posibles, 2) if total_posibles > 0 else 0.0,
+            "total_calificaciones": cantidad_notas,
+            "promedio_general": round(suma_notas / total_posibles, 2) if total_posibles > 0 else 0.0,
             "aprobados": aprobados,
-            "reprobados": len(notas) - aprobados,
-            "sin_calificar": calificaciones.where(cls.calificacion.is_null(True)).count()
+            "reprobados": cantidad_notas - aprobados,
+            "sin_calificar": sin_calificar,
+            "nota_minima": nota_minima if nota_minima is not None else 0.0,
+            "nota_maxima": nota_maxima if nota_maxima is not None else 0.0,
+            "desviacion_estandar": round(desviacion, 2),
+            "mediana": cls._mediana_paralelo(paralelo, cantidad_notas)
         }
 
+    @classmethod
+    def _mediana_paralelo(cls, paralelo, cantidad_notas):
+        """Obtiene la mediana de las notas de un paralelo leyendo solo los valores centrales"""
+        if not cantidad_notas:
+            return 0.0
+
+        centrales = [nota for (nota,) in (cls
+            .select(cls.calificacion)
+            .join(Estudiante)
+            .where((Estudiante.id_paralelo == paralelo) & (cls.calificacion.is_null(False)))
+            .order_by(cls.calificacion)
+            .limit(2 - cantidad_notas % 2)
+            .offset((cantidad_notas - 1) // 2)
+            .tuples())]
+
+        return round(sum(centrales) / len(centrales), 2)
+
     @classmethod
     def matriz_calificaciones_paralelo(cls, paralelo):
-        """Genera una matriz de calificaciones para reportes."""
+        """
+        Genera una matriz de calificaciones para reportes.
+
+        Usa una cantidad fija de consultas (estudiantes, laboratorios y
+        calificaciones) sin importar el tamaño del paralelo; las notas se
+        pivotean en memoria.
+        """
         from .laboratorio import Laboratorio
 
         #Obtener estudiantes del paralelo
-        estudiantes =  paralelo.estudiantes.order_by(Estudiante.nombre)
+        estudiantes = (Estudiante.select(Estudiante.id, Estudiante.nombre, Estudiante.ci, Estudiante.grupo)
+                       .where(Estudiante.id_paralelo == paralelo)
+                       .order_by(Estudiante.nombre)
+                       .tuples())
 
         # Obtener laboratorio de la materia
-        laboratorios = (Laboratorio.select()
-                        .where(Laboratorio.id_materia == paralelo.id_materia)
-                        .order_by(Laboratorio.numero))
+        laboratorios = list(Laboratorio.select(Laboratorio.id, Laboratorio.numero)
+                            .where(Laboratorio.id_materia == paralelo.id_materia)
+                            .order_by(Laboratorio.numero)
+                            .tuples())
+
+        # Calcular total de laboratorios para usar en cálculo de promedio
+        total_laboratorios = len(laboratorios)
+
+        # Cargar todas las calificaciones del paralelo en una sola consulta
+        notas = {}
+        if laboratorios:
+            calificaciones = (cls.select(cls.id_estudiante, cls.id_laboratorio, cls.calificacion)
+                              .join(Estudiante)
+                              .where((Estudiante.id_paralelo == paralelo) &
+                                     (cls.id_laboratorio.in_([lab_id for lab_id, _ in laboratorios])))
+                              .tuples())
+            for estudiante_id, laboratorio_id, calificacion in calificaciones:
+                notas[(estudiante_id, laboratorio_id)] = calificacion
 
         # Iniciar matriz vacía
         matriz = []
 
-        # Calcular total de laboratorios para usar en cálculo de promedio
-        total_laboratorios = laboratorios.count()
-
-        for estudiante in estudiantes:
+        for estudiante_id, nombre, ci, grupo in estudiantes:
             fila = {
-                "estudiante": estudiante.nombre,
-                "ci": estudiante.ci,
-                "grupo": estudiante.grupo,
+                "estudiante": nombre,
+                "ci": ci,
+                "grupo": grupo,
                 "calificaciones": {},
                 "promedio": 0.0
             }
 
             total_notas = 0
 
-            for lab in laboratorios:
-                try:
-                    cal = cls.get(
-                        (cls.id_estudiante == estudiante) &
-                        (cls.id_laboratorio == lab)
-                    )
-                    nota = cal.calificacion if cal.calificacion else 0
-                    fila["calificaciones"][f"lab_{lab.numero}"] = nota
+            for lab_id, lab_numero in laboratorios:
+                clave = (estudiante_id, lab_id)
+                if clave not in notas:
+                    fila["calificaciones"][f"lab_{lab_numero}"] = None
+                    continue
 
-                    if cal.calificacion:
-                        total_notas = total_notas + cal.calificacion
+                calificacion = notas[clave]
+                fila["calificaciones"][f"lab_{lab_numero}"] = calificacion if calificacion else 0
 
-                except cls.DoesNotExist:
-                    fila["calificaciones"][f"lab_{lab.numero}"] = None
+                if calificacion:
+                    total_notas = total_notas + calificacion
 
             # Calcular promedio considerando todos los laboratorios posibles, no solo los calificados
             fila["promedio"] = round(total_notas / total_laboratorios, 2) if total_laboratorios > 0 else 0.0
             matriz.append(fila)
-        
-        return matriz     
+
+        return matriz
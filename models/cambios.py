@@ -0,0 +1,231 @@
+"""
+Registro de cambios (solo se agregan filas).
+
+Triggers de SQLite sobre materias, paralelos, estudiantes, laboratorios y
+calificaciones anotan cada inserción, modificación y eliminación con la
+entidad, su ID, la operación, la fecha y el alcance afectado (materia,
+paralelo y laboratorio). Así cualquier escritura (managers, importación,
+interfaces o SQL directo) queda registrada y las estadísticas se pueden
+recalcular solo donde hubo cambios (ver models.recalculo).
+
+Retención: el registro conserva los últimos RETENCION_CAMBIOS cambios y
+depurar_antiguos() borra los anteriores cuando sobran más de otro tanto.
+Se llama al iniciar la base de datos (todas las interfaces) y desde
+verificar_resumenes.py, nunca al leer estadísticas.
+Un proceso que se quedó atrás más de lo retenido lo detecta con
+primer_cambio() y recalcula todo en lugar de perder cambios.
+"""
+
+from datetime import datetime
+from peewee import *
+from .database import database
+
+
+class RegistroCambio(Model):
+    """
+    Un cambio en una tabla de la aplicación.
+
+    Las filas se identifican con un ID creciente (AUTOINCREMENT: no se
+    reutiliza aunque se depure el registro), que sirve de punto de control.
+    """
+    entidad = CharField(max_length=20)        # materia, paralelo, estudiante, laboratorio, calificacion
+    entidad_id = IntegerField()
+    operacion = CharField(max_length=10)      # INSERT, UPDATE, DELETE
+    id_materia = IntegerField(null=True)
+    id_paralelo = IntegerField(null=True)
+    id_laboratorio = IntegerField(null=True)
+    fecha = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = database
+        table_name = 'registro_cambios'
+
+
+# Cambios que se conservan al depurar: alcanza para que otros procesos que
+# leen el registro (por ejemplo otra instancia de la web) se pongan al día
+RETENCION_CAMBIOS = 10000
+
+
+# Fecha local con el mismo formato que guarda peewee
+_FECHA = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+# Por tabla: entidad y cómo obtener materia, paralelo y laboratorio a partir
+# de una fila ({fila} es NEW u OLD dentro de los triggers)
+ALCANCES = {
+    'materias': ('materia', '{fila}.id', 'NULL', 'NULL'),
+    'paralelos': ('paralelo', '{fila}.id_materia_id', '{fila}.id', 'NULL'),
+    'estudiantes': (
+        'estudiante',
+        '(SELECT id_materia_id FROM paralelos WHERE id = {fila}.id_paralelo_id)',
+        '{fila}.id_paralelo_id',
+        'NULL',
+    ),
+    'laboratorios': ('laboratorio', '{fila}.id_materia_id', 'NULL', '{fila}.id'),
+    'calificaciones': (
+        'calificacion',
+        '(SELECT id_materia_id FROM laboratorios WHERE id = {fila}.id_laboratorio_id)',
+        '(SELECT id_paralelo_id FROM estudiantes WHERE id = {fila}.id_estudiante_id)',
+        '{fila}.id_laboratorio_id',
+    ),
+}
+
+# Columnas que, si cambian, mueven la fila a otro alcance. El cambio se anota
+# como una eliminación en el alcance anterior y una inserción en el nuevo.
+COLUMNAS_ALCANCE = {
+    'paralelos': ('id_materia_id',),
+    'estudiantes': ('id_paralelo_id',),
+    'laboratorios': ('id_materia_id',),
+    'calificaciones': ('id_estudiante_id', 'id_laboratorio_id'),
+}
+
+
+def _anotar(tabla, operacion, fila):
+    """SQL que agrega una fila al registro de cambios"""
+    entidad, materia, paralelo, laboratorio = ALCANCES[tabla]
+    return (
+        'INSERT INTO registro_cambios '
+        '(entidad, entidad_id, operacion, id_materia, id_paralelo, id_laboratorio, fecha) '
+        f"VALUES ('{entidad}', {fila}.id, '{operacion}', {materia.format(fila=fila)}, "
+        f'{paralelo.format(fila=fila)}, {laboratorio.format(fila=fila)}, {_FECHA});'
+    )
+
+
+def sentencias_esquema():
+    """
+    SQL que crea la tabla del registro y los triggers que la llenan.
+
+    Returns:
+        list: Sentencias idempotentes (IF NOT EXISTS)
+    """
+    sentencias = [
+        'CREATE TABLE IF NOT EXISTS registro_cambios ('
+        'id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, '
+        'entidad VARCHAR(20) NOT NULL, '
+        'entidad_id INTEGER NOT NULL, '
+        'operacion VARCHAR(10) NOT NULL, '
+        'id_materia INTEGER, '
+        'id_paralelo INTEGER, '
+        'id_laboratorio INTEGER, '
+        'fecha DATETIME NOT NULL)'
+    ]
+
+    for tabla in ALCANCES:
+        sentencias.append(
+            f'CREATE TRIGGER IF NOT EXISTS registro_{tabla}_insert AFTER INSERT ON {tabla} '
+            f'BEGIN {_anotar(tabla, "INSERT", "NEW")} END')
+        sentencias.append(
+            f'CREATE TRIGGER IF NOT EXISTS registro_{tabla}_delete AFTER DELETE ON {tabla} '
+            f'BEGIN {_anotar(tabla, "DELETE", "OLD")} END')
+
+        columnas = COLUMNAS_ALCANCE.get(tabla)
+        if not columnas:
+            sentencias.append(
+                f'CREATE TRIGGER IF NOT EXISTS registro_{tabla}_update AFTER UPDATE ON {tabla} '
+                f'BEGIN {_anotar(tabla, "UPDATE", "NEW")} END')
+            continue
+
+        mismo_alcance = ' AND '.join(f'OLD.{c} IS NEW.{c}' for c in columnas)
+        sentencias.append(
+            f'CREATE TRIGGER IF NOT EXISTS registro_{tabla}_update AFTER UPDATE ON {tabla} '
+            f'WHEN {mismo_alcance} '
+            f'BEGIN {_anotar(tabla, "UPDATE", "NEW")} END')
+        sentencias.append(
+            f'CREATE TRIGGER IF NOT EXISTS registro_{tabla}_mover AFTER UPDATE ON {tabla} '
+            f'WHEN NOT ({mismo_alcance}) '
+            f'BEGIN {_anotar(tabla, "DELETE", "OLD")} {_anotar(tabla, "INSERT", "NEW")} END')
+
+    return sentencias
+
+
+def ultimo_cambio():
+    """Retorna el ID del último cambio registrado (0 si no hay ninguno)"""
+    return RegistroCambio.select(fn.MAX(RegistroCambio.id)).scalar() or 0
+
+
+def primer_cambio():
+    """Retorna el ID del cambio más antiguo que queda en el registro (None si está vacío)"""
+    return RegistroCambio.select(fn.MIN(RegistroCambio.id)).scalar()
+
+
+def cambios_desde(punto_control, limite=None):
+    """
+    Retorna los cambios posteriores a un punto de control.
+
+    Args:
+        punto_control (int): ID del último cambio ya procesado
+        limite (int): Cantidad máxima de cambios (Opcional)
+
+    Returns:
+        list: Tuplas (id, entidad, entidad_id, operacion, id_materia,
+        id_paralelo, id_laboratorio) ordenadas por ID
+    """
+    consulta = (RegistroCambio
+                .select(RegistroCambio.id, RegistroCambio.entidad, RegistroCambio.entidad_id,
+                        RegistroCambio.operacion, RegistroCambio.id_materia,
+                        RegistroCambio.id_paralelo, RegistroCambio.id_laboratorio)
+                .where(RegistroCambio.id > punto_control)
+                .order_by(RegistroCambio.id)
+                .tuples())
+    if limite:
+        consulta = consulta.limit(limite)
+    return list(consulta)
+
+
+def depurar_cambios(hasta_id):
+    """
+    Elimina los cambios hasta un punto de control que ya no necesita nadie.
+
+    Args:
+        hasta_id (int): ID del último cambio a eliminar
+
+    Returns:
+        int: Cantidad de cambios eliminados
+    """
+    return RegistroCambio.delete().where(RegistroCambio.id <= hasta_id).execute()
+
+
+def depurar_antiguos(retener=RETENCION_CAMBIOS):
+    """
+    Deja solo los últimos cambios del registro.
+
+    Para no borrar en cada llamada, solo depura cuando hay más del doble
+    de los cambios a retener.
+
+    Args:
+        retener (int): Cantidad de cambios recientes que se conservan
+
+    Returns:
+        int: Cantidad de cambios eliminados
+    """
+    ultimo = ultimo_cambio()
+    primero = primer_cambio()
+    if primero is None or ultimo - primero + 1 <= 2 * retener:
+        return 0
+    return depurar_cambios(ultimo - retener)
+
+
+def alcance_cambios(punto_control):
+    """
+    Resume los cambios posteriores a un punto de control por alcance.
+
+    Muchas escrituras sobre el mismo paralelo o laboratorio (por ejemplo
+    calificar un laboratorio completo) se reducen a una sola fila.
+
+    Args:
+        punto_control (int): ID del último cambio ya procesado
+
+    Returns:
+        tuple: (ID del último cambio incluido, lista de tuplas distintas
+        (entidad, operacion, id_materia, id_paralelo, id_laboratorio))
+    """
+    hasta = ultimo_cambio()
+    if hasta <= punto_control:
+        return punto_control, []
+
+    alcances = list(RegistroCambio
+                    .select(RegistroCambio.entidad, RegistroCambio.operacion, RegistroCambio.id_materia,
+                            RegistroCambio.id_paralelo, RegistroCambio.id_laboratorio)
+                    .where((RegistroCambio.id > punto_control) & (RegistroCambio.id <= hasta))
+                    .distinct()
+                    .tuples())
+    return hasta, alcances
@@ -1,15 +1,172 @@
 from peewee import *
+from playhouse.pool import PooledSqliteDatabase
+from contextlib import contextmanager
+from functools import wraps
 import os
+import threading
+import time
+import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 # Definir donde estará nuestra base de datos
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'laboratorios.db')
 
-# Crear el directorio si no existe
-os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+# Perfiles de pragmas de SQLite. Se elige uno con la variable de entorno AWAY_DB_PERFIL.
+# - basico: valores por defecto de SQLite (journal en modo rollback)
+# - rendimiento: WAL para que las lecturas no se bloqueen mientras alguien guarda notas
+PERFILES_SQLITE = {
+    'basico': {
+        'journal_mode': 'delete',         # El modo WAL queda guardado en el archivo, se revierte
+    },
+    'rendimiento': {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',          # Seguro con WAL, evita un fsync por transacción
+        'cache_size': -64 * 1024,         # 64 MB de caché de páginas (negativo = KiB)
+        'mmap_size': 256 * 1024 * 1024,   # 256 MB de lectura por memoria mapeada
+        'temp_store': 'memory',
+        'busy_timeout': 5000,             # Esperar hasta 5 s antes de "database is locked"
+    },
+}
+PERFIL_POR_DEFECTO = 'rendimiento'
+
+def obtener_perfil(nombre=None):
+    """
+    Obtiene el perfil de pragmas a usar.
+
+    Args:
+        nombre (str): Nombre del perfil (por defecto AWAY_DB_PERFIL o 'rendimiento')
+
+    Returns:
+        tuple: (nombre del perfil, diccionario de pragmas)
+    """
+    nombre = (nombre or os.environ.get('AWAY_DB_PERFIL') or PERFIL_POR_DEFECTO).strip().lower()
+    if nombre not in PERFILES_SQLITE:
+        logger.warning("Perfil de base de datos desconocido '%s', se usa '%s'", nombre, PERFIL_POR_DEFECTO)
+        nombre = PERFIL_POR_DEFECTO
+    return nombre, PERFILES_SQLITE[nombre]
+
+PERFIL_BD, PRAGMAS_BD = obtener_perfil()
+
+# Tamaño del pool de conexiones y segundos que se espera por una conexión libre
+MAX_CONEXIONES = int(os.environ.get('AWAY_DB_MAX_CONEXIONES', 8))
+ESPERA_CONEXION = float(os.environ.get('AWAY_DB_ESPERA_CONEXION', 10))
+
+class BaseDatosPool(PooledSqliteDatabase):
+    """
+    Pool de conexiones SQLite que lleva la cuenta de su uso.
+
+    Cada hilo toma una conexión del pool al conectarse y la devuelve al
+    cerrar, así Streamlit (un hilo por sesión) reutiliza conexiones ya
+    abiertas en lugar de crear una nueva en cada ejecución del script.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metricas = {
+            'conexiones_creadas': 0,
+            'prestamos': 0,
+            'reutilizaciones': 0,
+            'esperas': 0,
+            'tiempo_espera': 0.0,
+        }
+        # Varios hilos toman conexiones a la vez (sesiones de Streamlit, cargas del desktop)
+        self._bloqueo_metricas = threading.Lock()
+        # Conexiones abiertas por el pool (se cuenta con el bloqueo del pool tomado)
+        self._abiertas = 0
+
+    def connect(self, reuse_if_open=False):
+        # Si el pool está lleno la conexión se queda esperando a que otro hilo libere una
+        lleno = bool(self._max_connections) and len(self._in_use) >= self._max_connections
+        inicio = time.perf_counter()
+        try:
+            return super().connect(reuse_if_open)
+        finally:
+            if lleno:
+                with self._bloqueo_metricas:
+                    self._metricas['esperas'] += 1
+                    self._metricas['tiempo_espera'] += time.perf_counter() - inicio
+
+    def _connect(self):
+        # El directorio de la base se crea al abrir la primera conexión, no al importar
+        if not self._connections and self.database != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.database)), exist_ok=True)
+        # El pool decide con su bloqueo tomado si presta una conexión libre o
+        # abre otra; abrirla pasa por _add_conn_hooks, que lleva la cuenta
+        with self._pool_lock:
+            abiertas = self._abiertas
+            conn = super()._connect()
+            nueva = self._abiertas != abiertas
+        with self._bloqueo_metricas:
+            self._metricas['prestamos'] += 1
+            if nueva:
+                self._metricas['conexiones_creadas'] += 1
+            else:
+                self._metricas['reutilizaciones'] += 1
+        return conn
+
+    def _add_conn_hooks(self, conn):
+        # Solo se llama para las conexiones recién abiertas, nunca al reutilizar una del pool
+        super()._add_conn_hooks(conn)
+        self._abiertas += 1
 
-# Configurar SQLite (base de dats en archivo)
-database = SqliteDatabase(DB_PATH)
+    def metricas(self):
+        """
+        Retorna el estado y las métricas de uso del pool.
+
+        Returns:
+            dict: Tamaño máximo, conexiones en uso y disponibles, conexiones
+            creadas, préstamos, reutilizaciones, esperas y tiempo de espera
+        """
+        with self._bloqueo_metricas:
+            metricas = dict(self._metricas)
+        prestamos = metricas['prestamos']
+        metricas.update({
+            'max_conexiones': self._max_connections,
+            'en_uso': len(self._in_use),
+            'disponibles': len(self._connections),
+            'tasa_reutilizacion': round(metricas['reutilizaciones'] / prestamos * 100, 2) if prestamos else 0.0,
+            'tiempo_espera': round(metricas['tiempo_espera'], 4),
+        })
+        return metricas
+
+# Configurar SQLite (base de dats en archivo). Las conexiones del pool pasan
+# de un hilo a otro, por eso se desactiva check_same_thread.
+database = BaseDatosPool(
+    DB_PATH,
+    pragmas=PRAGMAS_BD,
+    max_connections=MAX_CONEXIONES,
+    timeout=ESPERA_CONEXION,
+    check_same_thread=False
+)
+
+@contextmanager
+def sesion_bd():
+    """
+    Toma una conexión del pool para el hilo actual y la devuelve al salir.
+
+    Es reentrante: si el hilo ya tenía una conexión abierta se reutiliza
+    y se deja abierta, solo se cierra la que se abrió aquí.
+    """
+    abierta = database.connect(reuse_if_open=True)
+    try:
+        yield database
+    finally:
+        if abierta:
+            database.close()
+
+def con_sesion_bd(funcion):
+    """Decorador que ejecuta la función dentro de sesion_bd()"""
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with sesion_bd():
+            return funcion(*args, **kwargs)
+    return envoltura
+
+def metricas_conexiones():
+    """Retorna las métricas del pool de conexiones (ver BaseDatosPool.metricas)"""
+    return database.metricas()
 
 class BaseModel(Model):
     """
@@ -40,7 +197,8 @@ class BaseModel(Model):
 
 def inicializar_bd():
     """
-    Inicializar la base de datos creando todas las tablas.
+    Inicializar la base de datos creando todas las tablas y
+    aplicando las migraciones pendientes.
     Es seguro llamar esto múltiples veces.
     """
     # Importar todos los modelos
@@ -49,6 +207,8 @@ def inicializar_bd():
     from .estudiante import Estudiante
     from .laboratorio import Laboratorio
     from .calificacion import Calificacion
+    from .migraciones import aplicar_migraciones
+    from .cambios import depurar_antiguos
 
     database.connect(reuse_if_open=True)
 
@@ -57,10 +217,31 @@ def inicializar_bd():
         Materia, Paralelo, Estudiante, Laboratorio, Calificacion
     ], safe=True)
 
+    # Aplicar cambios de esquema posteriores (índices, etc.)
+    aplicar_migraciones()
+
+    # El registro de cambios solo conserva los últimos (ver models/cambios.py)
+    depurados = depurar_antiguos()
+    if depurados:
+        logger.info("Registro de cambios: %s cambios antiguos depurados", depurados)
+
     logger.info("Base de datos inicializada correctamente")
+    logger.info("Perfil SQLite '%s': %s", PERFIL_BD, describir_perfil())
+
+def describir_perfil():
+    """
+    Lee de la conexión los pragmas que están realmente en uso.
+
+    Returns:
+        dict: Valor efectivo de cada pragma del perfil de rendimiento
+    """
+    pragmas = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+    return {pragma: database.execute_sql(f"PRAGMA {pragma}").fetchone()[0] for pragma in pragmas}
 
 def cerrar_bd():
-    """Cierra la conexión a la base de datos""" 
+    """Cierra la conexión a la base de datos y las conexiones libres del pool"""
     if not database.is_closed():
         database.close()
-        logger.info("Conexión cerrada")
\ No newline at end of file
+        logger.info("Conexión cerrada")
+    database.close_idle()
+    logger.info("Pool de conexiones: %s", metricas_conexiones())
\ No newline at end of file
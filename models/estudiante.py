@@ -20,6 +20,7 @@ class Estudiante(BaseModel):
     class Meta:
         table_name = 'estudiantes'
         
+        # El índice por CI se crea en models/migraciones.py
         indexes = (
             (('id_paralelo', 'ci'), True),
         )
@@ -33,29 +34,95 @@ class Estudiante(BaseModel):
         return f"{self.nombre} ({self.id_paralelo.paralelo}) {grupo_str}"
 
     def contar_calificaciones(self):
-        """Cuenta calificaciones registradas"""
-        return self.calificaciones.count()
+        """Cuenta calificaciones registradas (leído de la tabla de resumen)"""
+        from .resumen import ResumenEstudiante
+
+        return (ResumenEstudiante.select(ResumenEstudiante.registros)
+                .where(ResumenEstudiante.id_estudiante == self.id)
+                .scalar() or 0)
     
 
+    @classmethod
+    def conteos_calificaciones(cls, ids):
+        """
+        Cuenta las calificaciones registradas de varios estudiantes con una
+        consulta por cada bloque de 500 IDs (leído de la tabla de resumen).
+
+        Returns:
+            dict: {estudiante_id: cantidad} (0 si el estudiante no tiene calificaciones)
+        """
+        from .resumen import ResumenEstudiante
+
+        conteos = dict.fromkeys(ids, 0)
+        for bloque in chunked(list(conteos), 500):
+            consulta = (ResumenEstudiante.select(ResumenEstudiante.id_estudiante, ResumenEstudiante.registros)
+                        .where(ResumenEstudiante.id_estudiante.in_(bloque))
+                        .tuples())
+            for estudiante_id, registros in consulta:
+                conteos[estudiante_id] = registros or 0
+        return conteos
+
     def promedio_calificaciones(self):
         """Calcula el promedio de calificaciones"""
-        from .calificacion import Calificacion
         from .laboratorio import Laboratorio
+        from .resumen import ResumenEstudiante
 
         # Obtener todos los laboratorios de la materia del estudiante
-        materia = self.id_paralelo.id_materia
+        materia = self.id_paralelo.id_materia_id
         total_laboratorios = Laboratorio.select().where(Laboratorio.id_materia == materia).count()
 
         if total_laboratorios == 0:
             return 0.0
 
-        # Obtener solo las calificaciones que tienen valor
-        calificaciones = self.calificaciones.where(Calificacion.calificacion.is_null(False))
-        total_calificaciones = sum(cal.calificacion for cal in calificaciones)
+        # La suma de las notas con valor se mantiene en la tabla de resumen
+        total_calificaciones = (ResumenEstudiante.select(ResumenEstudiante.suma)
+                                .where(ResumenEstudiante.id_estudiante == self.id)
+                                .scalar() or 0)
 
         # Dividir por el total de laboratorios posibles, no solo los que tienen nota
         return round(total_calificaciones / total_laboratorios, 2)
-    
+
+    @classmethod
+    def promedios_calificaciones(cls, paralelo=None, materia=None):
+        """
+        Calcula el promedio de muchos estudiantes con una sola consulta.
+
+        Aplica la misma regla que promedio_calificaciones: la suma de las notas
+        (leída de la tabla de resumen) se divide por el total de laboratorios
+        de la materia del estudiante.
+
+        Args:
+            paralelo: Limita el cálculo a un paralelo (Opcional)
+            materia: Limita el cálculo a una materia (Opcional)
+
+        Returns:
+            dict: {estudiante_id: promedio} para todos los estudiantes del alcance
+        """
+        from .laboratorio import Laboratorio
+        from .resumen import ResumenEstudiante
+
+        total_laboratorios = (Laboratorio.select(fn.COUNT(Laboratorio.id))
+                              .where(Laboratorio.id_materia == Paralelo.id_materia))
+
+        consulta = (cls.select(cls.id, ResumenEstudiante.suma, total_laboratorios)
+                    .join(Paralelo)
+                    .switch(cls)
+                    .join(ResumenEstudiante, JOIN.LEFT_OUTER,
+                          on=(ResumenEstudiante.id_estudiante == cls.id)))
+
+        if paralelo is not None:
+            consulta = consulta.where(cls.id_paralelo == paralelo)
+        if materia is not None:
+            consulta = consulta.where(Paralelo.id_materia == materia)
+
+        promedios = {}
+        for estudiante_id, total_calificaciones, laboratorios in consulta.tuples():
+            if not laboratorios:
+                promedios[estudiante_id] = 0.0
+            else:
+                promedios[estudiante_id] = round((total_calificaciones or 0) / laboratorios, 2)
+        return promedios
+
     def calificaciones_por_laboratorio(self):
         """Retorna diccionario con calificaciones por laboratorio"""
         from .calificacion import Calificacion
@@ -104,6 +171,27 @@ class Estudiante(BaseModel):
         """Busca todos los estudiantes con una cédula de identidad específica (múltiples paralelos)"""
         return list(cls.select().where(cls.ci == ci))
     
+    @classmethod
+    def buscar_por_cis_en_materia(cls, cis, materia):
+        """
+        Busca muchos CIs a la vez entre los estudiantes inscritos en una materia.
+
+        Usa una consulta IN por cada bloque de 500 CIs (una sola para lotes
+        normales) e incluye el paralelo de cada estudiante.
+
+        Returns:
+            dict: {ci: [estudiantes con ese CI en la materia]}
+        """
+        encontrados = {}
+        for bloque in chunked(sorted(set(cis)), 500):
+            consulta = (cls.select(cls, Paralelo)
+                        .join(Paralelo)
+                        .where((Paralelo.id_materia == materia) & (cls.ci.in_(bloque)))
+                        .order_by(cls.ci, Paralelo.paralelo))
+            for estudiante in consulta:
+                encontrados.setdefault(estudiante.ci, []).append(estudiante)
+        return encontrados
+
     @classmethod
     def obtener_por_paralelo_grupo(cls, paralelo, grupo):
         """Obtiene estudiantes de un paralelo y grupo específico"""
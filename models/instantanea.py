@@ -0,0 +1,267 @@
+"""
+Instantánea columnar de las calificaciones para análisis.
+
+Carga todas las calificaciones con los IDs de estudiante, laboratorio,
+paralelo y materia en arreglos de NumPy con una sola consulta y
+calcula agregados por grupo (promedio, cantidad, tasa de aprobación y
+percentiles) con operaciones vectorizadas, sin crear instancias de Model.
+
+instantanea_calificaciones() reutiliza la instantánea mientras la versión
+de datos (models.cache) no cambie; cualquier escritura hace que la próxima
+llamada la vuelva a construir.
+
+Uso:
+
+    instantanea = instantanea_calificaciones()
+    instantanea.promedio('paralelo')           # {id_paralelo: promedio}
+    instantanea.resumen('laboratorio')         # {id_laboratorio: {...}}
+"""
+
+import threading
+
+import numpy as np
+
+from .paralelo import Paralelo
+from .estudiante import Estudiante
+from .calificacion import Calificacion
+from .cache import cache_lecturas
+
+# Nota mínima de aprobación (la misma que usan las estadísticas de los modelos)
+NOTA_APROBACION = 51
+
+# Columnas por las que se puede agrupar
+AGRUPACIONES = ('estudiante', 'laboratorio', 'paralelo', 'materia')
+
+
+class InstantaneaCalificaciones:
+    """
+    Calificaciones en columnas de NumPy.
+
+    Atributos:
+        estudiante, laboratorio, paralelo, materia: IDs (int64), uno por calificación
+        nota: Notas (float64, NaN si la calificación no tiene nota)
+        version: Base de datos y versión de datos con las que se construyó
+    """
+
+    def __init__(self, estudiante, laboratorio, paralelo, materia, nota, version=None):
+        self.estudiante = estudiante
+        self.laboratorio = laboratorio
+        self.paralelo = paralelo
+        self.materia = materia
+        self.nota = nota
+        self.version = version
+        self._grupos = {}
+        # La instantánea se comparte entre hilos: nadie debe modificar sus columnas
+        for columna in (estudiante, laboratorio, paralelo, materia, nota):
+            columna.flags.writeable = False
+
+    @classmethod
+    def construir(cls, version=None):
+        """
+        Lee todas las calificaciones en una sola consulta.
+
+        Args:
+            version (tuple): Base de datos y versión de datos a las que corresponde (Opcional)
+
+        Returns:
+            InstantaneaCalificaciones
+        """
+        consulta = (Calificacion
+                    .select(Calificacion.id_estudiante, Calificacion.id_laboratorio,
+                            Estudiante.id_paralelo, Paralelo.id_materia, Calificacion.calificacion)
+                    .join(Estudiante)
+                    .join(Paralelo))
+
+        # Las filas se leen directo del cursor: son solo números y convertirlas
+        # una por una con .tuples() cuesta más que la consulta misma
+        filas = Calificacion._meta.database.execute(consulta).fetchall()
+        datos = np.array(filas, dtype=float).reshape(-1, 5)   # None se convierte en NaN
+
+        ids = datos[:, :4].astype(np.int64)
+        return cls(ids[:, 0], ids[:, 1], ids[:, 2], ids[:, 3], datos[:, 4], version=version)
+
+    def __len__(self):
+        return len(self.nota)
+
+    def _agrupar(self, por):
+        """
+        Índices de grupo de cada calificación.
+
+        Returns:
+            tuple: (claves ordenadas, índice de grupo por calificación)
+        """
+        if por not in AGRUPACIONES:
+            raise ValueError(f"No se puede agrupar por '{por}' (opciones: {', '.join(AGRUPACIONES)})")
+        if por not in self._grupos:
+            self._grupos[por] = np.unique(getattr(self, por), return_inverse=True)
+        return self._grupos[por]
+
+    def _como_dict(self, claves, valores):
+        return dict(zip(claves.tolist(), valores.tolist()))
+
+    def _conteos(self, por):
+        """Claves, índices, registros, notas con valor y suma de notas por grupo"""
+        claves, indices = self._agrupar(por)
+        con_nota = ~np.isnan(self.nota)
+        registros = np.bincount(indices, minlength=len(claves))
+        # Sin calificaciones bincount retorna int64 aunque tenga pesos; las
+        # divisiones de promedio y tasa necesitan cantidad y suma en float
+        cantidad = np.bincount(indices, weights=con_nota, minlength=len(claves)).astype(float)
+        suma = np.bincount(indices, weights=np.where(con_nota, self.nota, 0.0), minlength=len(claves)).astype(float)
+        return claves, indices, registros, cantidad, suma
+
+    def conteo(self, por):
+        """
+        Cantidad de calificaciones con nota por grupo.
+
+        Args:
+            por (str): 'estudiante', 'laboratorio', 'paralelo' o 'materia'
+
+        Returns:
+            dict: {id: cantidad}
+        """
+        claves, _, _, cantidad, _ = self._conteos(por)
+        return self._como_dict(claves, cantidad.astype(np.int64))
+
+    def promedio(self, por):
+        """
+        Promedio de las notas registradas por grupo (las calificaciones sin nota no cuentan).
+
+        Returns:
+            dict: {id: promedio redondeado a 2 decimales} (0.0 si el grupo no tiene notas)
+        """
+        claves, _, _, cantidad, suma = self._conteos(por)
+        promedios = np.divide(suma, cantidad, out=np.zeros_like(suma), where=cantidad > 0)
+        return self._como_dict(claves, np.round(promedios, 2))
+
+    def tasa_aprobacion(self, por, nota_minima=NOTA_APROBACION):
+        """
+        Porcentaje de notas aprobadas (>= nota_minima) sobre las notas registradas.
+
+        Returns:
+            dict: {id: porcentaje redondeado a 2 decimales}
+        """
+        claves, indices, _, cantidad, _ = self._conteos(por)
+        aprobadas = np.bincount(indices, weights=self.nota >= nota_minima, minlength=len(claves))
+        tasas = np.divide(aprobadas * 100, cantidad, out=np.zeros_like(cantidad), where=cantidad > 0)
+        return self._como_dict(claves, np.round(tasas, 2))
+
+    def percentiles(self, por, percentiles=(25, 50, 75)):
+        """
+        Percentiles de las notas registradas por grupo (interpolación lineal,
+        igual que numpy.percentile).
+
+        Args:
+            por (str): Columna de agrupación
+            percentiles (tuple): Percentiles entre 0 y 100
+
+        Returns:
+            dict: {id: {percentil: valor}} (None si el grupo no tiene notas)
+        """
+        claves, _ = self._agrupar(por)
+        tabla = np.round(self._tabla_percentiles(por, percentiles), 2).tolist()
+        return {clave: {p: (None if v != v else v) for p, v in zip(percentiles, fila)}   # NaN != NaN
+                for clave, fila in zip(claves.tolist(), tabla)}
+
+    def _tabla_percentiles(self, por, percentiles):
+        """Matriz (grupos x percentiles) calculada sobre las notas ordenadas por grupo"""
+        claves, indices = self._agrupar(por)
+        con_nota = ~np.isnan(self.nota)
+        grupos = indices[con_nota]
+        notas = self.nota[con_nota]
+
+        orden = np.lexsort((notas, grupos))
+        notas = notas[orden]
+        cantidad = np.bincount(grupos, minlength=len(claves))
+        inicio = np.concatenate(([0], np.cumsum(cantidad)[:-1]))
+
+        tabla = np.full((len(claves), len(percentiles)), np.nan)
+        hay = cantidad > 0
+        for columna, p in enumerate(percentiles):
+            posicion = (cantidad[hay] - 1) * (p / 100.0)
+            abajo = np.floor(posicion).astype(np.int64)
+            arriba = np.minimum(abajo + 1, cantidad[hay] - 1)
+            fraccion = posicion - abajo
+            bajo = notas[inicio[hay] + abajo]
+            alto = notas[inicio[hay] + arriba]
+            tabla[hay, columna] = bajo + (alto - bajo) * fraccion
+        return tabla
+
+    def resumen(self, por, nota_minima=NOTA_APROBACION, percentiles=(25, 50, 75)):
+        """
+        Todos los agregados por grupo en una pasada.
+
+        Returns:
+            dict: {id: {'registros', 'cantidad', 'promedio', 'tasa_aprobacion',
+            'nota_minima', 'nota_maxima', 'percentiles'}}
+        """
+        claves, indices, registros, cantidad, suma = self._conteos(por)
+        aprobadas = np.bincount(indices, weights=self.nota >= nota_minima, minlength=len(claves))
+        promedios = np.divide(suma, cantidad, out=np.zeros_like(suma), where=cantidad > 0)
+        tasas = np.divide(aprobadas * 100, cantidad, out=np.zeros_like(cantidad), where=cantidad > 0)
+
+        # El mínimo y el máximo son los percentiles 0 y 100 de las notas ya ordenadas
+        hay = cantidad > 0
+        tabla = self._tabla_percentiles(por, (0, *percentiles, 100))
+        minimos = np.where(hay, tabla[:, 0], 0.0)
+        maximos = np.where(hay, tabla[:, -1], 0.0)
+        tabla = np.round(tabla[:, 1:-1], 2)
+
+        # Se convierte todo a listas de Python una vez en lugar de elemento por elemento
+        columnas = zip(claves.tolist(), hay.tolist(), registros.tolist(), cantidad.astype(np.int64).tolist(),
+                       np.round(promedios, 2).tolist(), np.round(tasas, 2).tolist(),
+                       minimos.tolist(), maximos.tolist(), tabla.tolist())
+        resumen = {}
+        for clave, con_notas, reg, cant, prom, tasa, minimo, maximo, fila in columnas:
+            resumen[clave] = {
+                'registros': reg,
+                'cantidad': cant,
+                'promedio': prom,
+                'tasa_aprobacion': tasa,
+                'nota_minima': minimo,
+                'nota_maxima': maximo,
+                'percentiles': dict(zip(percentiles, fila if con_notas else [None] * len(percentiles))),
+            }
+        return resumen
+
+    def filtrar(self, **filtros):
+        """
+        Retorna una instantánea con las calificaciones que cumplen los filtros.
+
+        Args:
+            **filtros: columna=id o columna=[ids] (por ejemplo paralelo=3)
+
+        Returns:
+            InstantaneaCalificaciones
+        """
+        mascara = np.ones(len(self), dtype=bool)
+        for columna, valor in filtros.items():
+            if columna not in AGRUPACIONES:
+                raise ValueError(f"No se puede filtrar por '{columna}'")
+            mascara &= np.isin(getattr(self, columna), np.atleast_1d(valor))
+        return InstantaneaCalificaciones(self.estudiante[mascara], self.laboratorio[mascara],
+                                         self.paralelo[mascara], self.materia[mascara],
+                                         self.nota[mascara], version=self.version)
+
+
+_actual = None
+_bloqueo = threading.Lock()
+
+def instantanea_calificaciones():
+    """
+    Retorna la instantánea de las calificaciones, reconstruida solo si la
+    versión de datos cambió desde la última vez.
+    """
+    global _actual
+    db = Calificacion._meta.database
+    version = (id(db), cache_lecturas.version_datos(db))
+    with _bloqueo:
+        if _actual is None or _actual.version != version:
+            _actual = InstantaneaCalificaciones.construir(version=version)
+        return _actual
+
+def descartar_instantanea():
+    """Descarta la instantánea guardada (la próxima llamada la reconstruye)"""
+    global _actual
+    with _bloqueo:
+        _actual = None
@@ -0,0 +1,279 @@
+"""
+Instrumentación de consultas SQL por acción.
+
+Cuenta las consultas, el tiempo de SQL y las sentencias más lentas de cada
+llamada a un manager o acción de la interfaz, y opcionalmente avisa cuando
+la misma forma de SQL se repite muchas veces dentro de una acción (patrón
+N+1, por ejemplo un contar_calificaciones() por fila de una tabla).
+
+Se activa con variables de entorno:
+    AWAY_INSTRUMENTACION=1         activa la medición
+    AWAY_INSTRUMENTACION_N1=K      avisa si una forma de SQL se ejecuta más de K veces
+    AWAY_INSTRUMENTACION_LENTAS=N  sentencias más lentas que se guardan por acción (5)
+
+Desactivada no agrega costo: instrumentar() e instrumentar_clase() retornan
+la función o la clase sin cambios y execute_sql no se intercepta.
+"""
+
+import atexit
+import heapq
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import wraps
+
+from .database import database
+
+logger = logging.getLogger(__name__)
+
+def _entero_entorno(nombre, por_defecto):
+    try:
+        return int(os.environ.get(nombre, por_defecto))
+    except ValueError:
+        logger.warning("Valor inválido en %s, se usa %s", nombre, por_defecto)
+        return por_defecto
+
+ACTIVA = os.environ.get('AWAY_INSTRUMENTACION', '').strip().lower() in ('1', 'true', 'si', 'sí', 'on')
+UMBRAL_N1 = _entero_entorno('AWAY_INSTRUMENTACION_N1', 0)
+SENTENCIAS_LENTAS = _entero_entorno('AWAY_INSTRUMENTACION_LENTAS', 5)
+
+# Últimas acciones medidas (para mostrarlas en las interfaces)
+HISTORIAL = 200
+
+_hilo = threading.local()
+_historial = deque(maxlen=HISTORIAL)
+_bloqueo = threading.Lock()
+_originales = {}
+
+# Para comparar formas de SQL: literales y listas de parámetros se reemplazan por ?
+_PATRON_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PATRON_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+def normalizar_sql(sql):
+    """Retorna la forma de una sentencia SQL sin sus valores concretos"""
+    sql = _PATRON_LITERALES.sub('?', sql)
+    return _PATRON_LISTAS.sub('(?)', sql)
+
+class Medicion:
+    """
+    Consultas ejecutadas durante una acción.
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.duracion = 0.0
+        self.formas = Counter()
+        self.repetidas = {}
+        self._lentas = []       # Montículo de (tiempo, orden, sql) con las más lentas
+
+    def registrar(self, sql, duracion):
+        self.consultas += 1
+        self.tiempo_sql += duracion
+        if UMBRAL_N1:
+            self.formas[normalizar_sql(sql)] += 1
+        if SENTENCIAS_LENTAS:
+            elemento = (duracion, self.consultas, sql)
+            if len(self._lentas) < SENTENCIAS_LENTAS:
+                heapq.heappush(self._lentas, elemento)
+            elif duracion > self._lentas[0][0]:
+                heapq.heapreplace(self._lentas, elemento)
+
+    def finalizar(self, duracion):
+        self.duracion = duracion
+        if UMBRAL_N1:
+            self.repetidas = {forma: veces for forma, veces in self.formas.items() if veces > UMBRAL_N1}
+
+    @property
+    def lentas(self):
+        """Sentencias más lentas como lista de (segundos, sql), la más lenta primero"""
+        return [(duracion, sql) for duracion, _, sql in sorted(self._lentas, reverse=True)]
+
+    def como_dict(self):
+        return {
+            'nombre': self.nombre,
+            'consultas': self.consultas,
+            'tiempo_sql': round(self.tiempo_sql, 6),
+            'duracion': round(self.duracion, 6),
+            'lentas': [(round(duracion, 6), sql) for duracion, sql in self.lentas],
+            'repetidas': dict(self.repetidas),
+        }
+
+def _execute_sql_medido(original):
+    """Envuelve execute_sql para sumar cada consulta a las mediciones abiertas del hilo"""
+    @wraps(original)
+    def execute_sql(sql, params=None):
+        pila = getattr(_hilo, 'pila', None)
+        if not pila:
+            return original(sql, params)
+        inicio = time.perf_counter()
+        try:
+            return original(sql, params)
+        finally:
+            duracion = time.perf_counter() - inicio
+            for medicion in pila:
+                medicion.registrar(sql, duracion)
+    return execute_sql
+
+def activar(base=None):
+    """
+    Intercepta execute_sql de la base de datos (por defecto la de la aplicación).
+
+    Las llamadas ya decoradas con instrumentar() mientras estaba desactivada
+    no se miden; para ellas hay que usar medir().
+    """
+    global ACTIVA
+    base = base or database
+    if id(base) not in _originales:
+        _originales[id(base)] = base
+        base.execute_sql = _execute_sql_medido(base.execute_sql)
+    ACTIVA = True
+
+def desactivar(base=None):
+    """Deja de interceptar execute_sql"""
+    global ACTIVA
+    bases = [base] if base else list(_originales.values())
+    for b in bases:
+        if _originales.pop(id(b), None) is not None:
+            del b.execute_sql
+    ACTIVA = bool(_originales)
+
+@contextmanager
+def medir(nombre):
+    """
+    Mide las consultas ejecutadas dentro del bloque.
+
+    Las mediciones se pueden anidar (una acción de la interfaz que llama a
+    varios managers): cada consulta se suma a todas las abiertas.
+
+    Yields:
+        Medicion: La medición en curso, o None si la instrumentación está desactivada
+    """
+    if not ACTIVA:
+        yield None
+        return
+
+    pila = getattr(_hilo, 'pila', None)
+    if pila is None:
+        pila = _hilo.pila = []
+
+    medicion = Medicion(nombre)
+    pila.append(medicion)
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    finally:
+        pila.remove(medicion)
+        medicion.finalizar(time.perf_counter() - inicio)
+        _guardar(medicion)
+
+def _guardar(medicion):
+    with _bloqueo:
+        _historial.append(medicion)
+
+    logger.debug("%s: %d consultas, %.1f ms de SQL en %.1f ms",
+                 medicion.nombre, medicion.consultas, medicion.tiempo_sql * 1000, medicion.duracion * 1000)
+    for forma, veces in medicion.repetidas.items():
+        logger.warning("Posible N+1 en %s: %d ejecuciones de %s", medicion.nombre, veces, forma)
+
+def instrumentar(nombre=None):
+    """
+    Decorador que mide cada llamada a la función con medir().
+
+    Si la instrumentación está desactivada al importar, retorna la función sin cambios.
+    """
+    def decorador(funcion):
+        if not ACTIVA or inspect.iscoroutinefunction(funcion):
+            return funcion
+        etiqueta = nombre or funcion.__qualname__
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def instrumentar_clase(cls=None, excluir=()):
+    """
+    Decorador de clase que aplica instrumentar() a sus métodos públicos
+    (de instancia, staticmethod y classmethod).
+
+    Se usa como @instrumentar_clase o @instrumentar_clase(excluir=(...)),
+    donde excluir son prefijos de métodos que no se miden (por ejemplo los
+    que contienen el bucle principal de la interfaz).
+    """
+    if cls is None:
+        return lambda clase: instrumentar_clase(clase, excluir)
+    if not ACTIVA:
+        return cls
+
+    for nombre, atributo in list(vars(cls).items()):
+        if nombre.startswith('_') or (excluir and nombre.startswith(tuple(excluir))):
+            continue
+        etiqueta = f"{cls.__name__}.{nombre}"
+        if isinstance(atributo, staticmethod):
+            setattr(cls, nombre, staticmethod(instrumentar(etiqueta)(atributo.__func__)))
+        elif isinstance(atributo, classmethod):
+            setattr(cls, nombre, classmethod(instrumentar(etiqueta)(atributo.__func__)))
+        elif inspect.isfunction(atributo):
+            setattr(cls, nombre, instrumentar(etiqueta)(atributo))
+    return cls
+
+def ultimas_mediciones(cantidad=20):
+    """Retorna las últimas mediciones como diccionarios, la más reciente primero"""
+    with _bloqueo:
+        mediciones = list(_historial)[-cantidad:]
+    return [m.como_dict() for m in reversed(mediciones)]
+
+def resumen_por_accion():
+    """
+    Agrupa el historial por nombre de acción.
+
+    Returns:
+        list: Diccionarios con nombre, llamadas, consultas, consultas_max,
+        tiempo_sql y repetidas, ordenados por tiempo de SQL
+    """
+    with _bloqueo:
+        mediciones = list(_historial)
+
+    acciones = {}
+    for m in mediciones:
+        accion = acciones.setdefault(m.nombre, {
+            'nombre': m.nombre, 'llamadas': 0, 'consultas': 0,
+            'consultas_max': 0, 'tiempo_sql': 0.0, 'repetidas': 0
+        })
+        accion['llamadas'] += 1
+        accion['consultas'] += m.consultas
+        accion['consultas_max'] = max(accion['consultas_max'], m.consultas)
+        accion['tiempo_sql'] += m.tiempo_sql
+        accion['repetidas'] += len(m.repetidas)
+
+    return sorted(acciones.values(), key=lambda a: a['tiempo_sql'], reverse=True)
+
+def reporte():
+    """Retorna el resumen por acción como texto"""
+    lineas = [f"{'Acción':45s} {'Llamadas':>8s} {'Consultas':>9s} {'Máx':>6s} {'SQL (ms)':>9s} {'N+1':>4s}"]
+    for a in resumen_por_accion():
+        lineas.append(f"{a['nombre'][:45]:45s} {a['llamadas']:8d} {a['consultas']:9d} "
+                      f"{a['consultas_max']:6d} {a['tiempo_sql'] * 1000:9.1f} {a['repetidas']:4d}")
+    return "\n".join(lineas)
+
+def limpiar():
+    """Vacía el historial de mediciones"""
+    with _bloqueo:
+        _historial.clear()
+
+def _reportar_al_salir():
+    if _historial:
+        logger.info("Consultas por acción:\n%s", reporte())
+
+if ACTIVA:
+    activar()
+    atexit.register(_reportar_al_salir)
@@ -31,17 +31,21 @@ class Laboratorio(BaseModel):
         return f"{self.numero}: {self.titulo} ({self.id_materia.sigla})"
 
     def contar_calificaciones(self):
-        """Cuenta calificaciones resgistradas para este laboratorio"""
-        return self.calificaciones.count()
+        """Cuenta calificaciones resgistradas para este laboratorio (leído de la tabla de resumen)"""
+        from .resumen import ResumenLaboratorio
+
+        return (ResumenLaboratorio.select(ResumenLaboratorio.registros)
+                .where(ResumenLaboratorio.id_laboratorio == self.id)
+                .scalar() or 0)
     
     def promedio_calificaciones(self):
         """Calcula el promedio de todas las calificaciones"""
-        from .calificacion import Calificacion
         from .estudiante import Estudiante
         from .paralelo import Paralelo
+        from .resumen import ResumenLaboratorio
 
         # Obtener total de estudiantes en la materia de este laboratorio
-        materia = self.id_materia
+        materia = self.id_materia_id
         total_estudiantes = Estudiante.select().join(
             Paralelo
         ).where(
@@ -51,54 +55,94 @@ class Laboratorio(BaseModel):
         if total_estudiantes == 0:
             return 0.0
         
-        # Obtener solo las calificaciones que tienen valor
-        calificaciones = self.calificaciones.where(Calificacion.calificacion.is_null(False))
-        total_calificaciones = sum(cal.calificacion for cal in calificaciones)
+        # La suma de las notas con valor se mantiene en la tabla de resumen
+        total_calificaciones = (ResumenLaboratorio.select(ResumenLaboratorio.suma)
+                                .where(ResumenLaboratorio.id_laboratorio == self.id)
+                                .scalar() or 0)
         
         # Dividir por el total de estudiantes posibles, no solo los que tienen nota
         return round(total_calificaciones / total_estudiantes, 2)
     
     def estadisticas_detalladas(self):
         """Retorna estadísticas completas del laboratorio"""
+        return Laboratorio.estadisticas_materia(self.id_materia_id, laboratorio=self)[self.id]
+
+    @classmethod
+    def estadisticas_materia(cls, materia, laboratorio=None):
+        """
+        Retorna las estadísticas detalladas de todos los laboratorios de una materia.
+
+        Usa una sola consulta agrupada por laboratorio; el total de estudiantes
+        de la materia se cuenta una vez como subconsulta.
+
+        Args:
+            materia: Materia de los laboratorios
+            laboratorio: Limita el cálculo a un laboratorio (Opcional)
+
+        Returns:
+            dict: {laboratorio_id: estadísticas} con promedio, nota máxima y
+            mínima, aprobados, reprobados, calificaciones registradas y tasa
+            de completitud (porcentaje de estudiantes con nota)
+        """
         from .calificacion import Calificacion
         from .estudiante import Estudiante
         from .paralelo import Paralelo
 
-        # Obtener total de estudiantes en la materia de este laboratorio
-        materia = self.id_materia
-        total_estudiantes = Estudiante.select().join(
-            Paralelo
-        ).where(
-            Paralelo.id_materia == materia
-        ).count()
-        
-        if total_estudiantes == 0:
-            return {
-                "total_calificaciones": 0,
-                "promedio": 0.0,
-                "nota_maxima": self.puntaje_maximo,
-                "nota_minima": 0.0,
-                "aprobados": 0,
-                "reprobados": 0
+        # Total de estudiantes en la materia de los laboratorios
+        total_estudiantes = (Estudiante.select(fn.COUNT(Estudiante.id))
+                             .join(Paralelo)
+                             .where(Paralelo.id_materia == materia))
+
+        aprobado = Case(None, [(Calificacion.calificacion >= 51, 1)], 0)
+
+        consulta = (cls.select(cls.id,
+                               cls.puntaje_maximo,
+                               fn.COUNT(Calificacion.id),
+                               fn.COUNT(Calificacion.calificacion),
+                               fn.SUM(Calificacion.calificacion),
+                               fn.MAX(Calificacion.calificacion),
+                               fn.MIN(Calificacion.calificacion),
+                               fn.SUM(aprobado),
+                               total_estudiantes)
+                    .join(Calificacion, JOIN.LEFT_OUTER)
+                    .where(cls.id_materia == materia)
+                    .group_by(cls.id)
+                    .order_by(cls.numero))
+
+        if laboratorio is not None:
+            consulta = consulta.where(cls.id == laboratorio)
+
+        estadisticas = {}
+        for (lab_id, puntaje_maximo, registradas, con_nota, suma, maxima, minima,
+             aprobados, estudiantes) in consulta.tuples():
+            if estudiantes == 0:
+                estadisticas[lab_id] = {
+                    "total_calificaciones": 0,
+                    "promedio": 0.0,
+                    "nota_maxima": puntaje_maximo,
+                    "nota_minima": 0.0,
+                    "aprobados": 0,
+                    "reprobados": 0,
+                    "calificaciones_registradas": registradas,
+                    "tasa_completitud": 0.0
+                }
+                continue
+
+            aprobados = aprobados or 0
+
+            # Calcular promedio considerando todos los estudiantes posibles
+            estadisticas[lab_id] = {
+                "total_calificaciones": con_nota,
+                "promedio": (suma or 0) / estudiantes,
+                "nota_maxima": maxima if maxima is not None else 0.0,
+                "nota_minima": minima if minima is not None else 0.0,
+                "aprobados": aprobados,
+                "reprobados": con_nota - aprobados,
+                "calificaciones_registradas": registradas,
+                "tasa_completitud": round(con_nota / estudiantes * 100, 2)
             }
-        
-        # Obtener calificaciones con valor
-        calificaciones_con_valor = self.calificaciones.where(Calificacion.calificacion.is_null(False))
-        notas = [cal.calificacion for cal in calificaciones_con_valor]
-        total_calificaciones = sum(notas)
-        
-        # Calcular promedio considerando todos los estudiantes posibles
-        promedio = total_calificaciones / total_estudiantes if total_estudiantes else 0.0
-        aprobados = len([nota for nota in notas if nota >= 51])
-        
-        return{
-            "total_calificaciones": len(notas),
-            "promedio": promedio,
-            "nota_maxima": max(notas) if notas else 0.0,
-            "nota_minima": min(notas) if notas else 0.0,
-            "aprobados": aprobados,
-            "reprobados": len(notas) - aprobados
-        }
+
+        return estadisticas
 
     @classmethod
     def obtener_por_materia(cls, materia, ordenar_por_numero=True):
@@ -33,10 +33,13 @@ class Materia(BaseModel):
 
     def contar_estudiantes_total(self):
         """Cuenta el total de estudiantes en todos los paralelos"""
-        total = 0
-        for paralelo in self.paralelos:
-            total += paralelo.estudiantes.count()
-        return total
+        from .paralelo import Paralelo
+        from .estudiante import Estudiante
+
+        return (Estudiante.select()
+                .join(Paralelo)
+                .where(Paralelo.id_materia == self)
+                .count())
 
     @classmethod
     def obtener_por_sigla(cls, sigla):
@@ -56,6 +59,55 @@ class Materia(BaseModel):
             "estudiantes": self.contar_estudiantes_total(),
         }
     
+    @classmethod
+    def estadisticas_por_materia(cls):
+        """
+        Retorna los conteos de todas las materias con una consulta agrupada por concepto.
+
+        La cantidad de consultas es fija (materias, paralelos, laboratorios,
+        estudiantes y calificaciones) sin importar cuántas materias o
+        paralelos existan. Las calificaciones se suman desde la tabla de
+        resumen por paralelo.
+
+        Returns:
+            list: Un diccionario por materia, ordenado por sigla, con 'id',
+            'sigla', 'materia', 'paralelos', 'laboratorios', 'estudiantes'
+            y 'calificaciones'
+        """
+        from .paralelo import Paralelo
+        from .estudiante import Estudiante
+        from .laboratorio import Laboratorio
+        from .resumen import ResumenParalelo
+
+        paralelos = dict(Paralelo
+                         .select(Paralelo.id_materia, fn.COUNT(Paralelo.id))
+                         .group_by(Paralelo.id_materia)
+                         .tuples())
+        laboratorios = dict(Laboratorio
+                            .select(Laboratorio.id_materia, fn.COUNT(Laboratorio.id))
+                            .group_by(Laboratorio.id_materia)
+                            .tuples())
+        estudiantes = dict(Estudiante
+                           .select(Paralelo.id_materia, fn.COUNT(Estudiante.id))
+                           .join(Paralelo)
+                           .group_by(Paralelo.id_materia)
+                           .tuples())
+        calificaciones = dict(ResumenParalelo
+                              .select(Paralelo.id_materia, fn.SUM(ResumenParalelo.registros))
+                              .join(Paralelo, on=(Paralelo.id == ResumenParalelo.id_paralelo))
+                              .group_by(Paralelo.id_materia)
+                              .tuples())
+
+        return [{
+            "id": materia_id,
+            "sigla": sigla,
+            "materia": nombre,
+            "paralelos": paralelos.get(materia_id, 0),
+            "laboratorios": laboratorios.get(materia_id, 0),
+            "estudiantes": estudiantes.get(materia_id, 0),
+            "calificaciones": calificaciones.get(materia_id) or 0,
+        } for materia_id, sigla, nombre in cls.select(cls.id, cls.sigla, cls.materia).order_by(cls.sigla).tuples()]
+
     @classmethod
     def obtener_por_materia(cls, materia, ordenar_por_numero=True):
         """Obtiene todos los laboratorios de una materia"""
@@ -0,0 +1,152 @@
+"""
+Migraciones versionadas del esquema de la base de datos.
+
+create_tables(safe=True) solo crea lo que falta al crear las tablas, por eso
+los cambios posteriores al esquema original (índices, tablas auxiliares, etc.)
+se registran aquí como migraciones numeradas. Cada una se aplica una sola vez
+y su versión queda guardada en la tabla schema_version.
+"""
+
+import logging
+from datetime import datetime
+from peewee import *
+from .database import database
+from . import resumen, cambios
+
+logger = logging.getLogger(__name__)
+
+
+class VersionEsquema(Model):
+    """
+    Registro de las migraciones aplicadas a la base de datos.
+    """
+    version = IntegerField(primary_key=True)
+    descripcion = CharField(max_length=200)
+    fecha_aplicacion = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = database
+        table_name = 'schema_version'
+
+
+# Lista ordenada de migraciones. Cada migración indica:
+# - version: número único y creciente
+# - descripcion: qué cambia
+# - sentencias: SQL a ejecutar (idempotente, se aplica dentro de una transacción)
+# - verificacion: consulta y parámetros para comparar el EXPLAIN QUERY PLAN antes y después (Opcional)
+# - indice: nombre del índice que debe aparecer en el plan después de migrar (Opcional)
+MIGRACIONES = [
+    {
+        'version': 1,
+        'descripcion': 'Índice por CI en estudiantes (buscar_por_ci)',
+        'sentencias': [
+            'CREATE INDEX IF NOT EXISTS "estudiante_ci" ON "estudiantes" ("ci")',
+        ],
+        'verificacion': ('SELECT "id" FROM "estudiantes" WHERE "ci" = ?', ('0',)),
+        'indice': 'estudiante_ci',
+    },
+    {
+        'version': 2,
+        'descripcion': 'Índice por laboratorio y nota en calificaciones (estadísticas de laboratorio)',
+        'sentencias': [
+            'CREATE INDEX IF NOT EXISTS "calificacion_id_laboratorio_id_calificacion" '
+            'ON "calificaciones" ("id_laboratorio_id", "calificacion")',
+        ],
+        'verificacion': ('SELECT COUNT("calificacion"), SUM("calificacion") FROM "calificaciones" '
+                         'WHERE "id_laboratorio_id" = ?', (0,)),
+        'indice': 'calificacion_id_laboratorio_id_calificacion',
+    },
+    {
+        'version': 3,
+        'descripcion': 'Tablas de resumen de calificaciones mantenidas por triggers',
+        'sentencias': resumen.sentencias_esquema() + resumen.sentencias_reconstruccion(),
+    },
+    {
+        'version': 4,
+        'descripcion': 'Registro de cambios llenado por triggers (recálculo incremental de estadísticas)',
+        'sentencias': cambios.sentencias_esquema(),
+    },
+    {
+        'version': 5,
+        'descripcion': 'Índice por paralelo y nombre en estudiantes (listado paginado por clave)',
+        'sentencias': [
+            'CREATE INDEX IF NOT EXISTS "estudiante_id_paralelo_id_nombre" '
+            'ON "estudiantes" ("id_paralelo_id", "nombre")',
+        ],
+        'verificacion': ('SELECT "nombre", "id" FROM "estudiantes" WHERE "id_paralelo_id" = ? '
+                         'AND ("nombre", "id") > (?, ?) ORDER BY "nombre", "id" LIMIT 101', (0, '', 0)),
+        'indice': 'estudiante_id_paralelo_id_nombre',
+    },
+]
+
+
+def explicar_consulta(sql, parametros=(), db=None):
+    """
+    Retorna el plan de ejecución de una consulta.
+
+    Args:
+        sql (str): Consulta a analizar
+        parametros (tuple): Parámetros de la consulta
+        db (Database): Base de datos (por defecto la de VersionEsquema)
+
+    Returns:
+        list: Líneas de detalle del EXPLAIN QUERY PLAN
+    """
+    db = db or VersionEsquema._meta.database
+    cursor = db.execute_sql(f"EXPLAIN QUERY PLAN {sql}", parametros)
+    return [fila[-1] for fila in cursor.fetchall()]
+
+
+def version_actual():
+    """Retorna la última versión de esquema aplicada (0 si no hay ninguna)"""
+    VersionEsquema.create_table(safe=True)
+    return VersionEsquema.select(fn.MAX(VersionEsquema.version)).scalar() or 0
+
+
+def aplicar_migraciones():
+    """
+    Aplica en orden las migraciones pendientes.
+
+    Cada migración se ejecuta en su propia transacción junto con el registro
+    de su versión. Se compara el plan de la consulta de verificación antes y
+    después para confirmar que el índice nuevo se utiliza.
+
+    Returns:
+        list: Un diccionario por migración aplicada con versión, descripción
+        y planes antes/después
+    """
+    db = VersionEsquema._meta.database
+    actual = version_actual()
+    aplicadas = []
+
+    for migracion in MIGRACIONES:
+        if migracion['version'] <= actual:
+            continue
+
+        verificacion = migracion.get('verificacion')
+        plan_antes = explicar_consulta(*verificacion) if verificacion else []
+
+        with db.atomic():
+            for sentencia in migracion['sentencias']:
+                db.execute_sql(sentencia)
+            VersionEsquema.create(version=migracion['version'], descripcion=migracion['descripcion'])
+
+        plan_despues = explicar_consulta(*verificacion) if verificacion else []
+
+        logger.info("Migración %s aplicada: %s", migracion['version'], migracion['descripcion'])
+        if verificacion:
+            logger.info("  Plan antes:   %s", " | ".join(plan_antes))
+            logger.info("  Plan después: %s", " | ".join(plan_despues))
+
+        indice = migracion.get('indice')
+        if indice and not any(indice in linea for linea in plan_despues):
+            logger.warning("La consulta de verificación no usa el índice %s", indice)
+
+        aplicadas.append({
+            'version': migracion['version'],
+            'descripcion': migracion['descripcion'],
+            'plan_antes': plan_antes,
+            'plan_despues': plan_despues
+        })
+
+    return aplicadas
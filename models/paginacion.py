@@ -0,0 +1,88 @@
+"""
+Paginación por clave (keyset) para listados grandes.
+
+En lugar de OFFSET, cada página continúa desde los valores de orden de la
+última fila de la página anterior (el cursor), por lo que pedir la página
+100 cuesta lo mismo que pedir la primera y las filas insertadas o borradas
+mientras tanto no hacen saltar ni repetir filas.
+
+Cada página se lee en dos consultas cortas: una que recorre solo las claves
+de orden (puede usar un índice y no crea instancias de Model) y otra que
+carga las filas de esa página por ID.
+
+Uso:
+
+    pagina = paginar(consulta, [Estudiante.nombre, Estudiante.id], tamano=100)
+    pagina['elementos']                        # instancias de la página
+    paginar(consulta, claves, despues=pagina['siguiente'])   # página siguiente
+    paginar(consulta, claves, antes=pagina['anterior'])      # página anterior
+"""
+
+from peewee import Tuple
+
+# Filas por página si no se indica otra cantidad
+TAMANO_PAGINA = 100
+
+
+def pagina_vacia():
+    """Página sin elementos (por ejemplo, cuando el paralelo no existe)"""
+    return {'elementos': [], 'total': 0, 'siguiente': None, 'anterior': None}
+
+
+def paginar(consulta, claves, tamano=TAMANO_PAGINA, despues=None, antes=None, descendente=False):
+    """
+    Retorna una página de la consulta ordenada por las claves.
+
+    Args:
+        consulta (ModelSelect): Consulta filtrada y sin orden; lo que selecciona
+            es lo que se carga en cada elemento (por ejemplo Calificacion y Estudiante)
+        claves (list): Expresiones de orden; la última debe ser el ID del
+            modelo para que el orden sea total. Las columnas que admiten NULL
+            deben ir envueltas en fn.COALESCE
+        tamano (int): Cantidad máxima de elementos
+        despues (tuple): Cursor 'siguiente' de la página anterior (Opcional)
+        antes (tuple): Cursor 'anterior' de la página siguiente (Opcional)
+        descendente (bool): Orden descendente en todas las claves
+
+    Returns:
+        dict: {'elementos': list, 'total': int, 'siguiente': tuple|None,
+        'anterior': tuple|None}. Los cursores son None cuando no hay más
+        filas en esa dirección
+    """
+    if despues is not None and antes is not None:
+        raise ValueError("Indique solo uno de 'despues' o 'antes'")
+
+    tamano = max(1, int(tamano))
+    hacia_atras = antes is not None
+    cursor = antes if hacia_atras else despues
+
+    # Hacia atrás se recorre en el orden inverso y luego se da vuelta la página
+    invertido = descendente != hacia_atras
+    llaves = consulta.select(*claves).order_by(*[c.desc() if invertido else c.asc() for c in claves])
+    if cursor is not None:
+        fila = Tuple(*claves)
+        llaves = llaves.where(fila < Tuple(*cursor) if invertido else fila > Tuple(*cursor))
+
+    filas = list(llaves.limit(tamano + 1).tuples())
+    hay_mas = len(filas) > tamano
+    filas = filas[:tamano]
+    if hacia_atras:
+        filas.reverse()
+
+    ids = [fila[-1] for fila in filas]
+    id_modelo = claves[-1]
+    por_id = {elemento.id: elemento for elemento in consulta.where(id_modelo.in_(ids))} if ids else {}
+
+    primera = tuple(filas[0]) if filas else None
+    ultima = tuple(filas[-1]) if filas else None
+    if hacia_atras:
+        siguiente, anterior = ultima, (primera if hay_mas else None)
+    else:
+        siguiente, anterior = (ultima if hay_mas else None), (primera if despues is not None else None)
+
+    return {
+        'elementos': [por_id[i] for i in ids if i in por_id],
+        'total': consulta.count(),
+        'siguiente': siguiente,
+        'anterior': anterior,
+    }
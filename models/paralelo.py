@@ -56,17 +56,15 @@ class Paralelo(BaseModel):
         if total_laboratorios == 0:
             return 0.0
         
-        # Obtener estudiantes de este paralelo
-        estudiantes = self.estudiantes
-        total_promedios = 0.0
-        total_estudiantes = estudiantes.count()
+        # Obtener el promedio de cada estudiante de este paralelo en una sola consulta
+        promedios = Estudiante.promedios_calificaciones(paralelo=self)
+        total_estudiantes = len(promedios)
         
         if total_estudiantes == 0:
             return 0.0
         
         # Sumar el promedio de cada estudiante
-        for estudiante in estudiantes:
-            total_promedios += estudiante.promedio_calificaciones()
+        total_promedios = sum(promedios.values())
         
         # Dividir por el total de estudiantes
         return round(total_promedios / total_estudiantes, 2)
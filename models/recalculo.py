@@ -0,0 +1,341 @@
+"""
+Recálculo incremental de estadísticas a partir del registro de cambios.
+
+EstadisticasIncrementales guarda las estadísticas y matrices de los
+paralelos y las estadísticas de laboratorios que ya se pidieron. Antes de
+responder lee el registro de cambios desde su último punto de control y
+recalcula solo lo afectado:
+
+- una calificación: su paralelo y su laboratorio
+- un estudiante: su paralelo (y los laboratorios de la materia si entró o salió)
+- un laboratorio o una materia: todos los paralelos y laboratorios de la materia
+- un paralelo: ese paralelo
+
+Así un tablero se refresca en un tiempo proporcional a lo que cambió y no
+al tamaño de la base de datos.
+
+El servicio se comparte entre sesiones (st.cache_resource en la web), por
+eso cada lectura retorna una copia profunda de lo guardado y los recálculos
+se hacen fuera del bloqueo. La depuración del registro de cambios no se
+hace al leer sino al iniciar la base de datos (ver models/cambios.py).
+"""
+
+import copy
+import threading
+
+from .paralelo import Paralelo
+from .laboratorio import Laboratorio
+from .calificacion import Calificacion
+from .cambios import alcance_cambios, primer_cambio, ultimo_cambio
+
+
+class EstadisticasIncrementales:
+    """
+    Estadísticas de paralelos y laboratorios mantenidas al día con el registro de cambios.
+
+    Las consultas se hacen sin el bloqueo: solo se toma para ver qué hay
+    guardado y para reemplazarlo por lo recalculado, así una sesión que
+    recalcula no detiene las lecturas de las demás. Lo guardado no se
+    modifica nunca en su lugar, se reemplaza entero.
+    """
+
+    def __init__(self):
+        self.punto_control = None
+        self._estadisticas_paralelo = {}      # id_paralelo -> estadísticas
+        self._matrices = {}                   # id_paralelo -> matriz
+        self._materia_de_paralelo = {}        # id_paralelo -> id_materia
+        self._estadisticas_laboratorios = {}  # id_materia -> {id_laboratorio: estadísticas}
+        self._bloqueo = threading.Lock()
+        self._metricas = {'actualizaciones': 0, 'cambios': 0, 'paralelos_recalculados': 0,
+                          'laboratorios_recalculados': 0, 'calculos': 0, 'reinicios': 0}
+
+    def actualizar(self):
+        """
+        Procesa los cambios posteriores al punto de control.
+
+        Si otro hilo avanzó el punto de control mientras se recalculaba, lo
+        recalculado se descarta y se vuelve a intentar desde el punto nuevo
+        (salvo que ese punto ya incluya todos los cambios leídos).
+
+        Returns:
+            dict: punto_control, alcances (filas distintas del registro),
+            paralelos y laboratorios recalculados
+        """
+        while True:
+            with self._bloqueo:
+                punto_control = self.punto_control
+                guardado = (dict(self._materia_de_paralelo), set(self._estadisticas_paralelo),
+                            set(self._matrices),
+                            {id_materia: dict(estadisticas)
+                             for id_materia, estadisticas in self._estadisticas_laboratorios.items()})
+
+            if punto_control is None:
+                # Sin nada guardado todavía no hay qué recalcular
+                ultimo = ultimo_cambio()
+                with self._bloqueo:
+                    if self.punto_control is None:
+                        self.punto_control = ultimo
+                    return {'punto_control': self.punto_control, 'alcances': 0,
+                            'paralelos': 0, 'laboratorios': 0}
+
+            primero = primer_cambio()
+            if primero is not None and primero > punto_control + 1:
+                # Se depuraron cambios que este proceso no llegó a leer
+                ultimo = ultimo_cambio()
+                with self._bloqueo:
+                    if self.punto_control == punto_control:
+                        self._olvidar_todo()
+                        self.punto_control = ultimo
+                        self._metricas['reinicios'] += 1
+                    return {'punto_control': self.punto_control, 'alcances': 0,
+                            'paralelos': 0, 'laboratorios': 0}
+
+            hasta, alcances = alcance_cambios(punto_control)
+            paralelos, materias, laboratorios = self._afectados(alcances)
+            materia_de_paralelo, con_estadisticas, con_matriz, estadisticas_laboratorios = guardado
+
+            nuevos_paralelos = self._recalcular_paralelos(
+                materia_de_paralelo, con_estadisticas, con_matriz, paralelos, materias)
+            nuevos_laboratorios, recalculados_laboratorios = self._recalcular_laboratorios(
+                estadisticas_laboratorios, materias, laboratorios)
+
+            with self._bloqueo:
+                if self.punto_control != punto_control:
+                    if self.punto_control is not None and self.punto_control >= hasta:
+                        return {'punto_control': self.punto_control, 'alcances': 0,
+                                'paralelos': 0, 'laboratorios': 0}
+                    continue
+
+                self._reemplazar(materia_de_paralelo, estadisticas_laboratorios, paralelos, materias,
+                                 laboratorios, nuevos_paralelos, nuevos_laboratorios)
+                self._metricas['actualizaciones'] += 1
+                self._metricas['cambios'] += hasta - punto_control
+                self._metricas['paralelos_recalculados'] += len(nuevos_paralelos)
+                self._metricas['laboratorios_recalculados'] += recalculados_laboratorios
+                self.punto_control = hasta
+
+            return {'punto_control': hasta, 'alcances': len(alcances),
+                    'paralelos': len(nuevos_paralelos), 'laboratorios': recalculados_laboratorios}
+
+    @staticmethod
+    def _afectados(alcances):
+        """
+        Traduce los alcances del registro a lo que hay que recalcular.
+
+        Returns:
+            tuple: (paralelos, materias completas, {id_materia: laboratorios})
+        """
+        paralelos, materias, laboratorios = set(), set(), {}
+        for entidad, operacion, id_materia, id_paralelo, id_laboratorio in alcances:
+            if entidad == 'calificacion':
+                paralelos.add(id_paralelo)
+                laboratorios.setdefault(id_materia, set()).add(id_laboratorio)
+            elif entidad == 'estudiante':
+                paralelos.add(id_paralelo)
+                if operacion != 'UPDATE':
+                    # Cambia el total de estudiantes de la materia (tasa de completitud)
+                    materias.add(id_materia)
+            elif entidad == 'paralelo':
+                paralelos.add(id_paralelo)
+            else:
+                # Laboratorios y materias cambian las columnas de todas las matrices
+                materias.add(id_materia)
+        paralelos.discard(None)
+        materias.discard(None)
+        laboratorios.pop(None, None)
+        return paralelos, materias, laboratorios
+
+    @staticmethod
+    def _recalcular_paralelos(materia_de_paralelo, con_estadisticas, con_matriz, paralelos, materias):
+        """
+        Recalcula los paralelos guardados afectados.
+
+        Returns:
+            dict: {id_paralelo: (id_materia, estadísticas, matriz)}; None si el
+            paralelo ya no existe. Estadísticas o matriz son None si no estaban guardadas
+        """
+        nuevos = {}
+        for id_paralelo, id_materia in materia_de_paralelo.items():
+            if id_paralelo not in paralelos and id_materia not in materias:
+                continue
+            paralelo = Paralelo.get_or_none(Paralelo.id == id_paralelo)
+            if paralelo is None:
+                nuevos[id_paralelo] = None
+                continue
+            nuevos[id_paralelo] = (
+                paralelo.id_materia_id,
+                Calificacion.estadisticas_paralelo(paralelo) if id_paralelo in con_estadisticas else None,
+                Calificacion.matriz_calificaciones_paralelo(paralelo) if id_paralelo in con_matriz else None,
+            )
+        return nuevos
+
+    @staticmethod
+    def _recalcular_laboratorios(estadisticas_laboratorios, materias, laboratorios):
+        """
+        Recalcula las estadísticas de laboratorios guardadas: completas para
+        las materias afectadas, por laboratorio para las calificaciones.
+
+        Returns:
+            tuple: ({id_materia: estadísticas nuevas, None si la materia ya no
+            tiene laboratorios}, laboratorios recalculados)
+        """
+        nuevas, recalculados = {}, 0
+        for id_materia, estadisticas in estadisticas_laboratorios.items():
+            cambiados = laboratorios.get(id_materia, ())
+            if id_materia in materias or len(cambiados) > 1:
+                # Una sola consulta agrupada cuesta lo mismo que una por laboratorio
+                nuevas[id_materia] = Laboratorio.estadisticas_materia(id_materia)
+                recalculados += len(nuevas[id_materia]) if id_materia in materias else len(cambiados)
+            elif cambiados:
+                id_laboratorio, = cambiados
+                estadisticas = dict(estadisticas)
+                resultado = Laboratorio.estadisticas_materia(id_materia, laboratorio=id_laboratorio)
+                if id_laboratorio in resultado:
+                    estadisticas[id_laboratorio] = resultado[id_laboratorio]
+                else:
+                    estadisticas.pop(id_laboratorio, None)
+                nuevas[id_materia] = estadisticas
+                recalculados += 1
+            else:
+                continue
+            # Las materias eliminadas quedan sin laboratorios
+            if not nuevas[id_materia]:
+                nuevas[id_materia] = None
+        return nuevas, recalculados
+
+    def _reemplazar(self, materia_de_paralelo, estadisticas_laboratorios, paralelos, materias,
+                    laboratorios, nuevos_paralelos, nuevas_estadisticas):
+        """
+        Reemplaza lo guardado por lo recalculado (con el bloqueo tomado).
+
+        Lo que se guardó mientras se recalculaba y está afectado por los
+        cambios se olvida: pudo calcularse antes de esos cambios.
+        """
+        for id_paralelo, id_materia in list(self._materia_de_paralelo.items()):
+            if id_paralelo not in materia_de_paralelo and (id_paralelo in paralelos or id_materia in materias):
+                self._olvidar_paralelo(id_paralelo)
+        for id_paralelo, nuevo in nuevos_paralelos.items():
+            if nuevo is None:
+                self._olvidar_paralelo(id_paralelo)
+                continue
+            id_materia, estadisticas, matriz = nuevo
+            self._materia_de_paralelo[id_paralelo] = id_materia
+            if estadisticas is not None:
+                self._estadisticas_paralelo[id_paralelo] = estadisticas
+            if matriz is not None:
+                self._matrices[id_paralelo] = matriz
+
+        for id_materia in list(self._estadisticas_laboratorios):
+            if id_materia not in estadisticas_laboratorios and (id_materia in materias or id_materia in laboratorios):
+                del self._estadisticas_laboratorios[id_materia]
+        for id_materia, estadisticas in nuevas_estadisticas.items():
+            if estadisticas is None:
+                self._estadisticas_laboratorios.pop(id_materia, None)
+            else:
+                self._estadisticas_laboratorios[id_materia] = estadisticas
+
+    def _olvidar_paralelo(self, id_paralelo):
+        self._estadisticas_paralelo.pop(id_paralelo, None)
+        self._matrices.pop(id_paralelo, None)
+        self._materia_de_paralelo.pop(id_paralelo, None)
+
+    def _olvidar_todo(self):
+        self._estadisticas_paralelo.clear()
+        self._matrices.clear()
+        self._materia_de_paralelo.clear()
+        self._estadisticas_laboratorios.clear()
+
+    def _leer(self, guardados, clave):
+        """
+        Retorna lo guardado (None si falta) después de actualizar y, si falta,
+        el último cambio registrado antes de calcularlo
+        """
+        self.actualizar()
+        with self._bloqueo:
+            guardado = guardados.get(clave)
+        return guardado, (ultimo_cambio() if guardado is None else None)
+
+    def _guardar(self, desde, guardados, clave, valor, id_materia=None):
+        """
+        Guarda lo calculado fuera del bloqueo si incluye todos los cambios
+        hasta el punto de control: se calculó después del cambio 'desde' y
+        el punto de control no lo pasó mientras tanto.
+        """
+        with self._bloqueo:
+            self._metricas['calculos'] += 1
+            if self.punto_control is not None and self.punto_control <= desde and clave not in guardados:
+                guardados[clave] = valor
+                if id_materia is not None:
+                    self._materia_de_paralelo[clave] = id_materia
+
+    def estadisticas_paralelo(self, id_paralelo):
+        """
+        Estadísticas de un paralelo (ver Calificacion.estadisticas_paralelo).
+
+        Returns:
+            dict: Estadísticas, o None si el paralelo no existe
+        """
+        estadisticas, desde = self._leer(self._estadisticas_paralelo, id_paralelo)
+        if estadisticas is None:
+            paralelo = Paralelo.get_or_none(Paralelo.id == id_paralelo)
+            if paralelo is None:
+                return None
+            estadisticas = Calificacion.estadisticas_paralelo(paralelo)
+            self._guardar(desde, self._estadisticas_paralelo, id_paralelo, estadisticas,
+                          paralelo.id_materia_id)
+        return copy.deepcopy(estadisticas)
+
+    def matriz_paralelo(self, id_paralelo):
+        """
+        Matriz de calificaciones de un paralelo (ver Calificacion.matriz_calificaciones_paralelo).
+
+        Returns:
+            list: Filas de la matriz (vacía si el paralelo no existe)
+        """
+        matriz, desde = self._leer(self._matrices, id_paralelo)
+        if matriz is None:
+            paralelo = Paralelo.get_or_none(Paralelo.id == id_paralelo)
+            if paralelo is None:
+                return []
+            matriz = Calificacion.matriz_calificaciones_paralelo(paralelo)
+            self._guardar(desde, self._matrices, id_paralelo, matriz, paralelo.id_materia_id)
+        return copy.deepcopy(matriz)
+
+    def estadisticas_laboratorios(self, id_materia):
+        """
+        Estadísticas de los laboratorios de una materia (ver Laboratorio.estadisticas_materia).
+
+        Returns:
+            dict: {id_laboratorio: estadísticas}
+        """
+        estadisticas, desde = self._leer(self._estadisticas_laboratorios, id_materia)
+        if estadisticas is None:
+            estadisticas = Laboratorio.estadisticas_materia(id_materia)
+            if not estadisticas:
+                return {}
+            self._guardar(desde, self._estadisticas_laboratorios, id_materia, estadisticas)
+        return copy.deepcopy(estadisticas)
+
+    def limpiar(self):
+        """Olvida todo lo guardado; se vuelve a calcular al pedirlo"""
+        with self._bloqueo:
+            self.punto_control = None
+            self._olvidar_todo()
+
+    def metricas(self):
+        """
+        Retorna el estado del servicio.
+
+        Returns:
+            dict: punto_control, paralelos y materias guardados, actualizaciones,
+            cambios procesados, recálculos, cálculos completos y reinicios
+            (veces que se depuraron cambios sin leer y se volvió a calcular todo)
+        """
+        with self._bloqueo:
+            metricas = dict(self._metricas)
+            metricas.update({
+                'punto_control': self.punto_control,
+                'paralelos': len(self._materia_de_paralelo),
+                'materias': len(self._estadisticas_laboratorios),
+            })
+            return metricas
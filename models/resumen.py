@@ -0,0 +1,234 @@
+"""
+Tablas de resumen con los agregados de calificaciones.
+
+Guardan, por estudiante, por laboratorio y por paralelo, la suma de las
+notas, cuántas notas tienen valor y cuántos registros de calificación
+existen. Las mantienen actualizadas triggers de SQLite sobre la tabla
+calificaciones, de modo que cualquier escritura (managers, interfaces o
+SQL directo) las deja al día y los promedios se leen por clave primaria
+en lugar de recorrer todas las calificaciones.
+"""
+
+from peewee import *
+from .database import database
+
+
+class ResumenBase(Model):
+    """
+    Campos comunes de las tablas de resumen.
+    """
+    suma = FloatField(default=0)          # Suma de las notas con valor
+    cantidad = IntegerField(default=0)    # Calificaciones con nota
+    registros = IntegerField(default=0)   # Calificaciones registradas (con o sin nota)
+
+    class Meta:
+        database = database
+
+
+class ResumenEstudiante(ResumenBase):
+    """Agregados de las calificaciones de un estudiante"""
+    id_estudiante = IntegerField(primary_key=True)
+
+    class Meta:
+        table_name = 'resumen_estudiante'
+
+
+class ResumenLaboratorio(ResumenBase):
+    """Agregados de las calificaciones de un laboratorio"""
+    id_laboratorio = IntegerField(primary_key=True)
+
+    class Meta:
+        table_name = 'resumen_laboratorio'
+
+
+class ResumenParalelo(ResumenBase):
+    """Agregados de las calificaciones de los estudiantes de un paralelo"""
+    id_paralelo = IntegerField(primary_key=True)
+
+    class Meta:
+        table_name = 'resumen_paralelo'
+
+
+# Cada resumen indica su tabla, su clave y cómo obtener la clave a partir de
+# una fila de calificaciones ({fila} es NEW u OLD dentro de los triggers)
+RESUMENES = [
+    ('resumen_estudiante', 'id_estudiante', '{fila}.id_estudiante_id'),
+    ('resumen_laboratorio', 'id_laboratorio', '{fila}.id_laboratorio_id'),
+    ('resumen_paralelo', 'id_paralelo',
+     '(SELECT id_paralelo_id FROM estudiantes WHERE id = {fila}.id_estudiante_id)'),
+]
+
+# Consultas que calculan los agregados desde las calificaciones
+CONSULTAS_AGREGADOS = {
+    'resumen_estudiante': (
+        'SELECT id_estudiante_id, SUM(COALESCE(calificacion, 0)), COUNT(calificacion), COUNT(*) '
+        'FROM calificaciones GROUP BY id_estudiante_id'
+    ),
+    'resumen_laboratorio': (
+        'SELECT id_laboratorio_id, SUM(COALESCE(calificacion, 0)), COUNT(calificacion), COUNT(*) '
+        'FROM calificaciones GROUP BY id_laboratorio_id'
+    ),
+    'resumen_paralelo': (
+        'SELECT e.id_paralelo_id, SUM(COALESCE(c.calificacion, 0)), COUNT(c.calificacion), COUNT(*) '
+        'FROM calificaciones c JOIN estudiantes e ON e.id = c.id_estudiante_id '
+        'GROUP BY e.id_paralelo_id'
+    ),
+}
+
+
+def _sumar(tabla, columna, clave, fila):
+    """SQL que suma una fila de calificaciones al resumen (crea la fila si no existe)"""
+    clave = clave.format(fila=fila)
+    return (
+        f'INSERT INTO {tabla} ({columna}, suma, cantidad, registros) '
+        f'SELECT {clave}, COALESCE({fila}.calificacion, 0), {fila}.calificacion IS NOT NULL, 1 '
+        f'WHERE {clave} IS NOT NULL '
+        f'ON CONFLICT({columna}) DO UPDATE SET '
+        f'suma = suma + excluded.suma, '
+        f'cantidad = cantidad + excluded.cantidad, '
+        f'registros = registros + excluded.registros;'
+    )
+
+
+def _restar(tabla, columna, clave, fila):
+    """SQL que descuenta una fila de calificaciones del resumen"""
+    clave = clave.format(fila=fila)
+    return (
+        f'UPDATE {tabla} SET '
+        f'suma = suma - COALESCE({fila}.calificacion, 0), '
+        f'cantidad = cantidad - ({fila}.calificacion IS NOT NULL), '
+        f'registros = registros - 1 '
+        f'WHERE {columna} = {clave};'
+    )
+
+
+def _trigger(nombre, evento, cuerpo, condicion=''):
+    return f'CREATE TRIGGER IF NOT EXISTS {nombre} AFTER {evento} {condicion}BEGIN {" ".join(cuerpo)} END'
+
+
+def sentencias_esquema():
+    """
+    SQL que crea las tablas de resumen y los triggers que las mantienen.
+
+    Returns:
+        list: Sentencias idempotentes (IF NOT EXISTS)
+    """
+    sentencias = []
+    for tabla, columna, _ in RESUMENES:
+        sentencias.append(
+            f'CREATE TABLE IF NOT EXISTS {tabla} ('
+            f'{columna} INTEGER NOT NULL PRIMARY KEY, '
+            f'suma REAL NOT NULL DEFAULT 0, '
+            f'cantidad INTEGER NOT NULL DEFAULT 0, '
+            f'registros INTEGER NOT NULL DEFAULT 0)'
+        )
+
+    sentencias.append(_trigger(
+        'resumen_calificacion_insert', 'INSERT ON calificaciones',
+        [_sumar(*resumen, 'NEW') for resumen in RESUMENES]))
+    sentencias.append(_trigger(
+        'resumen_calificacion_delete', 'DELETE ON calificaciones',
+        [_restar(*resumen, 'OLD') for resumen in RESUMENES]))
+    sentencias.append(_trigger(
+        'resumen_calificacion_update',
+        'UPDATE OF calificacion, id_estudiante_id, id_laboratorio_id ON calificaciones',
+        [_restar(*resumen, 'OLD') for resumen in RESUMENES] +
+        [_sumar(*resumen, 'NEW') for resumen in RESUMENES]))
+
+    # Si un estudiante cambia de paralelo, sus notas pasan al resumen del nuevo paralelo
+    sentencias.append(_trigger(
+        'resumen_estudiante_cambio_paralelo', 'UPDATE OF id_paralelo_id ON estudiantes',
+        [
+            'UPDATE resumen_paralelo SET '
+            'suma = suma - (SELECT suma FROM resumen_estudiante WHERE id_estudiante = NEW.id), '
+            'cantidad = cantidad - (SELECT cantidad FROM resumen_estudiante WHERE id_estudiante = NEW.id), '
+            'registros = registros - (SELECT registros FROM resumen_estudiante WHERE id_estudiante = NEW.id) '
+            'WHERE id_paralelo = OLD.id_paralelo_id '
+            'AND EXISTS (SELECT 1 FROM resumen_estudiante WHERE id_estudiante = NEW.id);',
+            'INSERT INTO resumen_paralelo (id_paralelo, suma, cantidad, registros) '
+            'SELECT NEW.id_paralelo_id, suma, cantidad, registros FROM resumen_estudiante '
+            'WHERE id_estudiante = NEW.id '
+            'ON CONFLICT(id_paralelo) DO UPDATE SET '
+            'suma = suma + excluded.suma, '
+            'cantidad = cantidad + excluded.cantidad, '
+            'registros = registros + excluded.registros;',
+        ],
+        condicion='WHEN OLD.id_paralelo_id IS NOT NEW.id_paralelo_id '))
+
+    # Al eliminar la entidad se elimina su fila de resumen
+    for tabla, columna, entidad in (('resumen_estudiante', 'id_estudiante', 'estudiantes'),
+                                    ('resumen_laboratorio', 'id_laboratorio', 'laboratorios'),
+                                    ('resumen_paralelo', 'id_paralelo', 'paralelos')):
+        sentencias.append(_trigger(
+            f'{tabla}_eliminar', f'DELETE ON {entidad}',
+            [f'DELETE FROM {tabla} WHERE {columna} = OLD.id;']))
+
+    return sentencias
+
+
+def sentencias_reconstruccion():
+    """
+    SQL que vacía las tablas de resumen y las vuelve a calcular desde calificaciones.
+
+    Returns:
+        list: Sentencias a ejecutar dentro de una transacción
+    """
+    sentencias = []
+    for tabla, columna, _ in RESUMENES:
+        sentencias.append(f'DELETE FROM {tabla}')
+        sentencias.append(f'INSERT INTO {tabla} ({columna}, suma, cantidad, registros) '
+                          f'{CONSULTAS_AGREGADOS[tabla]}')
+    return sentencias
+
+
+def reconstruir_resumenes():
+    """
+    Recalcula todas las tablas de resumen desde las calificaciones.
+
+    Returns:
+        dict: {tabla: cantidad de filas de resumen}
+    """
+    # La base vinculada a los modelos (respeta bind_ctx, como aplicar_migraciones)
+    db = ResumenEstudiante._meta.database
+    with db.atomic():
+        for sentencia in sentencias_reconstruccion():
+            db.execute_sql(sentencia)
+
+    return {tabla: db.execute_sql(f'SELECT COUNT(*) FROM {tabla}').fetchone()[0]
+            for tabla, _, _ in RESUMENES}
+
+
+def verificar_resumenes(tolerancia=1e-6):
+    """
+    Compara las tablas de resumen con los agregados calculados desde las calificaciones.
+
+    Una fila de resumen inexistente equivale a suma, cantidad y registros en cero.
+
+    Args:
+        tolerancia (float): Diferencia máxima aceptada en las sumas
+
+    Returns:
+        dict: {tabla: lista de diferencias}; cada diferencia es un diccionario
+        con la clave, los valores esperados y los guardados
+    """
+    db = ResumenEstudiante._meta.database
+    diferencias = {}
+    for tabla, columna, _ in RESUMENES:
+        esperados = {clave: valores for clave, *valores
+                     in db.execute_sql(CONSULTAS_AGREGADOS[tabla]).fetchall()}
+        guardados = {clave: valores for clave, *valores
+                     in db.execute_sql(f'SELECT {columna}, suma, cantidad, registros FROM {tabla}').fetchall()}
+
+        diferencias[tabla] = []
+        for clave in sorted(set(esperados) | set(guardados)):
+            esperado = esperados.get(clave, [0, 0, 0])
+            guardado = guardados.get(clave, [0, 0, 0])
+            if (abs((esperado[0] or 0) - (guardado[0] or 0)) > tolerancia or
+                    esperado[1:] != guardado[1:]):
+                diferencias[tabla].append({
+                    'clave': clave,
+                    'esperado': tuple(esperado),
+                    'guardado': tuple(guardado)
+                })
+
+    return diferencias
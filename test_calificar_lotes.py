@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Prueba de la calificación por lotes (CalificacionManager.calificar_por_lotes)
+sobre una base temporal.
+"""
+
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.generador import base_temporal, generar, ESCALAS
+from models.estudiante import Estudiante
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
+from managers.calificacion_manager import CalificacionManager
+
+def silencioso(funcion, *args, **kwargs):
+    """Ejecuta un método de manager sin sus mensajes por consola"""
+    with redirect_stdout(io.StringIO()):
+        return funcion(*args, **kwargs)
+
+def test_calificar_por_lotes():
+    """Notas nuevas, actualizadas, fuera de rango, no numéricas y de estudiantes inexistentes"""
+    with base_temporal():
+        datos = generar(semilla=3, **ESCALAS['pequena'])
+        laboratorio = Laboratorio.get_by_id(datos['laboratorios'][0])
+        estudiantes = list(Estudiante.select().where(Estudiante.id_paralelo == datos['paralelos'][0]))
+        con_nota = {c.id_estudiante_id for c in laboratorio.calificaciones}
+        nuevo = next(e.id for e in estudiantes if e.id not in con_nota)
+        existente = next(e.id for e in estudiantes if e.id in con_nota)
+
+        resultado = silencioso(CalificacionManager.calificar_por_lotes, laboratorio.id, [
+            (nuevo, 50),
+            (existente, 40),
+            (existente, 60),                              # Vale la última entrada
+            (estudiantes[-1].id, laboratorio.puntaje_maximo + 1),
+            (estudiantes[-2].id, 'abc'),
+            (999999, 10),
+        ])
+        assert resultado['success'], resultado['mensaje']
+        assert resultado['creadas'] == 1 and resultado['actualizadas'] == 1
+        assert resultado['exitosas'] == 2
+        # Fuera de rango, no numérica, inexistente y la entrada repetida que se reemplazó
+        assert len(resultado['errores']) == 4, resultado['errores']
+        assert len(resultado['resultados']) == 6
+
+        nota = lambda estudiante_id: Calificacion.get(Calificacion.id_laboratorio == laboratorio.id,
+                                                      Calificacion.id_estudiante == estudiante_id).calificacion
+        assert nota(nuevo) == 50 and nota(existente) == 60
+
+        inexistente = silencioso(CalificacionManager.calificar_por_lotes, 999999, {nuevo: 10})
+        assert not inexistente['success']
+        print(f"✓ Lotes: {resultado['mensaje']}")
+
+if __name__ == "__main__":
+    test_calificar_por_lotes()
+    print("\n✓✓✓ Calificación por lotes correcta ✓✓✓")
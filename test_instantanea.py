@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Prueba de la instantánea columnar de calificaciones (models/instantanea.py)
+sobre una base temporal, incluida la instantánea vacía.
+"""
+
+import sys
+import os
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.generador import base_temporal, generar, ESCALAS
+from models.calificacion import Calificacion
+from models.instantanea import instantanea_calificaciones, NOTA_APROBACION
+
+def agregados(instantanea, por):
+    """Todos los agregados de la instantánea agrupados por una columna"""
+    return {
+        'conteo': instantanea.conteo(por),
+        'promedio': instantanea.promedio(por),
+        'tasa_aprobacion': instantanea.tasa_aprobacion(por),
+        'percentiles': instantanea.percentiles(por),
+        'resumen': instantanea.resumen(por),
+    }
+
+def test_instantanea_vacia():
+    """Base sin calificaciones y filtros sin filas dan agregados vacíos"""
+    with base_temporal():
+        vacia = instantanea_calificaciones()
+        assert len(vacia) == 0
+        for por in ('paralelo', 'laboratorio'):
+            assert all(valor == {} for valor in agregados(vacia, por).values())
+
+        datos = generar(semilla=2, **ESCALAS['pequena'])
+        instantanea = instantanea_calificaciones()
+        assert len(instantanea) == datos['calificaciones']
+
+        sin_filas = instantanea.filtrar(paralelo=999999)
+        assert len(sin_filas) == 0
+        assert all(valor == {} for valor in agregados(sin_filas, 'materia').values())
+        print("✓ Instantánea vacía sin errores")
+
+def test_instantanea_agregados():
+    """Los agregados coinciden con un cálculo fila por fila"""
+    with base_temporal():
+        generar(semilla=4, **ESCALAS['pequena'])
+        Calificacion.update(calificacion=None).where(Calificacion.id % 6 == 0).execute()
+        instantanea = instantanea_calificaciones()
+
+        notas = defaultdict(list)
+        for calificacion in Calificacion.select():
+            if calificacion.calificacion is not None:
+                notas[calificacion.id_laboratorio_id].append(calificacion.calificacion)
+
+        resumen = instantanea.resumen('laboratorio')
+        for laboratorio_id, lista in notas.items():
+            fila = resumen[laboratorio_id]
+            assert fila['cantidad'] == len(lista)
+            assert fila['promedio'] == round(sum(lista) / len(lista), 2)
+            aprobadas = sum(1 for nota in lista if nota >= NOTA_APROBACION)
+            assert fila['tasa_aprobacion'] == round(aprobadas * 100 / len(lista), 2)
+            assert fila['nota_minima'] == min(lista) and fila['nota_maxima'] == max(lista)
+        assert instantanea.promedio('laboratorio') == {k: v['promedio'] for k, v in resumen.items()}
+        print(f"✓ Agregados de {len(resumen)} laboratorios")
+
+if __name__ == "__main__":
+    test_instantanea_vacia()
+    test_instantanea_agregados()
+    print("\n✓✓✓ Instantánea correcta ✓✓✓")
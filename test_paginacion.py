@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Prueba de la paginación por clave (models/paginacion.py) sobre una base temporal.
+
+Recorre los listados paginados hacia adelante y hacia atrás en todos los
+órdenes y compara con el orden completo esperado.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.generador import base_temporal, generar
+from models.estudiante import Estudiante
+from models.calificacion import Calificacion
+from managers.estudiante_manager import EstudianteManager
+from managers.calificacion_manager import CalificacionManager
+
+TAMANO = 7
+
+def recorrer(listar, **kwargs):
+    """Recorre todas las páginas hacia adelante y luego vuelve hacia atrás"""
+    pagina = listar(tamano=TAMANO, **kwargs)
+    assert pagina['anterior'] is None
+    paginas = [pagina]
+    while pagina['siguiente']:
+        pagina = listar(tamano=TAMANO, despues=pagina['siguiente'], **kwargs)
+        paginas.append(pagina)
+    adelante = [elemento.id for p in paginas for elemento in p['elementos']]
+
+    atras = [elemento.id for elemento in pagina['elementos']]
+    while pagina['anterior']:
+        pagina = listar(tamano=TAMANO, antes=pagina['anterior'], **kwargs)
+        atras = [elemento.id for elemento in pagina['elementos']] + atras
+
+    assert adelante == atras, "Hacia atrás no se recorren las mismas páginas"
+    assert all(len(p['elementos']) == TAMANO for p in paginas[:-1])
+    assert len(adelante) == len(set(adelante)) == paginas[-1]['total']
+    return adelante
+
+def test_paginacion_estudiantes():
+    """Estudiantes de un paralelo en todos los órdenes, con filtro"""
+    with base_temporal():
+        datos = generar(materias=1, paralelos=2, estudiantes=45, laboratorios=3, densidad=0.7, semilla=7)
+        paralelo_id = datos['paralelos'][0]
+
+        # Algunos estudiantes sin grupo para probar la clave con COALESCE
+        Estudiante.update(grupo=None).where(Estudiante.id_paralelo == paralelo_id,
+                                            Estudiante.id % 4 == 0).execute()
+        estudiantes = list(Estudiante.select().where(Estudiante.id_paralelo == paralelo_id))
+
+        esperados = {
+            'nombre': lambda e: (e.nombre, e.id),
+            'grupo': lambda e: (e.grupo or '', e.nombre, e.id),
+            'ci': lambda e: (e.ci, e.id),
+        }
+        for orden, clave in esperados.items():
+            for descendente in (False, True):
+                ids = recorrer(EstudianteManager.listar_por_paralelo_paginado, paralelo_id=paralelo_id,
+                               ordenar_por=orden, descendente=descendente)
+                esperado = [e.id for e in sorted(estudiantes, key=clave, reverse=descendente)]
+                assert ids == esperado, f"Orden incorrecto: {orden} descendente={descendente}"
+                print(f"✓ estudiantes por {orden} {'desc' if descendente else 'asc'}: {len(ids)}")
+
+        filtrados = recorrer(EstudianteManager.listar_por_paralelo_paginado,
+                             paralelo_id=paralelo_id, filtro='00001')
+        esperado = [e.id for e in sorted(estudiantes, key=esperados['nombre'])
+                    if '00001' in e.nombre.upper() or '00001' in e.ci.upper()]
+        assert filtrados and filtrados == esperado, "El filtro no coincide con nombre o CI"
+
+        vacia = EstudianteManager.listar_por_paralelo_paginado(999999)
+        assert vacia['elementos'] == [] and vacia['total'] == 0
+
+def test_paginacion_calificaciones():
+    """Calificaciones de un laboratorio por nota (con notas vacías) y de un estudiante"""
+    with base_temporal():
+        datos = generar(materias=1, paralelos=2, estudiantes=30, laboratorios=4, densidad=0.8, semilla=11)
+        laboratorio_id = datos['laboratorios'][0]
+        Calificacion.update(calificacion=None).where(Calificacion.id_laboratorio == laboratorio_id,
+                                                     Calificacion.id % 5 == 0).execute()
+
+        calificaciones = list(Calificacion.select().where(Calificacion.id_laboratorio == laboratorio_id))
+        for descendente in (False, True):
+            ids = recorrer(CalificacionManager.obtener_calificaciones_laboratorio_paginado,
+                           laboratorio_id=laboratorio_id, ordenar_por='nota', descendente=descendente)
+            esperado = sorted(calificaciones, reverse=descendente,
+                              key=lambda c: (-1 if c.calificacion is None else c.calificacion, c.id))
+            assert ids == [c.id for c in esperado]
+            print(f"✓ calificaciones por nota {'desc' if descendente else 'asc'}: {len(ids)}")
+
+        estudiante_id = calificaciones[0].id_estudiante_id
+        ids = recorrer(CalificacionManager.obtener_calificaciones_estudiante_paginado, estudiante_id=estudiante_id)
+        numeros = [Calificacion.get_by_id(i).id_laboratorio.numero for i in ids]
+        assert numeros == sorted(numeros)
+
+if __name__ == "__main__":
+    test_paginacion_estudiantes()
+    test_paginacion_calificaciones()
+    print("\n✓✓✓ Paginación correcta ✓✓✓")
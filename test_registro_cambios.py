@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Prueba del registro de cambios (models/cambios.py) y del recálculo
+incremental de estadísticas (models/recalculo.py) sobre una base temporal.
+"""
+
+import sys
+import os
+import io
+import shutil
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.generador import base_temporal, generar, ESCALAS
+from models.estudiante import Estudiante
+from models.paralelo import Paralelo
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
+from models.cambios import ultimo_cambio, primer_cambio, depurar_cambios, depurar_antiguos, RegistroCambio
+from models.recalculo import EstadisticasIncrementales
+from managers.calificacion_manager import CalificacionManager
+
+def silencioso(funcion, *args, **kwargs):
+    """Ejecuta un método de manager sin sus mensajes por consola"""
+    with redirect_stdout(io.StringIO()):
+        return funcion(*args, **kwargs)
+
+def actuales(paralelo_id):
+    """Estadísticas del paralelo calculadas directamente desde la base"""
+    return Calificacion.estadisticas_paralelo(Paralelo.get_by_id(paralelo_id))
+
+def test_registro_cambios():
+    """El servicio incremental sigue los cambios y se recupera si se depuran sin leer"""
+    with base_temporal():
+        datos = generar(semilla=9, **ESCALAS['pequena'])
+        paralelo_id = datos['paralelos'][0]
+        materia_id = Paralelo.get_by_id(paralelo_id).id_materia_id
+        servicio = EstadisticasIncrementales()
+
+        antes = servicio.estadisticas_paralelo(paralelo_id)
+        assert antes == actuales(paralelo_id)
+        servicio.estadisticas_laboratorios(materia_id)
+
+        # Una escritura queda registrada y el servicio recalcula el paralelo y el laboratorio
+        punto = ultimo_cambio()
+        laboratorio_id = Laboratorio.select().where(Laboratorio.id_materia == materia_id).first().id
+        estudiantes = Estudiante.select(Estudiante.id).where(Estudiante.id_paralelo == paralelo_id)
+        silencioso(CalificacionManager.calificar_por_lotes, laboratorio_id, {e.id: 0 for e in estudiantes})
+        assert ultimo_cambio() > punto
+
+        registros = RegistroCambio.select().count()
+        despues = servicio.estadisticas_paralelo(paralelo_id)
+        assert despues == actuales(paralelo_id) and despues != antes
+        assert servicio.estadisticas_laboratorios(materia_id) == Laboratorio.estadisticas_materia(materia_id)
+        assert servicio.metricas()['paralelos_recalculados'] >= 1
+        assert servicio.metricas()['laboratorios_recalculados'] >= 1
+        # Leer estadísticas no depura el registro
+        assert RegistroCambio.select().count() == registros
+
+        # Las copias entregadas no modifican lo guardado
+        despues.clear()
+        assert servicio.estadisticas_paralelo(paralelo_id)
+
+        # Depurar con retención deja solo los últimos cambios
+        eliminados = depurar_antiguos(retener=5)
+        assert eliminados > 0
+        assert RegistroCambio.select().count() == 5
+        assert primer_cambio() == ultimo_cambio() - 4
+        assert depurar_antiguos(retener=5) == 0
+
+        # Cambios depurados antes de leerlos: el servicio vuelve a calcular todo
+        Calificacion.update(calificacion=1).where(Calificacion.id_laboratorio == laboratorio_id).execute()
+        depurar_cambios(ultimo_cambio())
+        Calificacion.update(calificacion=2).where(Calificacion.id_laboratorio == laboratorio_id).execute()
+        assert servicio.estadisticas_paralelo(paralelo_id) == actuales(paralelo_id)
+        assert servicio.metricas()['reinicios'] == 1
+        print(f"✓ Registro de cambios: {servicio.metricas()}")
+
+def test_recalculo_concurrente():
+    """Varios hilos leen mientras otro escribe; al final todo coincide con la base"""
+    directorio = tempfile.mkdtemp()
+    ruta = os.path.join(directorio, 'recalculo.db')
+    try:
+        # Los hilos necesitan una base en archivo (una en memoria es distinta por conexión)
+        with base_temporal(ruta):
+            datos = generar(semilla=13, **ESCALAS['pequena'])
+            servicio = EstadisticasIncrementales()
+            calificaciones = [c.id for c in Calificacion.select(Calificacion.id)]
+            terminado = threading.Event()
+            errores = []
+
+            def lector():
+                try:
+                    while not terminado.is_set():
+                        for paralelo_id in datos['paralelos']:
+                            servicio.estadisticas_paralelo(paralelo_id)
+                            servicio.matriz_paralelo(paralelo_id)
+                        for materia_id in datos['materias']:
+                            servicio.estadisticas_laboratorios(materia_id)
+                except Exception as e:
+                    errores.append(e)
+
+            lectores = [threading.Thread(target=lector) for _ in range(4)]
+            for hilo in lectores:
+                hilo.start()
+            for i, calificacion_id in enumerate(calificaciones[:100]):
+                Calificacion.update(calificacion=i % 101).where(Calificacion.id == calificacion_id).execute()
+            terminado.set()
+            for hilo in lectores:
+                hilo.join()
+
+            assert not errores, errores
+            for paralelo_id in datos['paralelos']:
+                paralelo = Paralelo.get_by_id(paralelo_id)
+                assert servicio.estadisticas_paralelo(paralelo_id) == Calificacion.estadisticas_paralelo(paralelo)
+                assert servicio.matriz_paralelo(paralelo_id) == Calificacion.matriz_calificaciones_paralelo(paralelo)
+            for materia_id in datos['materias']:
+                assert servicio.estadisticas_laboratorios(materia_id) == Laboratorio.estadisticas_materia(materia_id)
+            print(f"✓ Recálculo concurrente: {servicio.metricas()}")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_registro_cambios()
+    test_recalculo_concurrente()
+    print("\n✓✓✓ Registro de cambios y recálculo incremental correctos ✓✓✓")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Prueba de las tablas de resumen mantenidas por triggers (models/resumen.py)
+sobre una base temporal.
+"""
+
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.generador import base_temporal, generar, ESCALAS
+from models.estudiante import Estudiante
+from models.calificacion import Calificacion
+from models.resumen import reconstruir_resumenes, verificar_resumenes
+from managers.estudiante_manager import EstudianteManager
+from managers.calificacion_manager import CalificacionManager
+
+def sin_diferencias():
+    """True si las tablas de resumen coinciden con las calificaciones"""
+    diferencias = verificar_resumenes()
+    return not any(diferencias.values()), diferencias
+
+def silencioso(funcion, *args, **kwargs):
+    """Ejecuta un método de manager sin sus mensajes por consola"""
+    with redirect_stdout(io.StringIO()):
+        return funcion(*args, **kwargs)
+
+def test_resumenes():
+    """Los triggers mantienen los resúmenes en inserciones, cambios y borrados"""
+    with base_temporal():
+        datos = generar(semilla=5, **ESCALAS['pequena'])
+        ok, diferencias = sin_diferencias()
+        assert ok, f"Resúmenes distintos después de generar: {diferencias}"
+
+        calificacion = Calificacion.select().where(Calificacion.calificacion.is_null(False)).first()
+        silencioso(CalificacionManager.actualizar_calificacion, calificacion.id, 0)
+        Calificacion.update(calificacion=None).where(Calificacion.id % 7 == 0).execute()
+        estudiante = Estudiante.select().where(Estudiante.id_paralelo == datos['paralelos'][1]).first()
+        silencioso(EstudianteManager.eliminar_estudiante, estudiante.id, forzar=True)
+        Estudiante.update(id_paralelo=datos['paralelos'][0]).where(
+            Estudiante.id_paralelo == datos['paralelos'][1], Estudiante.id % 3 == 0).execute()
+
+        ok, diferencias = sin_diferencias()
+        assert ok, f"Resúmenes distintos después de modificar: {diferencias}"
+
+        reconstruidos = reconstruir_resumenes()
+        assert reconstruidos['resumen_estudiante'] > 0
+        assert sin_diferencias()[0], "Resúmenes distintos después de reconstruir"
+        print(f"✓ Resúmenes: {reconstruidos}")
+
+if __name__ == "__main__":
+    test_resumenes()
+    print("\n✓✓✓ Resúmenes correctos ✓✓✓")
@@ -0,0 +1,196 @@
+"""
+Estadísticas de distribución de las calificaciones con pandas y NumPy.
+
+Con una sola consulta se cargan las notas de una materia, un paralelo o de
+todo el sistema en un DataFrame, y a partir de ese resultado se calculan
+por laboratorio, por paralelo y por grupo de estudiantes:
+- promedio, desviación estándar, mínimo, cuartiles y máximo
+- histograma de notas (intervalos de ANCHO_HISTOGRAMA puntos)
+- cantidad de notas en cada banda de BANDAS_NOTAS
+- comparación de los grupos (Estudiante.grupo) con el promedio de su paralelo
+
+Las calificaciones sin nota cuentan como registros pero no entran en los
+cálculos. La desviación estándar es poblacional, igual que en
+Calificacion.estadisticas_paralelo.
+
+El promedio de este módulo es el de las notas registradas. No es el
+promedio de la aplicación (Estudiante.promedio_calificaciones y
+'promedio_general' de Calificacion.estadisticas_paralelo), que divide por
+todos los laboratorios de la materia aunque falten notas; por eso las
+interfaces lo muestran como "Promedio de notas registradas".
+"""
+
+import numpy as np
+import pandas as pd
+from models.materia import Materia
+from models.paralelo import Paralelo
+from models.estudiante import Estudiante
+from models.laboratorio import Laboratorio
+from models.calificacion import Calificacion
+
+NOTA_APROBACION = 51
+
+# Intervalos del histograma: 0-9, 10-19, ..., 90-100 (el 100 entra en el último)
+ANCHO_HISTOGRAMA = 10
+INTERVALOS_HISTOGRAMA = [f"{inicio}-{inicio + ANCHO_HISTOGRAMA - 1}" for inicio in range(0, 90, ANCHO_HISTOGRAMA)] + ["90-100"]
+
+# Bandas de notas: (etiqueta, desde); cada banda llega hasta el inicio de la siguiente
+BANDAS_NOTAS = [
+    ('Insuficiente (0-40)', 0),
+    ('Deficiente (41-50)', 41),
+    ('Suficiente (51-70)', 51),
+    ('Bueno (71-85)', 71),
+    ('Excelente (86-100)', 86),
+]
+
+SIN_GRUPO = 'Sin grupo'
+
+COLUMNAS = ['estudiante', 'grupo', 'paralelo', 'nombre_paralelo', 'laboratorio', 'numero_laboratorio',
+            'materia', 'sigla', 'nota']
+
+
+class EstadisticasNotas:
+    """
+    Distribución de notas por laboratorio, paralelo y grupo.
+    """
+
+    @staticmethod
+    def cargar_notas(materia_id=None, paralelo_id=None):
+        """
+        Carga las calificaciones en un DataFrame con una sola consulta.
+
+        Args:
+            materia_id (int): Limita a una materia (Opcional)
+            paralelo_id (int): Limita a un paralelo (Opcional)
+
+        Returns:
+            DataFrame: Una fila por calificación con las columnas de COLUMNAS
+            (nota es NaN si la calificación no tiene valor)
+        """
+        consulta = (Calificacion
+                    .select(Estudiante.id, Estudiante.grupo, Paralelo.id, Paralelo.paralelo,
+                            Laboratorio.id, Laboratorio.numero, Materia.id, Materia.sigla,
+                            Calificacion.calificacion)
+                    .join(Estudiante)
+                    .join(Paralelo)
+                    .join(Materia)
+                    .switch(Calificacion)
+                    .join(Laboratorio))
+        if materia_id is not None:
+            consulta = consulta.where(Paralelo.id_materia == materia_id)
+        if paralelo_id is not None:
+            consulta = consulta.where(Estudiante.id_paralelo == paralelo_id)
+
+        # Las filas salen directo del cursor, sin convertirlas una por una
+        filas = Calificacion._meta.database.execute(consulta).fetchall()
+        df = pd.DataFrame.from_records(filas, columns=COLUMNAS)
+        df['nota'] = pd.to_numeric(df['nota'], errors='coerce').astype(float)
+        df['grupo'] = df['grupo'].fillna(SIN_GRUPO)
+        return df
+
+    @staticmethod
+    def calcular(df):
+        """
+        Calcula todas las estadísticas de distribución a partir de cargar_notas().
+
+        Args:
+            df (DataFrame): Resultado de cargar_notas()
+
+        Returns:
+            dict: 'general' (dict), 'laboratorios', 'paralelos' y 'grupos'
+            (DataFrames con el resumen de cada uno), 'histogramas' y 'bandas'
+            ({'laboratorios': DataFrame, 'paralelos': DataFrame} con una
+            columna por intervalo o banda)
+        """
+        notas = df[df['nota'].notna()]
+
+        # Intervalo de histograma y banda de cada nota, calculados una sola vez
+        intervalos = pd.Categorical.from_codes(
+            np.clip((notas['nota'].to_numpy() // ANCHO_HISTOGRAMA).astype(np.int64), 0, len(INTERVALOS_HISTOGRAMA) - 1),
+            categories=INTERVALOS_HISTOGRAMA)
+        limites = np.array([desde for _, desde in BANDAS_NOTAS])
+        bandas = pd.Categorical.from_codes(
+            np.clip(np.searchsorted(limites, notas['nota'].to_numpy(), side='right') - 1, 0, len(limites) - 1),
+            categories=[etiqueta for etiqueta, _ in BANDAS_NOTAS])
+
+        laboratorios = EstadisticasNotas._resumen(df, ['laboratorio', 'numero_laboratorio', 'sigla'])
+        paralelos = EstadisticasNotas._resumen(df, ['paralelo', 'nombre_paralelo', 'sigla'])
+
+        grupos = EstadisticasNotas._resumen(df, ['paralelo', 'nombre_paralelo', 'sigla', 'grupo'])
+        promedio_paralelo = paralelos.set_index('paralelo')['promedio']
+        grupos['diferencia'] = (grupos['promedio'] - grupos['paralelo'].map(promedio_paralelo)).round(2)
+
+        return {
+            'general': EstadisticasNotas._general(df, notas),
+            'laboratorios': laboratorios,
+            'paralelos': paralelos,
+            'grupos': grupos,
+            'histogramas': {
+                'laboratorios': EstadisticasNotas._conteo(notas['laboratorio'], intervalos, laboratorios['laboratorio']),
+                'paralelos': EstadisticasNotas._conteo(notas['paralelo'], intervalos, paralelos['paralelo']),
+            },
+            'bandas': {
+                'laboratorios': EstadisticasNotas._conteo(notas['laboratorio'], bandas, laboratorios['laboratorio']),
+                'paralelos': EstadisticasNotas._conteo(notas['paralelo'], bandas, paralelos['paralelo']),
+            },
+        }
+
+    @staticmethod
+    def obtener(materia_id=None, paralelo_id=None):
+        """Carga las notas y calcula sus estadísticas (ver cargar_notas y calcular)"""
+        return EstadisticasNotas.calcular(EstadisticasNotas.cargar_notas(materia_id, paralelo_id))
+
+    @staticmethod
+    def _resumen(df, columnas):
+        """Promedio, desviación, cuartiles y aprobación por grupo de columnas"""
+        datos = df.assign(cuadrado=df['nota'] ** 2, aprobado=df['nota'] >= NOTA_APROBACION)
+        agrupado = datos.groupby(columnas, sort=True)
+        resumen = agrupado.agg(registros=('nota', 'size'), cantidad=('nota', 'count'),
+                               estudiantes=('estudiante', 'nunique'), promedio=('nota', 'mean'),
+                               cuadrados=('cuadrado', 'mean'), minimo=('nota', 'min'), maximo=('nota', 'max'),
+                               aprobados=('aprobado', 'sum'))
+        # Desviación poblacional a partir de la media de los cuadrados (sin una función por grupo)
+        resumen['desviacion_estandar'] = np.sqrt((resumen['cuadrados'] - resumen['promedio'] ** 2).clip(lower=0))
+        resumen = resumen.drop(columns='cuadrados')
+        cuartiles = (agrupado['nota'].quantile([0.25, 0.5, 0.75]).unstack()
+                     .reindex(index=resumen.index, columns=[0.25, 0.5, 0.75]))
+        resumen['q1'] = cuartiles[0.25]
+        resumen['mediana'] = cuartiles[0.5]
+        resumen['q3'] = cuartiles[0.75]
+        resumen['aprobados'] = resumen['aprobados'].astype(int)
+        resumen['tasa_aprobacion'] = np.where(resumen['cantidad'] > 0,
+                                              resumen['aprobados'] / resumen['cantidad'].clip(lower=1) * 100, 0.0)
+
+        decimales = ['promedio', 'desviacion_estandar', 'minimo', 'maximo', 'q1', 'mediana', 'q3', 'tasa_aprobacion']
+        resumen[decimales] = resumen[decimales].fillna(0.0).round(2)
+        return resumen.reset_index()
+
+    @staticmethod
+    def _conteo(claves, categorias, todas):
+        """Tabla de conteos (clave x categoría) con todas las claves y categorías"""
+        tabla = pd.crosstab(claves.to_numpy(), categorias, dropna=False)
+        tabla = tabla.reindex(index=todas.to_numpy(), columns=categorias.categories, fill_value=0)
+        tabla.index.name = claves.name
+        tabla.columns.name = None
+        return tabla.astype(int)
+
+    @staticmethod
+    def _general(df, notas):
+        """Estadísticas de todas las notas juntas"""
+        if notas.empty:
+            return {'registros': len(df), 'cantidad': 0, 'promedio': 0.0, 'desviacion_estandar': 0.0,
+                    'minimo': 0.0, 'q1': 0.0, 'mediana': 0.0, 'q3': 0.0, 'maximo': 0.0, 'tasa_aprobacion': 0.0}
+        valores = notas['nota'].to_numpy()
+        q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+        return {
+            'registros': len(df),
+            'cantidad': len(valores),
+            'promedio': round(float(valores.mean()), 2),
+            'desviacion_estandar': round(float(valores.std()), 2),
+            'minimo': float(valores.min()),
+            'q1': round(float(q1), 2),
+            'mediana': round(float(mediana), 2),
+            'q3': round(float(q3), 2),
+            'maximo': float(valores.max()),
+            'tasa_aprobacion': round(float((valores >= NOTA_APROBACION).mean() * 100), 2),
+        }
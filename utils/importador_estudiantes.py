@@ -0,0 +1,283 @@
+"""
+Importación masiva de estudiantes desde archivos CSV o Excel (XLSX).
+Pensado para cargar las inscripciones de todo un semestre de una vez.
+"""
+
+import csv
+import os
+import time
+import unicodedata
+from datetime import datetime
+from peewee import chunked
+from models.paralelo import Paralelo
+from models.estudiante import Estudiante
+from models.cache import invalida_cache
+
+# Nombres de columna aceptados (sin tildes y en minúsculas) para cada campo
+COLUMNAS = {
+    'nombre': ('nombre', 'nombres', 'estudiante', 'nombre completo'),
+    'ci': ('ci', 'cedula', 'carnet', 'cedula de identidad'),
+    'grupo': ('grupo',),
+    'paralelo': ('paralelo',),
+}
+
+# Filas que se validan juntas (una consulta de duplicados por bloque)
+# y filas por sentencia INSERT (6 columnas por fila, bajo el límite de SQLite)
+TAMANO_BLOQUE = 500
+TAMANO_INSERT = 100
+
+class ImportadorEstudiantes:
+    """
+    Importa estudiantes en bloque a un paralelo o a los paralelos de una materia.
+    """
+
+    @staticmethod
+    def leer_filas(ruta_archivo):
+        """
+        Lee las filas de un archivo CSV o XLSX sin cargarlo completo en memoria.
+
+        La primera fila debe tener los encabezados; se reconocen las columnas
+        de COLUMNAS sin importar mayúsculas ni tildes.
+
+        Args:
+            ruta_archivo (str): Ruta del archivo .csv o .xlsx
+
+        Yields:
+            tuple: (número de fila en el archivo, dict con nombre, ci, grupo y paralelo)
+        """
+        extension = os.path.splitext(ruta_archivo)[1].lower()
+        if extension == '.csv':
+            filas = ImportadorEstudiantes._filas_csv(ruta_archivo)
+        elif extension in ('.xlsx', '.xlsm'):
+            filas = ImportadorEstudiantes._filas_xlsx(ruta_archivo)
+        else:
+            raise ValueError(f"Formato no soportado: {extension} (use .csv o .xlsx)")
+
+        encabezados = next(filas, None)
+        if not encabezados:
+            return
+
+        posiciones = ImportadorEstudiantes._mapear_columnas(encabezados)
+        for campo in ('nombre', 'ci'):
+            if campo not in posiciones:
+                raise ValueError(f"El archivo no tiene la columna '{campo}'")
+
+        for numero, valores in enumerate(filas, 2):
+            if not any(valor not in (None, '') for valor in valores):
+                continue
+            yield numero, {campo: valores[posicion] if posicion < len(valores) else None
+                           for campo, posicion in posiciones.items()}
+
+    @staticmethod
+    def _filas_csv(ruta_archivo):
+        with open(ruta_archivo, newline='', encoding='utf-8-sig') as archivo:
+            muestra = archivo.read(4096)
+            archivo.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+            except csv.Error:
+                dialecto = csv.excel
+            yield from csv.reader(archivo, dialecto)
+
+    @staticmethod
+    def _filas_xlsx(ruta_archivo):
+        from openpyxl import load_workbook
+
+        libro = load_workbook(ruta_archivo, read_only=True, data_only=True)
+        try:
+            yield from libro.active.iter_rows(values_only=True)
+        finally:
+            libro.close()
+
+    @staticmethod
+    def _mapear_columnas(encabezados):
+        """Retorna {campo: posición} según los encabezados del archivo"""
+        posiciones = {}
+        for posicion, encabezado in enumerate(encabezados):
+            clave = ImportadorEstudiantes._sin_tildes(str(encabezado or '')).strip().lower()
+            for campo, alias in COLUMNAS.items():
+                if clave in alias and campo not in posiciones:
+                    posiciones[campo] = posicion
+        return posiciones
+
+    @staticmethod
+    def _sin_tildes(texto):
+        return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+
+    @staticmethod
+    def _texto(valor):
+        """Convierte una celda a texto (los números enteros de Excel pierden el .0)"""
+        if valor is None:
+            return ''
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)
+        return str(valor).strip()
+
+    @staticmethod
+    def normalizar_fila(fila):
+        """
+        Normaliza una fila igual que EstudianteManager.registrar_estudiante.
+
+        Returns:
+            dict: nombre, ci y paralelo en mayúsculas; grupo en mayúsculas o None
+        """
+        grupo = ImportadorEstudiantes._texto(fila.get('grupo'))
+        return {
+            'nombre': ImportadorEstudiantes._texto(fila.get('nombre')).upper(),
+            'ci': ImportadorEstudiantes._texto(fila.get('ci')).upper(),
+            'grupo': grupo.upper() if grupo else None,
+            'paralelo': ImportadorEstudiantes._texto(fila.get('paralelo')).upper(),
+        }
+
+    @staticmethod
+    @invalida_cache
+    def importar(ruta_archivo, paralelo_id=None, materia_id=None):
+        """
+        Importa los estudiantes de un archivo.
+
+        Con paralelo_id todos los estudiantes van a ese paralelo. Con
+        materia_id el archivo debe tener la columna 'paralelo' (A, B, ...)
+        con paralelos existentes de la materia.
+
+        Las filas se procesan por bloques: se validan, se buscan sus
+        duplicados (mismo paralelo y CI) con una consulta por bloque y se
+        insertan con insert_many. Toda la importación es una transacción.
+
+        Args:
+            ruta_archivo (str): Ruta del archivo .csv o .xlsx
+            paralelo_id (int): Paralelo destino (Opcional)
+            materia_id (int): Materia destino si el archivo indica el paralelo (Opcional)
+
+        Returns:
+            dict: Reporte con 'success', 'total_filas', 'insertados',
+            'duplicados_archivo', 'duplicados_existentes', 'errores'
+            (lista de (fila, mensaje)), 'duracion' y 'mensaje'
+        """
+        reporte = {
+            'success': False,
+            'archivo': os.path.basename(ruta_archivo),
+            'total_filas': 0,
+            'insertados': 0,
+            'duplicados_archivo': 0,
+            'duplicados_existentes': 0,
+            'errores': [],
+            'duracion': 0.0,
+            'mensaje': ''
+        }
+        inicio = time.perf_counter()
+
+        try:
+            # Paralelos destino: {nombre del paralelo: id}
+            if paralelo_id is not None:
+                paralelo = Paralelo.get_by_id(paralelo_id)
+                paralelos = {paralelo.paralelo: paralelo.id}
+            elif materia_id is not None:
+                paralelos = dict(Paralelo.select(Paralelo.paralelo, Paralelo.id)
+                                 .where(Paralelo.id_materia == materia_id)
+                                 .tuples())
+            else:
+                raise ValueError("Debe indicar el paralelo o la materia destino")
+
+            vistos = set()
+            ahora = datetime.now()
+
+            with Estudiante._meta.database.atomic():
+                for bloque in chunked(ImportadorEstudiantes.leer_filas(ruta_archivo), TAMANO_BLOQUE):
+                    candidatos = []
+                    for numero, fila in bloque:
+                        reporte['total_filas'] += 1
+                        fila = ImportadorEstudiantes.normalizar_fila(fila)
+
+                        if not fila['nombre'] or not fila['ci']:
+                            reporte['errores'].append((numero, "Falta el nombre o el CI"))
+                            continue
+
+                        if paralelo_id is not None:
+                            destino = paralelo.id
+                        else:
+                            destino = paralelos.get(fila['paralelo'])
+                            if destino is None:
+                                reporte['errores'].append((numero, f"No existe el paralelo '{fila['paralelo']}' en la materia"))
+                                continue
+
+                        clave = (destino, fila['ci'])
+                        if clave in vistos:
+                            reporte['duplicados_archivo'] += 1
+                            reporte['errores'].append((numero, f"CI {fila['ci']} repetido en el archivo"))
+                            continue
+                        vistos.add(clave)
+                        candidatos.append((numero, clave, fila))
+
+                    if not candidatos:
+                        continue
+
+                    # Duplicados contra el índice único (id_paralelo, ci) en una sola consulta
+                    existentes = set(Estudiante
+                                     .select(Estudiante.id_paralelo, Estudiante.ci)
+                                     .where((Estudiante.ci.in_([clave[1] for _, clave, _ in candidatos])) &
+                                            (Estudiante.id_paralelo.in_({clave[0] for _, clave, _ in candidatos})))
+                                     .tuples())
+
+                    nuevos = []
+                    for numero, clave, fila in candidatos:
+                        if clave in existentes:
+                            reporte['duplicados_existentes'] += 1
+                            reporte['errores'].append((numero, f"Ya existe un estudiante con CI {fila['ci']} en este paralelo"))
+                            continue
+                        nuevos.append({
+                            Estudiante.nombre: fila['nombre'],
+                            Estudiante.ci: fila['ci'],
+                            Estudiante.id_paralelo: clave[0],
+                            Estudiante.grupo: fila['grupo'],
+                            Estudiante.fecha_creacion: ahora,
+                            Estudiante.fecha_modificacion: ahora,
+                        })
+
+                    for lote in chunked(nuevos, TAMANO_INSERT):
+                        Estudiante.insert_many(lote).execute()
+                    reporte['insertados'] += len(nuevos)
+
+            reporte['success'] = True
+            reporte['mensaje'] = (f"Importados {reporte['insertados']} de {reporte['total_filas']} estudiantes. "
+                                  f"{len(reporte['errores'])} filas omitidas.")
+
+        except Paralelo.DoesNotExist:
+            reporte['mensaje'] = f"No existe paralelo con ID {paralelo_id}"
+        except Exception as e:
+            reporte['insertados'] = 0
+            reporte['mensaje'] = f"Error al importar estudiantes: {e}"
+
+        reporte['duracion'] = round(time.perf_counter() - inicio, 3)
+        return reporte
+
+    @staticmethod
+    def formatear_reporte(reporte, max_errores=20):
+        """
+        Convierte el reporte de importar() en texto para mostrarlo.
+
+        Args:
+            reporte (dict): Reporte de la importación
+            max_errores (int): Cantidad máxima de filas con error a listar
+
+        Returns:
+            str: Reporte en texto
+        """
+        datos = [
+            ("Filas leídas:", reporte['total_filas']),
+            ("Estudiantes importados:", reporte['insertados']),
+            ("Repetidos en el archivo:", reporte['duplicados_archivo']),
+            ("Ya inscritos en el paralelo:", reporte['duplicados_existentes']),
+            ("Filas con error:", len(reporte['errores'])),
+            ("Duración:", f"{reporte['duracion']:.2f} s"),
+        ]
+        lineas = [f"REPORTE DE IMPORTACIÓN: {reporte['archivo']}", "=" * 50]
+        lineas += [f"{etiqueta:30s}{valor}" for etiqueta, valor in datos]
+        lineas += ["", reporte['mensaje']]
+        if reporte['errores']:
+            lineas.append("")
+            lineas.append("Filas omitidas:")
+            for numero, mensaje in reporte['errores'][:max_errores]:
+                lineas.append(f"  Fila {numero}: {mensaje}")
+            if len(reporte['errores']) > max_errores:
+                lineas.append(f"  ... y {len(reporte['errores']) - max_errores} más")
+        return "\n".join(lineas)
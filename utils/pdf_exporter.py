@@ -8,6 +8,8 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.barcharts import VerticalBarChart
 from datetime import datetime
 import os
 from models.materia import Materia
@@ -67,6 +69,7 @@ class PDFExporter:
             PDFExporter._agregar_lista_estudiantes(contenido, paralelo, styles)
             PDFExporter._agregar_matriz_calificaciones(contenido, paralelo, styles)
             PDFExporter._agregar_estadisticas(contenido, paralelo, styles)
+            PDFExporter._agregar_distribucion(contenido, paralelo, styles)
             PDFExporter._agregar_pie_documento(contenido, styles)
 
             # Generar PDF
@@ -156,9 +159,10 @@ class PDFExporter:
         
         # Crea tabla
         datos_tabla = [['N', 'C.I.', 'Nombre Completo', 'Promedio']]
+        promedios = Estudiante.promedios_calificaciones(paralelo=paralelo)
 
         for i, estudiante in enumerate(estudiantes, 1):
-            promedio = estudiante.promedio_calificaciones()
+            promedio = promedios.get(estudiante.id, 0.0)
             datos_tabla.append([
                 str(i),
                 estudiante.ci,
@@ -278,6 +282,10 @@ class PDFExporter:
             ['Aprobados', str(stats.get('aprobados', 0))],
             ['Reprobados', str(stats.get('reprobados', 0))],
             ['Sin Calificar', str(stats.get('sin_calificar', 0))],
+            ['Nota Mínima', f"{stats.get('nota_minima', 0):.2f}"],
+            ['Nota Máxima', f"{stats.get('nota_maxima', 0):.2f}"],
+            ['Mediana', f"{stats.get('mediana', 0):.2f}"],
+            ['Desviación Estándar', f"{stats.get('desviacion_estandar', 0):.2f}"],
         ]
         tabla_stats = Table(stats_data, colWidths=[8*cm, 4*cm])
 
@@ -295,6 +303,85 @@ class PDFExporter:
         contenido.append(tabla_stats)
         contenido.append(Spacer(1, 30))
     
+    @staticmethod
+    def _agregar_distribucion(contenido, paralelo, styles):
+        """ Agrega histograma, bandas de notas, cuartiles por laboratorio y comparación de grupos """
+        # pandas solo se carga para el reporte completo
+        from utils.estadisticas import EstadisticasNotas, INTERVALOS_HISTOGRAMA
+
+        distribucion = EstadisticasNotas.obtener(paralelo_id=paralelo.id)
+        if not distribucion['general']['cantidad']:
+            return
+
+        titulo_seccion = Paragraph("<b>DISTRIBUCIÓN DE NOTAS</b>", styles["Heading2"])
+        contenido.append(titulo_seccion)
+        nota = Paragraph("<i>Promedios de notas registradas: los laboratorios sin nota no cuentan como cero, "
+                         "a diferencia del promedio de cada estudiante en la matriz.</i>", styles["Normal"])
+        contenido.append(nota)
+        contenido.append(Spacer(1, 10))
+
+        # Histograma de todas las notas del paralelo
+        histograma = distribucion['histogramas']['paralelos'].sum(axis=0)
+        dibujo = Drawing(16*cm, 6*cm)
+        grafico = VerticalBarChart()
+        grafico.x = 1*cm
+        grafico.y = 1*cm
+        grafico.width = 14.5*cm
+        grafico.height = 4.5*cm
+        grafico.data = [[int(valor) for valor in histograma]]
+        grafico.categoryAxis.categoryNames = INTERVALOS_HISTOGRAMA
+        grafico.categoryAxis.labels.fontSize = 7
+        grafico.valueAxis.valueMin = 0
+        grafico.valueAxis.labels.fontSize = 7
+        grafico.bars[0].fillColor = colors.darkblue
+        dibujo.add(grafico)
+        contenido.append(dibujo)
+        contenido.append(Spacer(1, 10))
+
+        estilo_tabla = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ])
+
+        # Bandas de notas
+        bandas = distribucion['bandas']['paralelos'].sum(axis=0)
+        total = int(bandas.sum())
+        datos_bandas = [['Banda', 'Notas', '%']] + [
+            [banda, str(int(cantidad)), f"{cantidad / total * 100:.1f}"] for banda, cantidad in bandas.items()
+        ]
+        tabla_bandas = Table(datos_bandas, colWidths=[5*cm, 2*cm, 2*cm])
+        tabla_bandas.setStyle(estilo_tabla)
+        contenido.append(tabla_bandas)
+        contenido.append(Spacer(1, 15))
+
+        # Cuartiles por laboratorio
+        datos_labs = [['Lab', 'Notas', 'Prom. reg.', 'Desv.', 'Mín.', 'Q1', 'Mediana', 'Q3', 'Máx.', 'Aprob. %']]
+        for lab in distribucion['laboratorios'].itertuples():
+            datos_labs.append([f"L{lab.numero_laboratorio}", str(lab.cantidad), f"{lab.promedio:.2f}",
+                               f"{lab.desviacion_estandar:.2f}", f"{lab.minimo:.1f}", f"{lab.q1:.2f}",
+                               f"{lab.mediana:.2f}", f"{lab.q3:.2f}", f"{lab.maximo:.1f}", f"{lab.tasa_aprobacion:.1f}"])
+        tabla_labs = Table(datos_labs)
+        tabla_labs.setStyle(estilo_tabla)
+        contenido.append(tabla_labs)
+        contenido.append(Spacer(1, 15))
+
+        # Comparación de grupos con el promedio del paralelo
+        grupos = distribucion['grupos']
+        if len(grupos) > 1:
+            datos_grupos = [['Grupo', 'Estudiantes', 'Prom. reg.', 'Desv.', 'Mediana', 'Aprob. %', 'Dif. paralelo']]
+            for grupo in grupos.itertuples():
+                datos_grupos.append([grupo.grupo[:25], str(grupo.estudiantes), f"{grupo.promedio:.2f}",
+                                     f"{grupo.desviacion_estandar:.2f}", f"{grupo.mediana:.2f}",
+                                     f"{grupo.tasa_aprobacion:.1f}", f"{grupo.diferencia:+.2f}"])
+            tabla_grupos = Table(datos_grupos, repeatRows=1)
+            tabla_grupos.setStyle(estilo_tabla)
+            contenido.append(tabla_grupos)
+            contenido.append(Spacer(1, 30))
+
     @staticmethod
     def _agregar_pie_documento(contenido, styles):
         """ Agrega pie del documento """
@@ -407,9 +494,10 @@ class PDFExporter:
 
         # Crear tabla con encabezados
         datos_tabla = [['N°', 'Nombre Completo', 'Promedio Final']]
+        promedios = Estudiante.promedios_calificaciones(paralelo=paralelo)
 
         for i, estudiante in enumerate(estudiantes, 1):
-            promedio = estudiante.promedio_calificaciones()
+            promedio = promedios.get(estudiante.id, 0.0)
             datos_tabla.append([
                 str(i),
                 estudiante.nombre,
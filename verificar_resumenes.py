@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Verifica las tablas de resumen de calificaciones contra los datos originales.
+
+Uso:
+    python verificar_resumenes.py                # solo verifica
+    python verificar_resumenes.py --reconstruir  # recalcula y vuelve a verificar
+    python verificar_resumenes.py --depurar-cambios [N]  # deja solo los últimos N cambios del registro
+"""
+
+import sys
+import os
+import argparse
+
+# Añadir el directorio raíz al path para importar los módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.database import inicializar_bd, cerrar_bd
+from models.resumen import reconstruir_resumenes, verificar_resumenes
+from models.cambios import RETENCION_CAMBIOS, depurar_cambios, ultimo_cambio
+
+def mostrar_diferencias(diferencias):
+    """Imprime las diferencias por tabla y retorna cuántas hay en total"""
+    total = 0
+    for tabla, filas in diferencias.items():
+        if not filas:
+            print(f"  {tabla}: OK")
+            continue
+
+        print(f"  {tabla}: {len(filas)} diferencias")
+        for fila in filas[:20]:
+            print(f"    clave {fila['clave']}: esperado {fila['esperado']} - guardado {fila['guardado']}")
+        if len(filas) > 20:
+            print(f"    ... y {len(filas) - 20} más")
+        total = total + len(filas)
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica las tablas de resumen de calificaciones")
+    parser.add_argument('--reconstruir', action='store_true',
+                        help="Recalcula las tablas de resumen desde las calificaciones")
+    parser.add_argument('--depurar-cambios', type=int, nargs='?', const=RETENCION_CAMBIOS, metavar='N',
+                        help=f"Borra el registro de cambios salvo los últimos N (por defecto {RETENCION_CAMBIOS})")
+    args = parser.parse_args()
+
+    inicializar_bd()
+    try:
+        if args.reconstruir:
+            print("=== Reconstruyendo resúmenes ===")
+            for tabla, filas in reconstruir_resumenes().items():
+                print(f"  {tabla}: {filas} filas")
+
+        print("=== Verificando resúmenes ===")
+        total = mostrar_diferencias(verificar_resumenes())
+
+        if args.depurar_cambios is not None:
+            eliminados = depurar_cambios(ultimo_cambio() - args.depurar_cambios)
+            print(f"=== Registro de cambios: {eliminados} cambios depurados ===")
+    finally:
+        cerrar_bd()
+
+    if total:
+        print("Use --reconstruir para recalcular las tablas de resumen")
+    return 1 if total else 0
+
+if __name__ == "__main__":
+    sys.exit(main())